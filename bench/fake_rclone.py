@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < a stand-in for rclone that serves "remote:path" from local folders, set up through: > #
+# <   FAKE_RCLONE_ROOT           folder holding one subfolder per remote > #
+# <   FAKE_RCLONE_CALL_LATENCY   seconds slept once per call, like starting and authenticating > #
+# <   FAKE_RCLONE_FILE_LATENCY   seconds slept per file copied or deleted > #
+# <   FAKE_RCLONE_BANDWIDTH      bytes per second shared by a call's transfers, 0 is off > #
+# <   FAKE_RCLONE_FAILURE_RATE   chance a call fails, decided from its arguments so runs repeat > #
+# <   FAKE_RCLONE_FAIL_COMMANDS  comma separated commands that may fail, every one by default > #
+# <   FAKE_RCLONE_FAIL_POINT     fraction of files a failing call moves before it gives up > #
+# <   FAKE_RCLONE_SEED           changes which calls fail > #
+# <   FAKE_RCLONE_STATS          file that gets one json line per call > #
+
+CHUNK_SIZE = 1024 * 1024
+SIZE_SUFFIXES = {"B": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+# < the exit codes rclone documents for these cases > #
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_DIRECTORY_NOT_FOUND = 3
+EXIT_FILE_NOT_FOUND = 4
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class Arguments:
+    command: str
+    paths: list[str] = field(default_factory=list)
+    flags: dict[str, list[str]] = field(default_factory=dict)
+
+    # < ------------------------------------------------------------------- > #
+
+    def flag(self, name: str, default: str | None = None) -> str | None:
+        values = self.flags.get(name)
+        return default if not values else values[-1]
+
+    # < ------------------------------------------------------------------- > #
+
+    def has(self, name: str) -> bool:
+        return name in self.flags
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class CallStats:
+    command: str
+    files: int = 0
+    bytes: int = 0
+    total_files: int = 0
+    total_bytes: int = 0
+    deleted: int = 0
+    errors: int = 0
+    transferring: dict[str, list[int]] = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    # < ------------------------------------------------------------------- > #
+
+    def toRclone(self) -> dict[str, object]:
+        # < the "stats" object of rclone's json log > #
+        with self.lock:
+            elapsed = max(time.monotonic() - self.started, 1e-6)
+            speed = self.bytes / elapsed
+            remaining = max(0, self.total_bytes - self.bytes)
+
+            return {
+                "bytes": self.bytes,
+                "totalBytes": self.total_bytes,
+                "speed": speed,
+                "eta": remaining / speed if speed > 0 else None,
+                "transfers": self.files,
+                "totalTransfers": self.total_files,
+                "deletes": self.deleted,
+                "errors": self.errors,
+                "elapsedTime": elapsed,
+                "transferring": [
+                    {
+                        "name": name,
+                        "bytes": done,
+                        "size": size,
+                        "percentage": int(done * 100 / size) if size > 0 else 100,
+                        "speed": speed,
+                    }
+                    for name, (done, size) in self.transferring.items()
+                ],
+            }
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class Throttle:
+    # < one bandwidth budget for every transfer of the call, like --bwlimit > #
+    def __init__(self, bandwidth: float) -> None:
+        self.bandwidth: float = bandwidth
+        self.next_free: float = time.monotonic()
+        self.lock = threading.Lock()
+
+    # < ------------------------------------------------------------------- > #
+
+    def consume(self, size: int) -> None:
+        if self.bandwidth <= 0:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_free)
+            self.next_free = start + size / self.bandwidth
+            wait = self.next_free - now
+
+        time.sleep(wait)
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class CallFailed(Exception):
+    pass
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseArguments(argv: list[str]) -> Arguments:
+    positional: list[str] = []
+    flags: dict[str, list[str]] = {}
+
+    for argument in argv:
+        if argument.startswith("-"):
+            name, _separator, value = argument.partition("=")
+            flags.setdefault(name, []).append(value)
+        else:
+            positional.append(argument)
+
+    if not positional:
+        return Arguments("", [], flags)
+
+    return Arguments(positional[0], positional[1:], flags)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseSize(text: str) -> int:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([BKMGT]?)(?:i?B)?", text.strip(), re.IGNORECASE)
+
+    if match is None:
+        raise ValueError(f"bad size: {text}")
+
+    # < rclone reads a bare number as KiB > #
+    suffix = match.group(2).upper() or "K"
+
+    return int(float(match.group(1)) * SIZE_SUFFIXES[suffix])
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseDuration(text: str) -> float:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)(ms|s|m|h)?", text.strip())
+
+    if match is None:
+        return 1.0
+
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}[match.group(2) or "s"]
+
+    return float(match.group(1)) * scale
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def globBody(pattern: str) -> str:
+    output = ""
+    index = 0
+
+    while index < pattern.__len__():
+        character = pattern[index]
+
+        if pattern.startswith("**", index):
+            output = f"{output}.*"
+            index = index + 2
+            continue
+
+        if character == "*":
+            output = f"{output}[^/]*"
+        elif character == "?":
+            output = f"{output}[^/]"
+        elif character == "{":
+            end = pattern.index("}", index)
+            # < like rclone, spaces around the alternatives are part of them > #
+            options = [globBody(part) for part in pattern[index + 1 : end].split(",")]
+            output = f"{output}(?:{'|'.join(options)})"
+            index = end + 1
+            continue
+        else:
+            output = f"{output}{re.escape(character)}"
+
+        index = index + 1
+
+    return output
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def globPattern(pattern: str) -> re.Pattern[str]:
+    # < rclone filter globs: / anchors to the root, ** crosses folders, {a,b} alternates > #
+    body = globBody(pattern.lstrip("/"))
+
+    return re.compile(f"^{body}$" if pattern.startswith("/") else f"(?:^|/){body}$")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class Filter:
+    def __init__(self, arguments: Arguments) -> None:
+        self.excludes = [globPattern(value) for value in arguments.flags.get("--exclude", [])]
+        self.min_size = parseSize(arguments.flag("--min-size") or "0B")
+        max_size = arguments.flag("--max-size")
+        self.max_size = None if max_size is None else parseSize(max_size)
+
+        self.files_from: set[str] | None = None
+        files_from = arguments.flag("--files-from-raw") or arguments.flag("--files-from")
+
+        if files_from is not None:
+            lines = Path(files_from).read_text().splitlines()
+            self.files_from = {line.strip().lstrip("/") for line in lines if line.strip()}
+
+    # < ------------------------------------------------------------------- > #
+
+    def allows(self, relative: str, size: int) -> bool:
+        if self.files_from is not None and relative not in self.files_from:
+            return False
+
+        if any(pattern.search(relative) for pattern in self.excludes):
+            return False
+
+        if size < self.min_size:
+            return False
+
+        return self.max_size is None or size <= self.max_size
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def resolve(path: str) -> Path:
+    # < "remote:some/path" lives under FAKE_RCLONE_ROOT/remote, anything else is local > #
+    remote, separator, rest = path.partition(":")
+
+    # < like rclone, "C:\\..." is a drive on windows and a one letter remote elsewhere > #
+    drive = sys.platform == "win32" and remote.__len__() == 1
+
+    if separator == "" or drive or "/" in remote or "\\" in remote:
+        return Path(path)
+
+    root = os.environ.get("FAKE_RCLONE_ROOT")
+
+    if root is None:
+        raise CallFailed(f"FAKE_RCLONE_ROOT is not set, cannot serve {path}")
+
+    return Path(root).joinpath(remote, rest.strip("/"))
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def listFiles(root: Path) -> dict[str, os.stat_result]:
+    files: dict[str, os.stat_result] = {}
+
+    if not root.is_dir():
+        return files
+
+    for folder, _folders, names in os.walk(root):
+        for name in names:
+            path = Path(folder).joinpath(name)
+            files[path.relative_to(root).as_posix()] = path.stat()
+
+    return files
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def failureDecision(arguments: Arguments, argv: list[str]) -> bool:
+    rate = float(os.environ.get("FAKE_RCLONE_FAILURE_RATE", "0"))
+    commands = os.environ.get("FAKE_RCLONE_FAIL_COMMANDS", "")
+
+    if rate <= 0:
+        return False
+
+    if commands and arguments.command not in commands.split(","):
+        return False
+
+    # < the same call fails the same way every run, a different seed picks other calls > #
+    seed = os.environ.get("FAKE_RCLONE_SEED", "0")
+
+    return random.Random(f"{seed}:{' '.join(argv)}").random() < rate
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def copyFile(source: Path, target: Path, name: str, stats: CallStats, throttle: Throttle) -> None:
+    size = source.stat().st_size
+    latency = float(os.environ.get("FAKE_RCLONE_FILE_LATENCY", "0"))
+
+    time.sleep(latency)
+
+    with stats.lock:
+        stats.transferring[name] = [0, size]
+
+    # < written beside the target and renamed, so a failed call leaves no partial file > #
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_name(f"{target.name}.partial")
+
+    with open(source, "rb") as source_file, open(temporary, "wb") as target_file:
+        while True:
+            chunk = source_file.read(CHUNK_SIZE)
+
+            if not chunk:
+                break
+
+            throttle.consume(chunk.__len__())
+            target_file.write(chunk)
+
+            with stats.lock:
+                stats.bytes = stats.bytes + chunk.__len__()
+                stats.transferring[name][0] = stats.transferring[name][0] + chunk.__len__()
+
+    shutil.copystat(source, temporary)
+    os.replace(temporary, target)
+
+    with stats.lock:
+        stats.files = stats.files + 1
+        del stats.transferring[name]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def transferTree(arguments: Arguments, stats: CallStats, fail: bool, delete: bool) -> None:
+    source, destination = resolve(arguments.paths[0]), resolve(arguments.paths[1])
+
+    if not source.is_dir():
+        raise CallFailed(f"directory not found: {arguments.paths[0]}")
+
+    filters = Filter(arguments)
+    source_files = {
+        name: stat for name, stat in listFiles(source).items() if filters.allows(name, stat.st_size)
+    }
+    destination_files = listFiles(destination)
+
+    # < size and modification time decide what changed, as rclone does by default > #
+    pending: list[str] = []
+
+    for name, stat in sorted(source_files.items()):
+        current = destination_files.get(name)
+
+        if current is not None and arguments.has("--ignore-existing"):
+            continue
+
+        if (
+            current is not None
+            and current.st_size == stat.st_size
+            and abs(current.st_mtime - stat.st_mtime) < 0.001
+        ):
+            continue
+
+        pending.append(name)
+
+    stats.total_files = pending.__len__()
+    stats.total_bytes = sum(source_files[name].st_size for name in pending)
+
+    throttle = Throttle(float(os.environ.get("FAKE_RCLONE_BANDWIDTH", "0")))
+    transfers = max(1, int(arguments.flag("--transfers", "4") or "4"))
+    fail_after = int(pending.__len__() * float(os.environ.get("FAKE_RCLONE_FAIL_POINT", "0.5")))
+
+    if fail:
+        pending = pending[:fail_after]
+
+    if arguments.has("--dry-run"):
+        return
+
+    with ThreadPoolExecutor(max_workers=transfers) as executor:
+        futures = [
+            executor.submit(
+                copyFile, source.joinpath(name), destination.joinpath(name), name, stats, throttle
+            )
+            for name in pending
+        ]
+
+        for future in futures:
+            future.result()
+
+    if fail:
+        stats.errors = stats.errors + 1
+        raise CallFailed("injected failure after a partial transfer")
+
+    if not delete:
+        return
+
+    # < excluded files on the destination are left alone, like without --delete-excluded > #
+    for name, stat in destination_files.items():
+        if name in source_files or not filters.allows(name, stat.st_size):
+            continue
+
+        destination.joinpath(name).unlink(missing_ok=True)
+        stats.deleted = stats.deleted + 1
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def deleteFiles(arguments: Arguments, stats: CallStats) -> None:
+    root = resolve(arguments.paths[0])
+
+    if not root.is_dir():
+        raise CallFailed(f"directory not found: {arguments.paths[0]}")
+
+    filters = Filter(arguments)
+    latency = float(os.environ.get("FAKE_RCLONE_FILE_LATENCY", "0"))
+
+    for name, stat in listFiles(root).items():
+        if filters.allows(name, stat.st_size):
+            time.sleep(latency)
+            root.joinpath(name).unlink(missing_ok=True)
+            stats.deleted = stats.deleted + 1
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def listJson(arguments: Arguments) -> list[dict[str, object]]:
+    root = resolve(arguments.paths[0])
+
+    if not root.is_dir():
+        raise CallFailed(f"directory not found: {arguments.paths[0]}")
+
+    recursive = arguments.has("-R") or arguments.has("--recursive")
+    max_depth = int(arguments.flag("--max-depth", "-1" if recursive else "1") or "1")
+    dirs_only = arguments.has("--dirs-only")
+    files_only = arguments.has("--files-only")
+
+    entries: list[dict[str, object]] = []
+
+    for folder, folders, names in os.walk(root):
+        relative = Path(folder).relative_to(root)
+        depth = 0 if relative == Path(".") else relative.parts.__len__()
+
+        if max_depth >= 0 and depth >= max_depth:
+            folders.clear()
+            continue
+
+        items = [(name, True) for name in sorted(folders)] if not files_only else []
+        items.extend([] if dirs_only else [(name, False) for name in sorted(names)])
+
+        for name, is_dir in items:
+            path = Path(folder).joinpath(name)
+            stat = path.stat()
+            modified = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(stat.st_mtime))
+
+            entries.append(
+                {
+                    "Path": relative.joinpath(name).as_posix(),
+                    "Name": name,
+                    "Size": -1 if is_dir else stat.st_size,
+                    "MimeType": "inode/directory" if is_dir else "application/octet-stream",
+                    "ModTime": modified,
+                    "IsDir": is_dir,
+                }
+            )
+
+    return entries
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def logJson(level: str, message: str, stats: CallStats | None = None) -> None:
+    record: dict[str, object] = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "level": level,
+        "msg": message,
+        "source": "fake_rclone",
+    }
+
+    if stats is not None:
+        record["stats"] = stats.toRclone()
+
+    print(json.dumps(record), file=sys.stderr, flush=True)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def reportStats(stats: CallStats, interval: float, done: threading.Event) -> None:
+    while not done.wait(interval):
+        logJson("notice", "stats", stats)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def writeCallStats(arguments: Arguments, stats: CallStats, returncode: int, latency: float) -> None:
+    path = os.environ.get("FAKE_RCLONE_STATS")
+
+    if path is None:
+        return
+
+    record = {
+        "command": arguments.command,
+        "paths": arguments.paths,
+        "files": stats.files,
+        "bytes": stats.bytes,
+        "deleted": stats.deleted,
+        "errors": stats.errors,
+        "call_latency": latency,
+        "elapsed": time.monotonic() - stats.started,
+        "returncode": returncode,
+        "pid": os.getpid(),
+    }
+
+    # < one short append per call, so parallel calls never interleave a line > #
+    with open(path, "a") as stats_file:
+        stats_file.write(f"{json.dumps(record)}\n")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runCommand(arguments: Arguments, stats: CallStats, fail: bool) -> int:
+    match arguments.command:
+        case "lsjson":
+            if fail:
+                raise CallFailed("injected failure")
+
+            print(json.dumps(listJson(arguments)))
+
+        case "sync" | "copy":
+            transferTree(arguments, stats, fail, arguments.command == "sync")
+
+        case "copyto":
+            if fail:
+                raise CallFailed("injected failure")
+
+            source, target = resolve(arguments.paths[0]), resolve(arguments.paths[1])
+
+            if not source.is_file():
+                raise CallFailed(f"file not found: {arguments.paths[0]}")
+
+            stats.total_files, stats.total_bytes = 1, source.stat().st_size
+            throttle = Throttle(float(os.environ.get("FAKE_RCLONE_BANDWIDTH", "0")))
+            copyFile(source, target, target.name, stats, throttle)
+
+        case "cat":
+            if fail:
+                raise CallFailed("injected failure")
+
+            path = resolve(arguments.paths[0])
+
+            if not path.is_file():
+                logJson("error", f"file not found: {arguments.paths[0]}")
+                return EXIT_FILE_NOT_FOUND
+
+            sys.stdout.buffer.write(path.read_bytes())
+            sys.stdout.flush()
+
+        case "delete":
+            if fail:
+                raise CallFailed("injected failure")
+
+            deleteFiles(arguments, stats)
+
+        case "version":
+            print("rclone v0.0.0-fake")
+
+        case _:
+            logJson("error", f"unsupported command: {arguments.command!r}")
+            return EXIT_USAGE
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    arguments = parseArguments(argv)
+    stats = CallStats(arguments.command)
+
+    latency = float(os.environ.get("FAKE_RCLONE_CALL_LATENCY", "0"))
+    time.sleep(latency)
+
+    # < --use-json-log with --stats is how transfer() follows progress > #
+    done = threading.Event()
+    interval = parseDuration(arguments.flag("--stats", "1s") or "1s")
+
+    if arguments.has("--use-json-log") and interval > 0:
+        threading.Thread(target=reportStats, args=(stats, interval, done), daemon=True).start()
+
+    try:
+        returncode = runCommand(arguments, stats, failureDecision(arguments, argv))
+
+    except CallFailed as error:
+        logJson("error", str(error))
+        returncode = EXIT_DIRECTORY_NOT_FOUND if "not found" in str(error) else EXIT_ERROR
+
+    except (OSError, ValueError, IndexError) as error:
+        logJson("error", f"{type(error).__name__}: {error}")
+        returncode = EXIT_ERROR
+
+    done.set()
+
+    if arguments.has("--use-json-log") and arguments.command in ("sync", "copy", "copyto"):
+        logJson("notice", "final stats", stats)
+
+    writeCallStats(arguments, stats, returncode, latency)
+
+    return returncode
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,95 @@
+import argparse
+import subprocess
+import sys
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < a regression gate, it exits non-zero when a headless command imports a forbidden module, > #
+# < goes over the import budget or fails to run at all > #
+
+# < none of these may be imported by a headless command > #
+FORBIDDEN_MODULES = ("PySide6", "requests", "nbt")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def measureImports(command: list[str]) -> tuple[int, int, list[str]]:
+    # < returns the exit code, the total import time in microseconds and every module imported > #
+    response = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "minecraft_pack_manager", *command],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    total = 0
+    modules: list[str] = []
+    started = False
+
+    for line in response.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+
+        # < interpreter startup ends with site, which also runs any .pth hooks > #
+        if not started:
+            started = name.strip() == "site"
+            continue
+
+        modules.append(name.strip())
+
+        # < only top level imports, their cumulative time covers the rest > #
+        if not name.startswith("  "):
+            total = total + int(cumulative)
+
+    return response.returncode, total, modules
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="cold start import budget check")
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("command", nargs="*", default=["version"])
+    args = parser.parse_args()
+
+    # < the fastest run is the least disturbed by the rest of the machine > #
+    results = [measureImports(args.command) for _ in range(args.runs)]
+    _returncode, total, modules = min(results, key=lambda result: result[1])
+
+    command = " ".join(args.command)
+    print(f"{command}: {total / 1000:.1f} ms of imports (budget {args.budget_ms} ms)")
+
+    # < a command that crashes early imports little, which must not read as a pass > #
+    returncodes = [result[0] for result in results if result[0] != 0]
+    failed = returncodes.__len__() > 0
+
+    if failed:
+        print(f"command exited with {returncodes[0]}")
+
+    for module in modules:
+        if module.split(".")[0] in FORBIDDEN_MODULES:
+            print(f"forbidden import: {module}")
+            failed = True
+
+    if total / 1000 > args.budget_ms:
+        print("import time budget exceeded")
+        failed = True
+
+    return 1 if failed else 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,140 @@
+import argparse
+import sys
+import time
+
+from io import BytesIO
+
+from minecraft_pack_manager.lib.nbtscan import decompress, removeTag
+from nbt import nbt
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def makeLevelDat(entries: int, seed: int = 0) -> bytes:
+    # < shaped like a modded level.dat: big registries around a player tag > #
+    root = nbt.NBTFile()
+    root.name = ""
+
+    data = nbt.TAG_Compound(name="Data")
+    data.tags.append(nbt.TAG_String(name="LevelName", value=f"world {seed}"))
+    data.tags.append(nbt.TAG_Long(name="RandomSeed", value=seed))
+    data.tags.append(nbt.TAG_Int(name="version", value=19133))
+
+    rules = nbt.TAG_Compound(name="GameRules")
+    for index in range(64):
+        rules.tags.append(nbt.TAG_String(name=f"rule{index}", value="true"))
+    data.tags.append(rules)
+
+    packs = nbt.TAG_List(name="Enabled", type=nbt.TAG_String)
+    for index in range(entries // 8):
+        packs.tags.append(nbt.TAG_String(value=f"mod_{index}:data"))
+    data.tags.append(packs)
+
+    player = nbt.TAG_Compound(name="Player")
+    inventory = nbt.TAG_List(name="Inventory", type=nbt.TAG_Compound)
+    for index in range(36):
+        item = nbt.TAG_Compound()
+        item.tags.append(nbt.TAG_Byte(name="Slot", value=index))
+        item.tags.append(nbt.TAG_String(name="id", value=f"mod_{index}:item"))
+        item.tags.append(nbt.TAG_Int_Array(name="UUID"))
+        item["UUID"].value = [seed, index, 3, 4]
+        inventory.tags.append(item)
+    player.tags.append(inventory)
+    player.tags.append(nbt.TAG_Double(name="XP", value=1.5))
+    data.tags.append(player)
+
+    registries = nbt.TAG_Compound(name="Registries")
+    for index in range(entries):
+        entry = nbt.TAG_Compound(name=f"mod_{index % 97}:entry_{index}")
+        entry.tags.append(nbt.TAG_Int(name="id", value=index))
+        entry.tags.append(nbt.TAG_Long_Array(name="states"))
+        entry["states"].value = [index, seed, index * seed]
+        registries.tags.append(entry)
+    data.tags.append(registries)
+
+    root.tags.append(data)
+
+    buffer = BytesIO()
+    root.write_file(fileobj=buffer)
+
+    return buffer.getvalue()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def scrubWithNbt(raw: bytes) -> bytes:
+    # < the path cleanInstanceSaves used to take > #
+    data = nbt.NBTFile(fileobj=BytesIO(raw))
+    data.get("Data").pop("Player")
+
+    buffer = BytesIO()
+    data.write_file(fileobj=buffer)
+
+    return buffer.getvalue()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def renderWithNbt(raw: bytes) -> bytes:
+    # < uncompressed bytes of the nbt library's result, for comparison > #
+    data = nbt.NBTFile(fileobj=BytesIO(raw))
+    data.get("Data").pop("Player")
+
+    buffer = BytesIO()
+    data.write_file(buffer=buffer)
+
+    return buffer.getvalue()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="level.dat player scrub benchmark")
+    parser.add_argument("--worlds", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=4000)
+    args = parser.parse_args()
+
+    fixtures = [makeLevelDat(args.entries, seed) for seed in range(args.worlds)]
+    size = sum(fixture.__len__() for fixture in fixtures)
+
+    print(f"{args.worlds} worlds, {size / 1024:.0f} KiB compressed")
+
+    # < the scanner must produce exactly what the nbt library renders > #
+    for fixture in fixtures:
+        scrubbed = removeTag(fixture)
+
+        if scrubbed is None or decompress(scrubbed)[1] != renderWithNbt(fixture):
+            print("mismatch against the nbt library")
+            return 1
+
+    print("output is byte identical to the nbt library")
+
+    start = time.perf_counter()
+    for fixture in fixtures:
+        scrubWithNbt(fixture)
+    nbt_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for fixture in fixtures:
+        removeTag(fixture)
+    scan_time = time.perf_counter() - start
+
+    print(f"nbt     {nbt_time * 1000 / args.worlds:8.2f} ms / world")
+    print(f"nbtscan {scan_time * 1000 / args.worlds:8.2f} ms / world")
+    print(f"speedup {nbt_time / scan_time:8.1f}x")
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+# < ----------------------------------------------------------------------- > #
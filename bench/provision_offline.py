@@ -0,0 +1,272 @@
+import argparse
+import hashlib
+import io
+import sys
+import tempfile
+import threading
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from zipfile import ZipFile
+
+from minecraft_pack_manager import APP_PACKAGE
+from minecraft_pack_manager.lib.provision import provisionRclone, rclonePlatform
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+VERSION = "v1.99.0"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class Release:
+    # < what the fixture server hands out, and what it was asked for > #
+    files: dict[str, bytes] = field(default_factory=dict)
+    ignore_range: bool = False
+    requests: list[tuple[str, str | None, int]] = field(default_factory=list)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def releaseHandler(release: Release) -> type[BaseHTTPRequestHandler]:
+    class ReleaseHandler(BaseHTTPRequestHandler):
+        status: int = 0
+
+        def do_GET(self) -> None:
+            data = release.files.get(self.path)
+            range_header = self.headers.get("Range")
+
+            if data is None:
+                self.reply(404, b"")
+            elif range_header is None or release.ignore_range:
+                self.reply(200, data)
+            else:
+                # < only the "bytes=N-" form, the one downloadFile sends > #
+                offset = int(range_header.removeprefix("bytes=").rstrip("-"))
+
+                if offset >= data.__len__():
+                    self.reply(416, b"")
+                else:
+                    self.reply(206, data[offset:])
+
+            release.requests.append((self.path, range_header, self.status))
+
+        # < --------------------------------------------------------------- > #
+
+        def reply(self, status: int, body: bytes) -> None:
+            self.status = status
+            self.send_response(status)
+            self.send_header("Content-Length", str(body.__len__()))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # < --------------------------------------------------------------- > #
+
+        def log_message(self, *_args: object) -> None:
+            return None
+
+        # < --------------------------------------------------------------- > #
+
+    return ReleaseHandler
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def makeRelease(binary_name: str, binary: bytes, platform_name: str) -> Release:
+    archive_name = f"rclone-{VERSION}-{platform_name}.zip"
+    folder = archive_name.removesuffix(".zip")
+
+    buffer = io.BytesIO()
+
+    with ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr(f"{folder}/{binary_name}", binary)
+        zip_file.writestr(f"{folder}/README.txt", "docs the provisioner must skip")
+
+    archive = buffer.getvalue()
+    digest = hashlib.sha256(archive).hexdigest()
+
+    # < clear signed like the real file, only the hash lines count > #
+    sums = "\n".join(
+        [
+            "-----BEGIN PGP SIGNED MESSAGE-----",
+            "Hash: SHA1",
+            "",
+            f"{'0' * 64}  rclone-{VERSION}-other-platform.zip",
+            f"{digest}  {archive_name}",
+            "-----BEGIN PGP SIGNATURE-----",
+            "",
+        ]
+    )
+
+    return Release(
+        {
+            "/version.txt": f"rclone {VERSION}\n".encode(),
+            f"/{VERSION}/SHA256SUMS": sums.encode(),
+            f"/{VERSION}/{archive_name}": archive,
+        }
+    )
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runCase(
+    name: str,
+    root: Path,
+    release: Release,
+    prepare: Callable[[Path, bytes], None],
+    check: Callable[[Path | None, Path, Release], str | None],
+) -> bool:
+    # < each case gets its own server and install folder, the url and path come from config > #
+    server = ThreadingHTTPServer(("127.0.0.1", 0), releaseHandler(release))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    install = root.joinpath(name)
+    install.mkdir()
+    rclone_exe = install.joinpath("rclone.exe" if sys.platform == "win32" else "rclone")
+
+    archive_url = next(path for path in release.files if path.endswith(".zip"))
+    part = install.joinpath(f"{archive_url.rsplit('/', 1)[-1]}.part")
+    prepare(part, release.files[archive_url])
+
+    config = APP_PACKAGE.getConfig().getConfig()
+    config["rclone_download_url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    config["rclone_executable"] = rclone_exe.as_posix()
+    APP_PACKAGE.getConfig().setConfig(config)
+
+    try:
+        result = provisionRclone()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    problem = check(result, part, release)
+    print(f"{name:<20} {'ok' if problem is None else f'FAILED: {problem}'}")
+
+    return problem is None
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def archiveRequests(release: Release) -> list[tuple[str, str | None, int]]:
+    return [request for request in release.requests if request[0].endswith(".zip")]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="rclone provisioning against a local server")
+    parser.add_argument("--size", type=int, default=3 * 1024 * 1024, help="fake binary size")
+    args = parser.parse_args()
+
+    platform_name = rclonePlatform()
+
+    if platform_name is None:
+        print("no rclone build for this platform, nothing to check")
+        return 0
+
+    binary_name = "rclone.exe" if sys.platform == "win32" else "rclone"
+    # < incompressible, so the archive is large enough to resume halfway through > #
+    binary = hashlib.shake_256(b"rclone").digest(args.size)
+
+    def fresh() -> Release:
+        return makeRelease(binary_name, binary, platform_name)
+
+    def noPart(_part: Path, _archive: bytes) -> None:
+        return None
+
+    def halfPart(part: Path, archive: bytes) -> None:
+        part.write_bytes(archive[: archive.__len__() // 2])
+
+    def wholePart(part: Path, archive: bytes) -> None:
+        part.write_bytes(archive)
+
+    def installed(result: Path | None, part: Path, _release: Release) -> str | None:
+        if result is None:
+            return "provisionRclone returned None"
+
+        if result.read_bytes() != binary:
+            return "extracted binary differs from the one in the archive"
+
+        if part.exists() or result.parent.joinpath("README.txt").exists():
+            return "left the partial archive or extra files behind"
+
+        return None
+
+    def resumed(result: Path | None, part: Path, release: Release) -> str | None:
+        requests = archiveRequests(release)
+
+        if [request[1:] for request in requests] != [(f"bytes={part_size}-", 206)]:
+            return f"expected one ranged 206 request, got {requests}"
+
+        return installed(result, part, release)
+
+    def satisfied(result: Path | None, part: Path, release: Release) -> str | None:
+        requests = archiveRequests(release)
+
+        if [request[2] for request in requests] != [416]:
+            return f"expected a single 416 reply, got {requests}"
+
+        return installed(result, part, release)
+
+    def restarted(result: Path | None, part: Path, release: Release) -> str | None:
+        requests = archiveRequests(release)
+
+        if [request[2] for request in requests] != [200]:
+            return f"expected the server to send the whole archive, got {requests}"
+
+        return installed(result, part, release)
+
+    def rejected(result: Path | None, part: Path, _release: Release) -> str | None:
+        if result is not None:
+            return "a corrupt archive was installed"
+
+        if part.exists():
+            return "the corrupt partial archive was kept, it would fail forever"
+
+        return None
+
+    archive_size = next(
+        data.__len__() for path, data in fresh().files.items() if path.endswith(".zip")
+    )
+    part_size = archive_size // 2
+
+    ignoring = fresh()
+    ignoring.ignore_range = True
+
+    # < a corrupt partial file resumes into an archive whose checksum cannot match > #
+    def corruptPart(part: Path, archive: bytes) -> None:
+        part.write_bytes(bytes(255 - byte for byte in archive[:part_size]))
+
+    cases = [
+        ("fresh", fresh(), noPart, installed),
+        ("range_resume", fresh(), halfPart, resumed),
+        ("already_complete_416", fresh(), wholePart, satisfied),
+        ("range_ignored", ignoring, halfPart, restarted),
+        ("checksum_mismatch", fresh(), corruptPart, rejected),
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="mpm-provision-") as scratch:
+        passed = [runCase(name, Path(scratch), *case) for name, *case in cases]
+
+    return 0 if all(passed) else 1
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,338 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any
+
+from minecraft_pack_manager import APP_PACKAGE
+from minecraft_pack_manager.lib import cache
+from minecraft_pack_manager.lib.scheduler import TaskState, TransferTask, createScheduler
+from minecraft_pack_manager.lib.transfer import listRemotePacks
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+MIB = 1024 * 1024
+
+FAKE_RCLONE = Path(__file__).parent.joinpath("fake_rclone.py")
+
+# < the combine remote transfer() resolves "HTZ0:<pack>" through > #
+COMBINE, UPSTREAM = "A", "HTZ0"
+
+# < transfer() excludes these, the fixture has them so the filters are exercised > #
+EXCLUDED_FOLDERS = ("logs", "backups", "screenshots")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def peakRss() -> tuple[int, int]:
+    # < bytes for this process and for the largest rclone it waited for > #
+    try:
+        import resource
+    except ImportError:
+        return 0, 0
+
+    # < linux reports KiB, macos bytes > #
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return own * scale, children * scale
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def makePacks(root: Path, packs: int, files: int, file_size: int) -> tuple[int, int]:
+    # < returns the files and bytes a download should bring back > #
+    expected_files, expected_bytes = 0, 0
+
+    for pack in range(packs):
+        game = root.joinpath(f"pack_{pack:04d}")
+
+        for folder, count in (("mods", files // 2), ("config", files - files // 2)):
+            game.joinpath(folder).mkdir(parents=True, exist_ok=True)
+
+            for index in range(count):
+                # < each file differs, so nothing can be skipped by content > #
+                data = f"{pack}:{folder}:{index}:".encode().ljust(file_size, b"x")
+                game.joinpath(folder, f"{folder}_{index}.dat").write_bytes(data)
+                expected_files, expected_bytes = expected_files + 1, expected_bytes + data.__len__()
+
+        for folder in EXCLUDED_FOLDERS:
+            game.joinpath(folder).mkdir(parents=True, exist_ok=True)
+            game.joinpath(folder, "latest.log").write_bytes(b"l" * 256)
+
+    return expected_files, expected_bytes
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def treeTotals(root: Path) -> tuple[int, int]:
+    files, size = 0, 0
+
+    # < the manifest is bookkeeping, not pack content > #
+    for folder, _folders, names in os.walk(root):
+        for name in names:
+            if name.startswith("."):
+                continue
+
+            files, size = files + 1, size + Path(folder).joinpath(name).stat().st_size
+
+    return files, size
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def writeLauncher(root: Path) -> Path:
+    # < the app runs rclone_executable directly, so point it at this interpreter > #
+    # < -S skips site packages, the fake only needs the standard library and starts faster > #
+    if sys.platform == "win32":
+        launcher = root.joinpath("rclone.cmd")
+        launcher.write_text(f'@"{sys.executable}" -S "{FAKE_RCLONE}" %*\r\n')
+        return launcher
+
+    launcher = root.joinpath("rclone")
+    launcher.write_text(f'#!/bin/sh\nexec "{sys.executable}" -S "{FAKE_RCLONE}" "$@"\n')
+    launcher.chmod(0o755)
+
+    return launcher
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runTasks(submissions: list[tuple[str, str]]) -> tuple[float, dict[str, int]]:
+    scheduler = createScheduler()
+    tasks: list[TransferTask] = []
+
+    start = time.perf_counter()
+
+    for source, destination in submissions:
+        tasks.append(scheduler.submit(source, destination))
+
+    scheduler.wait()
+    elapsed = time.perf_counter() - start
+
+    states = {state.name: 0 for state in TaskState}
+
+    for task in tasks:
+        states[task.state.name] = states[task.state.name] + 1
+
+    return elapsed, states
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runScale(args: argparse.Namespace, root: Path) -> dict[str, Any]:
+    cache_root = root.joinpath("cache")
+    cache.cachePath = lambda name: cache_root.joinpath(f"{name}.json")
+
+    uploads, downloads = root.joinpath("instances"), root.joinpath("downloads")
+    remotes = root.joinpath("remotes")
+    remotes.joinpath(COMBINE, UPSTREAM, "Modpacks").mkdir(parents=True)
+    downloads.mkdir()
+
+    expected_files, expected_bytes = makePacks(uploads, args.scale, args.files, args.file_size)
+
+    conf_path = root.joinpath("rclone.conf")
+    conf_path.write_text(
+        "\n".join(
+            [
+                "[htz0]",
+                "type = local",
+                "",
+                f"[{COMBINE}]",
+                "type = combine",
+                f"upstreams = {UPSTREAM}=htz0:/",
+                "",
+            ]
+        )
+    )
+
+    stats_path = root.joinpath("calls.jsonl")
+
+    os.environ.update(
+        {
+            "FAKE_RCLONE_ROOT": remotes.as_posix(),
+            "FAKE_RCLONE_CALL_LATENCY": str(args.call_latency),
+            "FAKE_RCLONE_FILE_LATENCY": str(args.file_latency),
+            "FAKE_RCLONE_BANDWIDTH": str(args.bandwidth),
+            "FAKE_RCLONE_FAILURE_RATE": str(args.failure_rate),
+            "FAKE_RCLONE_SEED": str(args.seed),
+            "FAKE_RCLONE_STATS": stats_path.as_posix(),
+        }
+    )
+
+    config = APP_PACKAGE.getConfig().getConfig()
+    config["instances_path"] = uploads.as_posix()
+    config["rclone_executable"] = writeLauncher(root).as_posix()
+    config["rclone_config"] = conf_path.as_posix()
+    config["rclone_max_transfers"] = args.concurrency
+    config["rclone_max_per_backend"] = args.concurrency
+    config["use_rclone_daemon"] = False
+    # < downloads would otherwise link fixture files into the user's real store > #
+    config["use_local_store"] = False
+    APP_PACKAGE.getConfig().setConfig(config)
+
+    names = sorted(path.name for path in uploads.iterdir())
+    phases: dict[str, dict[str, Any]] = {}
+
+    elapsed, states = runTasks([(f"LOCL:{name}", "Make New Folder") for name in names])
+    phases["upload"] = {"seconds": elapsed, "bytes": expected_bytes, "tasks": states}
+
+    start = time.perf_counter()
+    listed = listRemotePacks(force=True)
+    phases["list"] = {"seconds": time.perf_counter() - start, "bytes": 0, "packs": listed.__len__()}
+
+    # < downloads land in their own folder, so every byte really crosses the fake link > #
+    config["instances_path"] = downloads.as_posix()
+    APP_PACKAGE.getConfig().setConfig(config)
+
+    elapsed, states = runTasks([(f"{UPSTREAM}:{name}", "Make New Folder") for name in names])
+    phases["download"] = {"seconds": elapsed, "bytes": expected_bytes, "tasks": states}
+
+    uploaded = treeTotals(remotes.joinpath(COMBINE, UPSTREAM, "Modpacks"))
+    downloaded = treeTotals(downloads)
+
+    calls = [json.loads(line) for line in stats_path.read_text().splitlines()]
+    own_rss, rclone_rss = peakRss()
+
+    return {
+        "packs": args.scale,
+        "phases": phases,
+        "expected": [expected_files, expected_bytes],
+        "uploaded": list(uploaded),
+        "downloaded": list(downloaded),
+        "rclone_calls": calls.__len__(),
+        "peak_rss": own_rss,
+        "peak_rclone_rss": rclone_rss,
+    }
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def childCommand(args: argparse.Namespace, packs: int) -> list[str]:
+    return [
+        sys.executable,
+        Path(__file__).as_posix(),
+        f"--scale={packs}",
+        f"--files={args.files}",
+        f"--file-size={args.file_size}",
+        f"--call-latency={args.call_latency}",
+        f"--file-latency={args.file_latency}",
+        f"--bandwidth={args.bandwidth}",
+        f"--failure-rate={args.failure_rate}",
+        f"--seed={args.seed}",
+        f"--concurrency={args.concurrency}",
+    ]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def printResult(result: dict[str, Any]) -> bool:
+    phases: dict[str, dict[str, Any]] = result["phases"]
+    expected, uploaded = tuple(result["expected"]), tuple(result["uploaded"])
+    downloaded = tuple(result["downloaded"])
+
+    print(f"{result['packs']} packs, {result['rclone_calls']} rclone calls")
+
+    for name, phase in phases.items():
+        seconds = phase["seconds"]
+        line = f"  {name:<9} {seconds:9.2f} s"
+
+        if phase["bytes"] > 0 and seconds > 0:
+            line = f"{line}  {phase['bytes'] / seconds / MIB:8.2f} MiB/s"
+
+        if "tasks" in phase:
+            done, failed = phase["tasks"]["Done"], phase["tasks"]["Failed"]
+            line = f"{line}  {done} done, {failed} failed"
+
+        if "packs" in phase:
+            line = f"{line}  {phase['packs']} packs listed"
+
+        print(line)
+
+    own_rss, rclone_rss = result["peak_rss"], result["peak_rclone_rss"]
+    print(f"  peak rss  {own_rss / MIB:9.1f} MiB, largest rclone {rclone_rss / MIB:.1f} MiB")
+
+    # < files and bytes, the download must bring back exactly what was uploaded > #
+    if uploaded == expected == downloaded:
+        return True
+
+    print(f"  expected {expected}, uploaded {uploaded}, downloaded {downloaded}")
+
+    return False
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="end to end transfers against a simulated rclone")
+    parser.add_argument("--packs", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--files", type=int, default=20, help="files per pack")
+    parser.add_argument("--file-size", type=int, default=16 * 1024)
+    parser.add_argument("--call-latency", type=float, default=0.0, help="seconds per rclone call")
+    parser.add_argument("--file-latency", type=float, default=0.0, help="seconds per file")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="bytes per second, 0 is off")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="also write every result to this file")
+    parser.add_argument("--scale", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # < one scale per process, so each peak rss belongs to that scale alone > #
+    if args.scale is not None:
+        with tempfile.TemporaryDirectory(prefix="mpm-e2e-") as scratch:
+            print(json.dumps(runScale(args, Path(scratch))))
+
+        return 0
+
+    results: list[dict[str, Any]] = []
+    failed = False
+
+    for packs in args.packs:
+        process = subprocess.run(
+            childCommand(args, packs), stdout=subprocess.PIPE, text=True, check=False
+        )
+
+        if process.returncode != 0:
+            print(f"{packs} packs: harness exited with {process.returncode}")
+            failed = True
+            continue
+
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        results.append(result)
+
+        # < injected failures are expected to leave packs missing > #
+        if not printResult(result) and args.failure_rate == 0:
+            failed = True
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=4))
+
+    return 1 if failed else 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+# < ----------------------------------------------------------------------- > #
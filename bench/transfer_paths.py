@@ -0,0 +1,441 @@
+import argparse
+import gzip
+import json
+import shutil
+import statistics
+import struct
+import sys
+import tempfile
+import time
+
+from collections.abc import Callable
+from pathlib import Path
+
+from minecraft_pack_manager import APP_PACKAGE
+from minecraft_pack_manager.lib import cache, transfer
+from minecraft_pack_manager.lib.nbtscan import removeTag
+from minecraft_pack_manager.lib.rclone import loadRcloneConfig, parseRcloneConfig
+from minecraft_pack_manager.lib.saves import SCRUB_INDEX
+from minecraft_pack_manager.lib.transfer import (
+    RemoteInfo,
+    cleanInstanceSaves,
+    listLocalPacks,
+    listRemote,
+)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < timings only compare on one machine, so the baseline is recorded locally, not committed: > #
+# <   python -m minecraft_pack_manager.bench.transfer_paths --record > #
+# < writes it here, later runs without --record compare against it > #
+DEFAULT_BASELINE = Path(__file__).parent.joinpath("transfer_baseline.json")
+
+TAG_END, TAG_BYTE, TAG_INT, TAG_LONG, TAG_DOUBLE = 0, 1, 3, 4, 6
+TAG_STRING, TAG_LIST, TAG_COMPOUND, TAG_INT_ARRAY, TAG_LONG_ARRAY = 8, 9, 10, 11, 12
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def nbtString(value: str) -> bytes:
+    encoded = value.encode()
+    return struct.pack(">H", encoded.__len__()) + encoded
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def nbtNamed(tag_type: int, name: str, payload: bytes) -> bytes:
+    return bytes([tag_type]) + nbtString(name) + payload
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def nbtCompound(tags: list[bytes]) -> bytes:
+    return b"".join(tags) + bytes([TAG_END])
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def makeLevelDat(entries: int, seed: int) -> bytes:
+    # < shaped like a modded level.dat: big registries around a player tag, written by hand > #
+    # < so the suite runs without the nbt library > #
+    rules = [nbtNamed(TAG_STRING, f"rule{index}", nbtString("true")) for index in range(64)]
+
+    inventory = [
+        nbtCompound(
+            [
+                nbtNamed(TAG_BYTE, "Slot", bytes([index])),
+                nbtNamed(TAG_STRING, "id", nbtString(f"mod_{index}:item")),
+                nbtNamed(TAG_INT_ARRAY, "UUID", struct.pack(">i4i", 4, seed, index, 3, 4)),
+            ]
+        )
+        for index in range(36)
+    ]
+
+    player = [
+        nbtNamed(
+            TAG_LIST,
+            "Inventory",
+            bytes([TAG_COMPOUND]) + struct.pack(">i", 36) + b"".join(inventory),
+        ),
+        nbtNamed(TAG_DOUBLE, "XP", struct.pack(">d", 1.5)),
+    ]
+
+    registries = [
+        nbtNamed(
+            TAG_COMPOUND,
+            f"mod_{index % 97}:entry_{index}",
+            nbtCompound(
+                [
+                    nbtNamed(TAG_INT, "id", struct.pack(">i", index)),
+                    nbtNamed(
+                        TAG_LONG_ARRAY,
+                        "states",
+                        struct.pack(">i3q", 3, index, seed, index * seed),
+                    ),
+                ]
+            ),
+        )
+        for index in range(entries)
+    ]
+
+    data = [
+        nbtNamed(TAG_STRING, "LevelName", nbtString(f"world {seed}")),
+        nbtNamed(TAG_LONG, "RandomSeed", struct.pack(">q", seed)),
+        nbtNamed(TAG_INT, "version", struct.pack(">i", 19133)),
+        nbtNamed(TAG_COMPOUND, "GameRules", nbtCompound(rules)),
+        nbtNamed(TAG_COMPOUND, "Player", nbtCompound(player)),
+        nbtNamed(TAG_COMPOUND, "Registries", nbtCompound(registries)),
+    ]
+
+    root = nbtNamed(
+        TAG_COMPOUND, "", nbtCompound([nbtNamed(TAG_COMPOUND, "Data", nbtCompound(data))])
+    )
+
+    return gzip.compress(root, mtime=0)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def makeInstances(root: Path, instances: int, worlds: int, level_dats: list[bytes]) -> None:
+    # < a launcher instance with a game folder, a few mods and config files, and saves > #
+    for instance in range(instances):
+        game = root.joinpath(f"pack_{instance}", ".minecraft")
+
+        for folder, count, size in (("mods", 40, 2048), ("config", 60, 512), ("logs", 3, 256)):
+            game.joinpath(folder).mkdir(parents=True, exist_ok=True)
+
+            for index in range(count):
+                game.joinpath(folder, f"{folder}_{index}.dat").write_bytes(b"x" * size)
+
+        for world in range(worlds):
+            save = game.joinpath("saves", f"world_{world}")
+            save.joinpath("region").mkdir(parents=True, exist_ok=True)
+            save.joinpath("level.dat").write_bytes(level_dats[world % level_dats.__len__()])
+
+            for region in range(4):
+                save.joinpath("region", f"r.{region}.0.mca").write_bytes(b"r" * 4096)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def makeRcloneConfig(remotes: int, upstreams: int) -> str:
+    # < one backend per upstream and a combine remote over each group, like a real drive setup > #
+    lines: list[str] = []
+
+    for remote in range(remotes):
+        aliases: list[str] = []
+
+        for upstream in range(upstreams):
+            name = f"drive_{remote}_{upstream}"
+            lines.extend(
+                [
+                    f"[{name}]",
+                    "type = drive",
+                    "scope = drive",
+                    f'token = {{"access_token":"{"t" * 120}","expiry":"2025-01-01"}}',
+                    f"root_folder_id = {'f' * 33}",
+                    "",
+                ]
+            )
+            aliases.append(f"U{upstream}={name}:")
+
+        lines.extend([f"[C{remote}]", "type = combine", f"upstreams = {' '.join(aliases)}", ""])
+
+    return "\n".join(lines)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def makeListing(entries: int) -> str:
+    # < what lsjson --max-depth=3 --dirs-only prints for a combine remote > #
+    listing: list[dict[str, object]] = []
+
+    for index in range(entries):
+        upstream = f"U{index % 8}"
+
+        match index % 3:
+            case 0:
+                path = f"{upstream}/Modpacks/pack_{index}"
+            case 1:
+                path = f"{upstream}/Modpacks"
+            case _:
+                path = f"{upstream}/Backups/old_{index}"
+
+        listing.append({"Path": path, "Name": path.rsplit("/", 1)[-1], "Size": -1, "IsDir": True})
+
+    return json.dumps(listing)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class ListingDaemon:
+    # < stands in for a running rcd, so listRemote processes a listing without rclone > #
+    def __init__(self, text: str) -> None:
+        self.text: str = text
+
+    # < ------------------------------------------------------------------- > #
+
+    def listJson(
+        self, _remote: str, _options: dict[str, object], _timeout: float | None
+    ) -> list[dict[str, str | int | bool]]:
+        return json.loads(self.text)
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def measure(
+    repeat: int, function: Callable[[], object], setup: Callable[[], object] | None = None
+) -> float:
+    # < the median run, in ms, a single lucky or unlucky run does not move it > #
+    timings: list[float] = []
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings) * 1000
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runSuite(args: argparse.Namespace, root: Path) -> dict[str, float]:
+    # < every cache the measured code writes lands in the scratch folder, not the user's > #
+    cache_root = root.joinpath("cache")
+    cache.cachePath = lambda name: cache_root.joinpath(f"{name}.json")
+
+    instances = root.joinpath("instances")
+    pristine = root.joinpath("pristine")
+
+    level_dats = [makeLevelDat(args.entries, seed) for seed in range(min(args.worlds, 8))]
+
+    # < a fixture the scanner cannot read would make the cold scrub time meaningless > #
+    if removeTag(level_dats[0]) is None:
+        raise RuntimeError("synthetic level.dat has no Data.Player to remove")
+
+    makeInstances(pristine, args.instances, args.worlds, level_dats)
+
+    config = APP_PACKAGE.getConfig().getConfig()
+    config["instances_path"] = instances.as_posix()
+    APP_PACKAGE.getConfig().setConfig(config)
+
+    def freshInstances() -> None:
+        # < scrubbing rewrites the saves, so every cold run starts from the pristine copy > #
+        shutil.rmtree(instances, ignore_errors=True)
+        shutil.copytree(pristine, instances)
+        shutil.rmtree(cache_root, ignore_errors=True)
+        SCRUB_INDEX.entries.clear()
+        SCRUB_INDEX.loaded = False
+
+    def scrubAll() -> None:
+        for instance in sorted(instances.iterdir()):
+            cleanInstanceSaves(instance)
+
+    def forgetCatalog() -> None:
+        cache.cachePath("instance_catalog").unlink(missing_ok=True)
+
+    results: dict[str, float] = {}
+
+    results["saves.scrub_cold"] = measure(args.repeat, scrubAll, freshInstances)
+    results["saves.scrub_warm"] = measure(args.repeat, scrubAll)
+
+    results["local.list_cold"] = measure(args.repeat, listLocalPacks, forgetCatalog)
+    results["local.list_warm"] = measure(args.repeat, listLocalPacks)
+
+    conf_text = makeRcloneConfig(args.remotes, 8)
+    conf_path = root.joinpath("rclone.conf")
+    conf_path.write_text(conf_text)
+
+    results["rclone_conf.parse"] = measure(
+        args.repeat, lambda: parseRcloneConfig(conf_path, conf_text)
+    )
+
+    loadRcloneConfig(conf_path)
+    results["rclone_conf.load_cached"] = measure(args.repeat, lambda: loadRcloneConfig(conf_path))
+
+    listing = makeListing(args.listing)
+    daemon = ListingDaemon(listing)
+
+    def processListing() -> None:
+        remote = RemoteInfo("C0", [f"U{index}" for index in range(8)], [], [])
+        listRemote(remote, ["rclone", "lsjson", "remote:"], daemon=daemon)  # type: ignore[arg-type]
+
+    results["lsjson.process"] = measure(args.repeat, processListing)
+
+    # < without use_rclone_daemon the listing is rclone's stdout, handed over as it would be > #
+    def printListing(
+        rclone_args: list[str],
+        cancel: object = None,
+        capture_output: bool = True,
+        timeout: object = None,
+    ) -> tuple[int, str]:
+        return 0, listing
+
+    def processStdout() -> None:
+        remote = RemoteInfo("C0", [f"U{index}" for index in range(8)], [], [])
+        listRemote(remote, ["rclone", "lsjson", "remote:"])
+
+    run_rclone = transfer.runRclone
+    transfer.runRclone = printListing  # type: ignore[assignment]
+
+    try:
+        results["lsjson.process_stdout"] = measure(args.repeat, processStdout)
+    finally:
+        transfer.runRclone = run_rclone
+
+    return results
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def regressions(
+    results: dict[str, float], baseline: dict[str, float], args: argparse.Namespace
+) -> list[str]:
+    slower: list[str] = []
+
+    for name, value in results.items():
+        if name not in baseline or baseline[name] <= 0:
+            continue
+
+        # < sub millisecond timings swing by large fractions, only real losses count > #
+        if (
+            value / baseline[name] - 1 > args.threshold
+            and value - baseline[name] > args.min_delta_ms
+        ):
+            slower.append(name)
+
+    return slower
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="lib/transfer hot path benchmarks")
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--worlds", type=int, default=5)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--remotes", type=int, default=100)
+    parser.add_argument("--listing", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    # < a few ms of jitter is normal between identical runs, smaller slowdowns never fail > #
+    parser.add_argument("--min-delta-ms", type=float, default=5.0)
+    parser.add_argument("--confirm", type=int, default=2, help="reruns before a slowdown counts")
+    parser.add_argument("--record", action="store_true", help="save these results as the baseline")
+    args = parser.parse_args()
+
+    params = {
+        name: getattr(args, name)
+        for name in ("instances", "worlds", "entries", "remotes", "listing")
+    }
+    # < baselines from before the median was taken hold best runs, they need re-recording > #
+    params["timing"] = "median"
+
+    if args.record:
+        with tempfile.TemporaryDirectory(prefix="mpm-bench-") as scratch:
+            measured = runSuite(args, Path(scratch))
+
+        args.baseline.write_text(json.dumps({"params": params, "results": measured}, indent=4))
+        print(f"recorded baseline: {args.baseline}")
+
+        for name, value in measured.items():
+            print(f"{name:<24} {value:10.2f} ms")
+
+        return 0
+
+    baseline: dict[str, float] = {}
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}, rerun with --record to compare later runs")
+
+    else:
+        recorded = json.loads(args.baseline.read_text())
+
+        # < numbers from other fixture sizes say nothing about this run > #
+        if recorded.get("params") != params:
+            print(f"{args.baseline} was recorded with {recorded.get('params')}")
+            print("rerun with --record to replace it")
+            return 1
+
+        baseline = recorded.get("results", {})
+
+    results: dict[str, float] = {}
+
+    # < a busy machine slows a whole run, a real regression is still there on a rerun > #
+    for _ in range(1 + args.confirm):
+        with tempfile.TemporaryDirectory(prefix="mpm-bench-") as scratch:
+            rerun = runSuite(args, Path(scratch))
+
+        results = {name: min(value, results.get(name, value)) for name, value in rerun.items()}
+
+        if not regressions(results, baseline, args):
+            break
+
+    slower = regressions(results, baseline, args)
+
+    for name, value in results.items():
+        line = f"{name:<24} {value:10.2f} ms"
+
+        if name in baseline and baseline[name] > 0:
+            line = f"{line}  {value / baseline[name] - 1:+7.1%} vs {baseline[name]:.2f} ms"
+
+        if name in slower:
+            line = f"{line}  REGRESSION"
+
+        print(line)
+
+    if slower:
+        print(f"slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+# < ----------------------------------------------------------------------- > #
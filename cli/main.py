@@ -1,6 +1,10 @@
+import json
 import sys
+import time
+import tomllib
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 
 
 # < ----------------------------------------------------------------------- > #
@@ -9,32 +13,320 @@ from dataclasses import dataclass
 @dataclass
 class Settings:
     GUI: bool = False
+    PROFILE_STARTUP: bool = False
+    JSON: bool = False
+    FORCE: bool = False
+    COMMAND: str | None = None
+    ARGUMENTS: list[str] = field(default_factory=list)
+    TO: str | None = None
+    TRACE: str | None = None
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < command -> (fewest, most) arguments, upload and download take a batch > #
+COMMANDS: dict[str, tuple[int, int]] = {
+    "help": (0, 0),
+    "version": (0, 0),
+    "list-local": (0, 0),
+    "list-remote": (0, 0),
+    "upload": (1, 1024),
+    "download": (1, 1024),
+    "sync": (2, 2),
+    "dedupe": (0, 0),
+    "find-mod": (1, 2),
+    "build-assets": (0, 0),
+}
+
+COLOURS: dict[str, str] = {"H1": "\033[36m", "H2": "\033[0m", "H3": "\033[1m", "R": "\033[0m"}
 
 
 # < ----------------------------------------------------------------------- > #
 
 
 def main() -> int:
+    started = time.perf_counter()
+    settings = Settings()
     unkown_arguments = False
 
-    for arg in sys.argv[1:]:
+    args = iter(sys.argv[1:])
+    for arg in args:
         match arg:
             case "--gui":
-                Settings.GUI = True
+                settings.GUI = True
+
+            case "--profile-startup":
+                settings.PROFILE_STARTUP = True
+
+            case "--json":
+                settings.JSON = True
+
+            case "--force":
+                settings.FORCE = True
+
+            case "--to":
+                settings.TO = next(args, None)
+
+                if settings.TO is None:
+                    print("--to needs a destination")
+                    unkown_arguments = True
+
+            case "--trace":
+                settings.TRACE = next(args, None)
+
+                if settings.TRACE is None:
+                    print("--trace needs a file to write")
+                    unkown_arguments = True
+
+            case _ if arg in COMMANDS and settings.COMMAND is None:
+                settings.COMMAND = arg
+
+            case _ if not arg.startswith("-") and settings.COMMAND is not None:
+                settings.ARGUMENTS.append(arg)
 
             case _:
                 print(f"unknown argument: {arg}")
                 unkown_arguments = True
 
+    if settings.COMMAND is not None:
+        fewest, most = COMMANDS[settings.COMMAND]
+
+        if not fewest <= settings.ARGUMENTS.__len__() <= most:
+            print(f"{settings.COMMAND} takes {fewest} to {most} argument(s)")
+            unkown_arguments = True
+
+        if settings.TO is not None and settings.ARGUMENTS.__len__() > 1:
+            print("--to can only be used with a single pack")
+            unkown_arguments = True
+
     if unkown_arguments:
         return 1
 
-    if Settings.GUI:
+    if settings.TRACE is None:
+        return runSettings(settings, started)
+
+    from minecraft_pack_manager.lib import trace
+
+    trace.startTracing()
+
+    try:
+        return runSettings(settings, started)
+
+    finally:
+        events = trace.writeTrace(Path(settings.TRACE))
+        print(f"wrote {events} trace events to {settings.TRACE}", file=sys.stderr)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runSettings(settings: Settings, started: float) -> int:
+    if settings.COMMAND is not None:
+        return runCommand(settings)
+
+    if settings.GUI:
         from minecraft_pack_manager.gui.main import main as gui_main
 
-        return gui_main()
+        return gui_main(settings.PROFILE_STARTUP, started)
 
     return 0
 
 
 # < ----------------------------------------------------------------------- > #
+
+
+def runCommand(settings: Settings) -> int:
+    match settings.COMMAND:
+        case "help":
+            return printHelp()
+
+        case "version":
+            return printVersion()
+
+        case "list-local":
+            from minecraft_pack_manager.lib.transfer import listLocalPacks
+
+            return printList(listLocalPacks(), settings.JSON)
+
+        case "list-remote":
+            from minecraft_pack_manager.lib.transfer import listRemotePacks
+
+            return printList(listRemotePacks(force=settings.FORCE), settings.JSON)
+
+        case "upload":
+            destination = settings.TO or "Make New Folder"
+            pairs = [
+                (f"LOCL:{pack.removeprefix('LOCL:')}", destination) for pack in settings.ARGUMENTS
+            ]
+            return runTransfers(pairs, settings.JSON)
+
+        case "download":
+            destination = "Make New Folder"
+            if settings.TO is not None:
+                destination = f"LOCL:{settings.TO.removeprefix('LOCL:')}"
+
+            return runTransfers([(pack, destination) for pack in settings.ARGUMENTS], settings.JSON)
+
+        case "sync":
+            return runTransfers([(settings.ARGUMENTS[0], settings.ARGUMENTS[1])], settings.JSON)
+
+        case "dedupe":
+            return runDedupe(settings.JSON)
+
+        case "find-mod":
+            return findMod(settings.ARGUMENTS, settings.JSON)
+
+        case "build-assets":
+            return buildAssets(settings.JSON)
+
+        case _:
+            return 1
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def readManifest() -> dict[str, object]:
+    manifest = Path(__file__).parent.parent.joinpath("manifest.toml")
+
+    with open(manifest, "rb") as manifest_file:
+        return tomllib.load(manifest_file)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def printHelp() -> int:
+    help_text = readManifest().get("help_text", [])
+    colours = COLOURS if sys.stdout.isatty() else dict.fromkeys(COLOURS, "")
+
+    if type(help_text) is not list:
+        return 1
+
+    for line in help_text:
+        print(str(line).format(**colours))
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def printVersion() -> int:
+    print(json.dumps(readManifest().get("version", {})))
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def printList(names: list[str], as_json: bool) -> int:
+    if as_json:
+        print(json.dumps(names))
+        return 0
+
+    for name in names:
+        print(name)
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runTransfers(pairs: list[tuple[str, str]], as_json: bool) -> int:
+    from minecraft_pack_manager.lib.scheduler import TaskState, TransferTask, createScheduler
+
+    def onUpdate(task: TransferTask) -> None:
+        if as_json or task.state == TaskState.Running and task.stats is not None:
+            return
+
+        print(f"{task.state.name.lower()}: {task.source} -> {task.destination}")
+
+    # < every pack of the batch goes through the shared concurrency limits > #
+    scheduler = createScheduler(on_update=onUpdate)
+    tasks = [scheduler.submit(source, destination) for source, destination in pairs]
+
+    try:
+        scheduler.wait()
+    except KeyboardInterrupt:
+        scheduler.cancelAll()
+        scheduler.wait()
+
+    if as_json:
+        results = [
+            {
+                "source": task.source,
+                "destination": task.destination,
+                "state": task.state.name.lower(),
+                "exit_code": task.returncode,
+            }
+            for task in tasks
+        ]
+        print(json.dumps(results if results.__len__() > 1 else results[0]))
+
+    if all(task.state == TaskState.Done for task in tasks):
+        return 0
+
+    return 1
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def runDedupe(as_json: bool) -> int:
+    from minecraft_pack_manager.lib.store import dedupeInstances
+
+    result = dedupeInstances()
+
+    if as_json:
+        print(json.dumps({"files": result.files, "linked": result.linked, "saved": result.saved}))
+        return 0
+
+    print(f"linked {result.linked} of {result.files} files, {result.saved / 1024**2:.1f} MiB saved")
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def buildAssets(as_json: bool) -> int:
+    from minecraft_pack_manager.lib.assets import buildBundle, bundlePath
+
+    size = buildBundle()
+
+    if as_json:
+        print(json.dumps({"path": bundlePath().as_posix(), "size": size}))
+        return 0
+
+    print(f"wrote {bundlePath()}, {size / 1024:.1f} KiB")
+
+    return 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def findMod(arguments: list[str], as_json: bool) -> int:
+    from minecraft_pack_manager.lib.modindex import indexInstances, packsWithMod
+
+    # < only jars added or changed since the last search are opened > #
+    indexInstances()
+
+    version = arguments[1] if arguments.__len__() > 1 else None
+    found = packsWithMod(arguments[0], version)
+
+    if as_json:
+        print(json.dumps([{"pack": f"LOCL:{pack}", **vars(mod)} for pack, mod in found]))
+        return 0 if found else 1
+
+    for pack, mod in found:
+        print(f"LOCL:{pack} {mod.mod_id} {mod.version} ({mod.loader})")
+
+    return 0 if found else 1
+
+
+# < ----------------------------------------------------------------------- > #
@@ -1,6 +1,10 @@
-from minecraft_pack_manager import APP_PACKAGE
+from collections.abc import Callable
+
+from minecraft_pack_manager.gui.jobs import JobManager, TransferQueue
 from minecraft_pack_manager.gui.page import BasePage, Page
-from minecraft_pack_manager.lib.settings import APP_IMAGE_VAULT
+from minecraft_pack_manager.gui.watcher import InstanceWatcher
+from minecraft_pack_manager.lib.settings import APP_ASSETS
+from minecraft_pack_manager.lib.trace import span
 from PySide6.QtCore import QSize, Qt
 from PySide6.QtWidgets import (
     QApplication,
@@ -33,6 +37,17 @@ class Container(QWidget):
         self.icon_size = QSize(56, 56)
         self.secondary_icon_size = QSize(32, 32)
 
+        # < background work shared by all pages > #
+        self.jobs = JobManager(self)
+        self.app.aboutToQuit.connect(self.jobs.shutdown)
+
+        # < the local instance list, kept current by watching the instances folder > #
+        self.instances = InstanceWatcher(self, self.jobs)
+
+        # < every page queues its transfers on one shared scheduler > #
+        self.transfers = TransferQueue(self)
+        self.app.aboutToQuit.connect(self.transfers.shutdown)
+
         # < layout - margins > #
         self.setContentsMargins(0, 0, 0, 0)
 
@@ -44,14 +59,9 @@ class Container(QWidget):
         self.page_layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(self.page_layout)
 
-        # < styling > #
-        self.setWindowIcon(APP_IMAGE_VAULT.getImageIcon("mpm"))
-        self.setStyleSheet(APP_PACKAGE.getConfig().getStylesheet())
-
         # < widgets > #
-        # < widgets - background image > #
-        self.background_image = APP_IMAGE_VAULT.getImagePixmap("background")
-        self.background_image.scaled(self.app_window.size())
+        # < widgets - background image, baked at the window size > #
+        self.background_image = APP_ASSETS.getImagePixmap("background", self.app_window.size())
 
         # < a label is used to display the image > #
         self.background = QLabel()
@@ -69,15 +79,33 @@ class Container(QWidget):
         self.pages.setFixedSize(self.app_window.size())
         self.page_layout.addWidget(self.pages, 0, 0)
 
+        # < pages are only built the first time they are shown > #
+        self.factories: dict[Page, Callable[[], type[BasePage]]] = {}
+        self.built: dict[Page, BasePage] = {}
+
     # < ------------------------------------------------------------------- > #
 
-    def addPage(self, page: type[BasePage]) -> None:
-        self.pages.addWidget(page(app=self.app, container=self))
+    def addPage(self, page: Page, factory: Callable[[], type[BasePage]]) -> None:
+        self.factories[page] = factory
+
+    # < ------------------------------------------------------------------- > #
+
+    def buildPage(self, page: Page) -> BasePage:
+        built = self.built.get(page)
+
+        if built is None:
+            with span("gui.page_construction", page=page.name):
+                built = self.factories[page]()(app=self.app, container=self)
+
+            self.built[page] = built
+            self.pages.addWidget(built)
+
+        return built
 
     # < ------------------------------------------------------------------- > #
 
     def setPage(self, page: Page) -> None:
-        self.pages.setCurrentIndex(page.value)
+        self.pages.setCurrentWidget(self.buildPage(page))
 
     # < ------------------------------------------------------------------- > #
 
@@ -0,0 +1,224 @@
+from collections.abc import Callable
+from threading import Event
+
+from minecraft_pack_manager import APP_LOGGER
+from minecraft_pack_manager.lib.scheduler import TransferTask, createScheduler
+from minecraft_pack_manager.lib.trace import span
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class JobSignals(QObject):
+    # < every signal carries the job so the manager can route it > #
+    progress = Signal(object, object)
+    finished = Signal(object, object)
+    failed = Signal(object, str)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class Job(QRunnable):
+    def __init__(
+        self,
+        name: str,
+        function: Callable[["Job"], object],
+        on_finished: Callable[[object], None] | None = None,
+        on_progress: Callable[[object], None] | None = None,
+        on_failed: Callable[[str], None] | None = None,
+    ) -> None:
+        super().__init__()
+
+        # < attributes > #
+        self.name: str = name
+        self.function: Callable[[Job], object] = function
+
+        self.on_finished: Callable[[object], None] | None = on_finished
+        self.on_progress: Callable[[object], None] | None = on_progress
+        self.on_failed: Callable[[str], None] | None = on_failed
+
+        self.cancel_event = Event()
+        self.signals = JobSignals()
+
+        # < the manager keeps a reference until the job is done > #
+        self.setAutoDelete(False)
+
+    # < ------------------------------------------------------------------- > #
+
+    def run(self) -> None:
+        try:
+            with span("job.run", job=self.name):
+                result = self.function(self)
+
+        # < jobs run arbitrary work, anything escaping would leave the job unfinished > #
+        except Exception as error:  # noqa: BLE001
+            APP_LOGGER.exception(f"job {self.name} failed: {error}")
+            self.signals.failed.emit(self, str(error))
+            return
+
+        self.signals.finished.emit(self, result)
+
+    # < ------------------------------------------------------------------- > #
+
+    def report(self, value: object) -> None:
+        if self.isCancelled():
+            return
+
+        self.signals.progress.emit(self, value)
+
+    # < ------------------------------------------------------------------- > #
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    # < ------------------------------------------------------------------- > #
+
+    def isCancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class JobManager(QObject):
+    def __init__(self, parent: QObject | None = None, max_threads: int = 4) -> None:
+        super().__init__(parent)
+
+        # < attributes > #
+        self.jobs: dict[str, Job] = {}
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+
+    # < ------------------------------------------------------------------- > #
+
+    def submit(
+        self,
+        name: str,
+        function: Callable[[Job], object],
+        on_finished: Callable[[object], None] | None = None,
+        on_progress: Callable[[object], None] | None = None,
+        on_failed: Callable[[str], None] | None = None,
+    ) -> Job:
+        # < a new job supersedes a running job of the same name > #
+        self.cancel(name)
+
+        job = Job(name, function, on_finished, on_progress, on_failed)
+
+        # < the manager lives on the gui thread, so these are queued > #
+        job.signals.progress.connect(self.onProgress)
+        job.signals.finished.connect(self.onFinished)
+        job.signals.failed.connect(self.onFailed)
+
+        self.jobs[name] = job
+        self.pool.start(job)
+
+        return job
+
+    # < ------------------------------------------------------------------- > #
+
+    def isRunning(self, name: str) -> bool:
+        return name in self.jobs
+
+    # < ------------------------------------------------------------------- > #
+
+    def cancel(self, name: str) -> None:
+        job = self.jobs.pop(name, None)
+
+        if job is None:
+            return
+
+        APP_LOGGER.debug(f"cancelling job {name}")
+        job.cancel()
+
+    # < ------------------------------------------------------------------- > #
+
+    def cancelAll(self) -> None:
+        for name in list(self.jobs):
+            self.cancel(name)
+
+    # < ------------------------------------------------------------------- > #
+
+    def shutdown(self, timeout_ms: int = 5000) -> None:
+        self.cancelAll()
+        self.pool.waitForDone(timeout_ms)
+
+    # < ------------------------------------------------------------------- > #
+
+    def release(self, job: Job) -> bool:
+        # < results of cancelled or superseded jobs are dropped > #
+        if job.isCancelled():
+            return False
+
+        if self.jobs.get(job.name) is job:
+            del self.jobs[job.name]
+
+        return True
+
+    # < ------------------------------------------------------------------- > #
+
+    @Slot(object, object)
+    def onProgress(self, job: Job, value: object) -> None:
+        if job.isCancelled() or job.on_progress is None:
+            return
+
+        job.on_progress(value)
+
+    # < ------------------------------------------------------------------- > #
+
+    @Slot(object, object)
+    def onFinished(self, job: Job, result: object) -> None:
+        if not self.release(job) or job.on_finished is None:
+            return
+
+        job.on_finished(result)
+
+    # < ------------------------------------------------------------------- > #
+
+    @Slot(object, str)
+    def onFailed(self, job: Job, message: str) -> None:
+        if not self.release(job) or job.on_failed is None:
+            return
+
+        job.on_failed(message)
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class TransferQueue(QObject):
+    # < emitted from scheduler threads, delivered on the gui thread > #
+    updated = Signal(object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+
+        # < attributes > #
+        self.scheduler = createScheduler(on_update=self.updated.emit)
+
+    # < ------------------------------------------------------------------- > #
+
+    def submit(self, source: str, destination: str, priority: int = 0) -> TransferTask:
+        return self.scheduler.submit(source, destination, priority)
+
+    # < ------------------------------------------------------------------- > #
+
+    def cancel(self, tasks: list[TransferTask]) -> None:
+        for task in tasks:
+            self.scheduler.cancel(task)
+
+    # < ------------------------------------------------------------------- > #
+
+    def shutdown(self) -> None:
+        self.scheduler.cancelAll()
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
@@ -1,27 +1,94 @@
+import importlib
 import sys
+import time
 
-from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE, APP_PATHS
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from minecraft_pack_manager import APP_LOGGER, APP_PATHS
 from minecraft_pack_manager.gui.container import Container
-from minecraft_pack_manager.gui.page import BasePage
-from minecraft_pack_manager.gui.pages.download import DownloadPage
-from minecraft_pack_manager.gui.pages.help import HelpPage
-from minecraft_pack_manager.gui.pages.home import HomePage
-from minecraft_pack_manager.gui.pages.play import PlayPage
-from minecraft_pack_manager.gui.pages.settings import SettingsPage
-from minecraft_pack_manager.gui.pages.upload import UploadPage
-from minecraft_pack_manager.lib.settings import APP_FONT_VAULT, APP_IMAGE_VAULT
-from photon.lib.paths import Paths
-from PySide6.QtCore import QDir, QSize
+from minecraft_pack_manager.gui.page import BasePage, Page
+from minecraft_pack_manager.lib import assets
+from minecraft_pack_manager.lib.settings import APP_ASSETS
+from minecraft_pack_manager.lib.trace import span
+from PySide6.QtCore import QDir, QSize, QTimer
+from PySide6.QtGui import QPaintEvent
 from PySide6.QtWidgets import QApplication, QMainWindow
 
 
 # < ----------------------------------------------------------------------- > #
 
 
+# < page -> (module in gui/pages, class), imported the first time the page is shown > #
+PAGE_MODULES: dict[Page, tuple[str, str]] = {
+    Page.Home: ("home", "HomePage"),
+    Page.Upload: ("upload", "UploadPage"),
+    Page.Download: ("download", "DownloadPage"),
+    Page.Play: ("play", "PlayPage"),
+    Page.Settings: ("settings", "SettingsPage"),
+    Page.Help: ("help", "HelpPage"),
+}
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class StartupProfile:
+    enabled: bool = False
+    started: float = field(default_factory=time.perf_counter)
+    last: float = 0.0
+    phases: list[tuple[str, float]] = field(default_factory=list)
+
+    # < ------------------------------------------------------------------- > #
+
+    def mark(self, phase: str) -> None:
+        # < the time since the previous mark is charged to phase > #
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self.phases.append((phase, now - (self.last or self.started)))
+        self.last = now
+
+    # < ------------------------------------------------------------------- > #
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+
+        for phase, seconds in self.phases:
+            print(f"{phase:<20} {seconds * 1000:8.1f} ms")
+
+        print(f"{'first frame':<20} {(self.last - self.started) * 1000:8.1f} ms")
+
+    # < ------------------------------------------------------------------- > #
+
+
 # < ----------------------------------------------------------------------- > #
 
 
-def main() -> int:
+def pageFactory(page: Page) -> Callable[[], type[BasePage]]:
+    module_name, class_name = PAGE_MODULES[page]
+
+    def factory() -> type[BasePage]:
+        module = importlib.import_module(f"minecraft_pack_manager.gui.pages.{module_name}")
+        return getattr(module, class_name)
+
+    return factory
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def main(profile_startup: bool = False, started: float | None = None) -> int:
+    profile = StartupProfile(profile_startup)
+
+    if started is not None:
+        profile.started = started
+
+    profile.mark("imports")
+
     name = "Minecraft Pack Manager"
     version = "1.0.1"
     window_title: str = f"{name} {version}"
@@ -31,18 +98,22 @@ def main() -> int:
     window_size = QSize(width, height)
 
     application = QApplication(sys.argv)
+    profile.mark("application")
+
+    with span("gui.plugin_discovery"):
+        for entry in APP_PATHS.root().joinpath("third_party", "qt", "plugins").rglob("*"):
+            extension: list[str] = entry.name.split(entry.stem)
 
-    for entry in APP_PATHS.root().joinpath("third_party", "qt", "plugins").rglob("*"):
-        extension: list[str] = entry.name.split(entry.stem)
+            if extension.__len__() < 2:
+                extension.insert(0, "")
 
-        if extension.__len__() < 2:
-            extension.insert(0, "")
+            if extension[1] in [".so", ".dll"]:
+                APP_LOGGER.debug(f"loading {extension[1]}: {entry}")
+                application.addLibraryPath(entry.resolve().as_posix())
 
-        if extension[1] in [".so", ".dll"]:
-            APP_LOGGER.debug(f"loading {extension[1]}: {entry}")
-            application.addLibraryPath(entry.resolve().as_posix())
+    profile.mark("plugin discovery")
 
-    mpm = MinecraftPackManager(window_title, window_size, application)
+    mpm = MinecraftPackManager(window_title, window_size, application, profile)
     mpm.show()
 
     return application.exec_()
@@ -52,13 +123,21 @@ def main() -> int:
 
 
 class MinecraftPackManager(QMainWindow):
-    def __init__(self, window_title: str, window_size: QSize, app: QApplication) -> None:
+    def __init__(
+        self,
+        window_title: str,
+        window_size: QSize,
+        app: QApplication,
+        profile: StartupProfile | None = None,
+    ) -> None:
         super().__init__()
 
         # < attributes > #
         self.window_title: str = window_title
         self.window_size: QSize = window_size
         self.app: QApplication = app
+        self.profile: StartupProfile = profile or StartupProfile()
+        self.first_frame: bool = True
 
         # < layout - margins> #
         self.setContentsMargins(0, 0, 0, 0)
@@ -69,36 +148,51 @@ class MinecraftPackManager(QMainWindow):
         # < layout - window title > #
         self.setWindowTitle(self.window_title)
 
-        # < load images > #
+        # < load images, from the asset bundle when it is current > #
         QDir.addSearchPath("images", APP_PATHS.images())
-        APP_IMAGE_VAULT.loadFromPath(Paths("photon").images())
-        APP_IMAGE_VAULT.loadFromPath(APP_PATHS.images())
+        self.setWindowIcon(APP_ASSETS.getImageIcon("mpm"))
+        self.profile.mark("image vault")
 
         # < load fonts > #
-        APP_FONT_VAULT.loadFromPath(Paths("photon").fonts())
-        APP_FONT_VAULT.loadFromPath(APP_PATHS.fonts())
-        APP_FONT_VAULT.reloadFontDatabase()
+        APP_ASSETS.loadFonts()
+        self.profile.mark("font database")
 
-        # < styling > #
-        self.setWindowIcon(APP_IMAGE_VAULT.getImageIcon("mpm"))
-        self.setStyleSheet(APP_PACKAGE.getConfig().getStylesheet())
+        # < styling, the container and pages inherit it from the window > #
+        self.setStyleSheet(APP_ASSETS.stylesheet())
+        self.profile.mark("stylesheet")
 
         # < container > #
         container = Container(self.app, self)
         self.setCentralWidget(container)
+        self.profile.mark("container")
+
+        # < register all pages, only home is built before the window shows > #
+        for page in Page:
+            container.addPage(page, pageFactory(page))
+
+        container.setPage(Page.Home)
+        self.profile.mark("page construction")
+
+    # < ------------------------------------------------------------------- > #
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+
+        # < children paint after the window, so wait for the rest of this frame > #
+        if self.first_frame:
+            self.first_frame = False
+            QTimer.singleShot(0, self.firstFrame)
+
+    # < ------------------------------------------------------------------- > #
+
+    def firstFrame(self) -> None:
+        self.profile.mark("show and paint")
+        self.profile.report()
 
-        # < add all pages > #
-        pages: tuple[type[BasePage]] = (
-            HomePage,
-            UploadPage,
-            DownloadPage,
-            PlayPage,
-            SettingsPage,
-            HelpPage,
-        )
-
-        for page in pages:
-            container.addPage(page)
+        # < a missing or stale bundle is rebuilt in the background for the next start > #
+        if APP_ASSETS.bundle is None:
+            container: Container = self.centralWidget()
+            container.jobs.submit("assets.bundle", lambda job: assets.buildBundle())
 
     # < ------------------------------------------------------------------- > #
 
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtWidgets import QApplication, QComboBox, QWidget
 
 
 # < ----------------------------------------------------------------------- > #
@@ -26,5 +26,46 @@ class BasePage(QWidget):
         self.app: QApplication = app
         self.container = container
 
+    # < ------------------------------------------------------------------- > #
+
+    def setItems(self, to_update: QComboBox, items: list[str], fixed: tuple[str, ...] = ()) -> None:
+        # < replace instead of append so refreshing never duplicates entries > #
+        current = to_update.currentText()
+
+        to_update.clear()
+        to_update.addItems(list(fixed))
+        to_update.addItems(items)
+
+        index = to_update.findText(current)
+        if index >= 0:
+            to_update.setCurrentIndex(index)
+
+    # < ------------------------------------------------------------------- > #
+
+    def setEntries(self, to_update: QComboBox, entries: list[tuple[str, str]]) -> None:
+        # < (value, label) pairs in order, updated in place so the selection survives > #
+        wanted = dict(entries)
+
+        for index in reversed(range(to_update.count())):
+            if to_update.itemData(index) not in wanted:
+                to_update.removeItem(index)
+
+        for position, (value, label) in enumerate(entries):
+            index = to_update.findData(value)
+
+            if index < 0:
+                to_update.insertItem(position, label, value)
+            elif to_update.itemText(index) != label:
+                to_update.setItemText(index, label)
+
+    # < ------------------------------------------------------------------- > #
+
+    def mergeItems(self, to_update: QComboBox, items: list[str]) -> None:
+        for item in items:
+            if to_update.findText(item) < 0:
+                to_update.addItem(item)
+
+    # < ------------------------------------------------------------------- > #
+
 
 # < ----------------------------------------------------------------------- > #
@@ -1,12 +1,20 @@
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, cast
 
 from minecraft_pack_manager.gui.container import Container
 from minecraft_pack_manager.gui.page import BasePage, Page
+from minecraft_pack_manager.gui.progress import TransferProgress
 from minecraft_pack_manager.lib import transfer
+from minecraft_pack_manager.lib.instances import InstanceInfo
 from PySide6.QtCore import Qt
+from PySide6.QtGui import QShowEvent
 from PySide6.QtWidgets import QApplication, QComboBox, QGridLayout, QLabel, QPushButton
 
 
+if TYPE_CHECKING:
+    from minecraft_pack_manager.lib.scheduler import TransferTask
+
+
 # < ----------------------------------------------------------------------- > #
 
 
@@ -80,7 +88,7 @@ class DownloadPage(BasePage):
         self.refresh_button = QPushButton("Refresh")
         self.refresh_button.setFixedSize(self.container.secondary_button_size)
 
-        self.refresh_button.clicked.connect(lambda: self.refreshLists())
+        self.refresh_button.clicked.connect(lambda: self.refreshLists(force=True))
         self.page_layout.addWidget(self.refresh_button, 3, 1)
 
         # < page widgets - continue button > #
@@ -97,16 +105,85 @@ class DownloadPage(BasePage):
         self.home_button.clicked.connect(lambda: self.container.setPage(Page.Home))
         self.page_layout.addWidget(self.home_button, 3, 3)
 
+        # < page widgets - transfer progress > #
+        self.progress = TransferProgress(self.container.secondary_button_size)
+
+        self.progress.cancelled.connect(lambda: self.cancelTransfer())
+        self.page_layout.addWidget(self.progress, 4, 0, 1, 4)
+
+        # < transfers queued from this page > #
+        self.tasks: list[TransferTask] = []
+        self.container.transfers.updated.connect(self.transferUpdated)
+
+        # < the watcher reports every instance added, removed or changed > #
+        self.container.instances.changed.connect(self.showLocalInstances)
+
+    # < ------------------------------------------------------------------- > #
+
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+
+        # < cached listings make opening the page instant > #
+        if not self.container.jobs.isRunning("download.remote"):
+            self.refreshLists()
+
+    # < ------------------------------------------------------------------- > #
+
+    def refreshLists(self, force: bool = False) -> None:
+        self.container.jobs.submit(
+            "download.remote",
+            lambda job: transfer.listRemotePacks(job.cancel_event, job.report, force),
+            on_finished=self.showRemotePacks,
+            on_progress=self.mergeRemotePacks,
+        )
+        self.container.instances.refresh()
+
+    # < ------------------------------------------------------------------- > #
+
+    def showRemotePacks(self, names: object) -> None:
+        self.setItems(self.source_input, cast(list[str], names), ())
+
+    # < ------------------------------------------------------------------- > #
+
+    def mergeRemotePacks(self, names: object) -> None:
+        self.mergeItems(self.source_input, cast(list[str], names))
+
     # < ------------------------------------------------------------------- > #
 
-    def refreshLists(self) -> None:
-        transfer.updateListFromRemote(self.source_input)
-        transfer.updateListFromLocal(self.destination_input)
+    def showLocalInstances(self, infos: object) -> None:
+        names = [f"LOCL:{info.name}" for info in cast(list[InstanceInfo], infos)]
+        self.setItems(self.destination_input, names, ("Make New Folder",))
 
     # < ------------------------------------------------------------------- > #
 
     def continueTransfer(self) -> None:
-        transfer.transfer(self.source_input, self.destination_input)
+        source_text = self.source_input.currentText()
+        destination_text = self.destination_input.currentText()
+
+        # < a new batch starts once everything queued before has finished > #
+        if all(task.isFinished() for task in self.tasks):
+            self.tasks.clear()
+            self.progress.start()
+
+        task = self.container.transfers.submit(source_text, destination_text)
+
+        if task not in self.tasks:
+            self.tasks.append(task)
+
+        self.progress.showTasks(self.tasks)
+
+    # < ------------------------------------------------------------------- > #
+
+    def transferUpdated(self, task: object) -> None:
+        if task not in self.tasks:
+            return
+
+        self.progress.showTasks(self.tasks)
+
+    # < ------------------------------------------------------------------- > #
+
+    def cancelTransfer(self) -> None:
+        self.container.transfers.cancel(self.tasks)
 
     # < ------------------------------------------------------------------- > #
 
@@ -1,6 +1,6 @@
 from minecraft_pack_manager.gui.container import Container
 from minecraft_pack_manager.gui.page import BasePage, Page
-from minecraft_pack_manager.lib.settings import APP_IMAGE_VAULT
+from minecraft_pack_manager.lib.settings import APP_ASSETS
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QApplication, QGridLayout, QLabel, QPushButton
 
@@ -42,7 +42,7 @@ class HomePage(BasePage):
         # < page buttons - upload > #
         self.upload_button = QPushButton("Upload")
 
-        self.upload_button_icon = APP_IMAGE_VAULT.getImageIcon("upload")
+        self.upload_button_icon = APP_ASSETS.getImageIcon("upload")
         self.upload_button.setIcon(self.upload_button_icon)
 
         self.upload_button.clicked.connect(lambda: self.container.setPage(Page.Upload))
@@ -51,7 +51,7 @@ class HomePage(BasePage):
         # < page buttons - download > #
         self.download_button = QPushButton("Download")
 
-        self.download_button_icon = APP_IMAGE_VAULT.getImageIcon("download")
+        self.download_button_icon = APP_ASSETS.getImageIcon("download")
         self.download_button.setIcon(self.download_button_icon)
 
         self.download_button.clicked.connect(lambda: self.container.setPage(Page.Download))
@@ -60,7 +60,7 @@ class HomePage(BasePage):
         # < page buttons - play > #
         self.play_button = QPushButton("Play")
 
-        self.play_button_icon = APP_IMAGE_VAULT.getImageIcon("mojang")
+        self.play_button_icon = APP_ASSETS.getImageIcon("mojang")
         self.play_button.setIcon(self.play_button_icon)
 
         self.play_button.clicked.connect(lambda: self.container.setPage(Page.Play))
@@ -69,7 +69,7 @@ class HomePage(BasePage):
         # < page buttons - settings > #
         self.settings_button = QPushButton("Settings")
 
-        self.settings_button_icon = APP_IMAGE_VAULT.getImageIcon("settings")
+        self.settings_button_icon = APP_ASSETS.getImageIcon("settings")
         self.settings_button.setIcon(self.settings_button_icon)
 
         self.settings_button.clicked.connect(lambda: self.container.setPage(Page.Settings))
@@ -78,7 +78,7 @@ class HomePage(BasePage):
         # < page buttons - help > #
         self.help_button = QPushButton("Help")
 
-        self.help_button_icon = APP_IMAGE_VAULT.getImageIcon("help")
+        self.help_button_icon = APP_ASSETS.getImageIcon("help")
         self.help_button.setIcon(self.help_button_icon)
 
         self.help_button.clicked.connect(lambda: self.container.setPage(Page.Help))
@@ -87,7 +87,7 @@ class HomePage(BasePage):
         # < page buttons - quit > #
         self.quit_button = QPushButton("Quit")
 
-        self.quit_button_icon = APP_IMAGE_VAULT.getImageIcon("closed")
+        self.quit_button_icon = APP_ASSETS.getImageIcon("closed")
         self.quit_button.setIcon(self.quit_button_icon)
 
         self.quit_button.clicked.connect(lambda: self.app.quit())
@@ -8,8 +8,9 @@ from minecraft_pack_manager import APP_PACKAGE
 from minecraft_pack_manager.gui.container import Container
 from minecraft_pack_manager.gui.dialogs import InvalidSettingDialog, ValidSettingDialog
 from minecraft_pack_manager.gui.page import BasePage, Page
-from minecraft_pack_manager.lib.settings import APP_IMAGE_VAULT
-from PySide6.QtCore import Qt
+from minecraft_pack_manager.lib.settings import APP_ASSETS
+from minecraft_pack_manager.lib.tuning import parseOverrides
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import QApplication, QGridLayout, QLabel, QLineEdit, QPushButton
 
 
@@ -61,6 +62,7 @@ class SettingsPage(BasePage):
         self.settings: dict[str, str] = {
             "Instances Path:": "path",
             "Launcher Path:": "path",
+            "Rclone Overrides:": "flags",
         }
 
         row = 1
@@ -93,7 +95,7 @@ class SettingsPage(BasePage):
                 self.container.secondary_button_size.height(),
             )
 
-            setting_icon_icon = APP_IMAGE_VAULT.getImageIcon("offline")
+            setting_icon_icon = APP_ASSETS.getImageIcon("offline")
             setting_icon.setIcon(setting_icon_icon)
             setting_icon.setIconSize(self.container.secondary_icon_size)
 
@@ -136,7 +138,9 @@ class SettingsPage(BasePage):
         self.page_layout.addWidget(self.home_button, row, 3)
 
         self.loadSettings()
-        self.validateSettings()
+
+        # < validating touches every configured path, so let the page paint first > #
+        QTimer.singleShot(0, self.validateSettings)
 
     # < ------------------------------------------------------------------- > #
 
@@ -171,6 +175,10 @@ class SettingsPage(BasePage):
         config = APP_PACKAGE.getConfig().getConfig()
 
         for setting in config:
+            # < config may hold tuning values that have no input widget > #
+            if setting not in self.settings_widgets:
+                continue
+
             self.settings_widgets[setting].input.setText(config[setting])
 
     # < ------------------------------------------------------------------- > #
@@ -202,6 +210,24 @@ class SettingsPage(BasePage):
 
     # < ------------------------------------------------------------------- > #
 
+    def invalidFlagsSetting(self, message: str = "Invalid Flags") -> None:
+        dialog = InvalidSettingDialog(self, message, accept_show=False)
+        dialog.exec_()
+
+    # < ------------------------------------------------------------------- > #
+
+    def validFlagsSetting(self, setting: Setting) -> None:
+        dialog = ValidSettingDialog(self, "Valid Flags", accept_show=False)
+        dialog.exec_()
+
+        config = APP_PACKAGE.getConfig().getConfig()
+        config[setting.name] = setting.input.text()
+
+        APP_PACKAGE.getConfig().setConfig(config)
+        APP_PACKAGE.getConfig().writeConfig()
+
+    # < ------------------------------------------------------------------- > #
+
     def invalidSetting(self, setting: Setting | None = None) -> None:
         print("invalid")
 
@@ -216,6 +242,9 @@ class SettingsPage(BasePage):
                 case "path":
                     self.validatePathSetting(setting)
 
+                case "flags":
+                    self.validateFlagsSetting(setting)
+
                 case _:
                     print(f"unknown setting_type: {setting_type}")
 
@@ -235,17 +264,34 @@ class SettingsPage(BasePage):
 
         if path.exists() and path.parts.__len__() > 3:
             setting.icon.clicked.connect(lambda: self.validPathSetting(setting))
-            icon = APP_IMAGE_VAULT.getImageIcon("online")
+            icon = APP_ASSETS.getImageIcon("online")
 
         elif path.parts.__len__() > 3:
             message = "Path does not exist"
             setting.icon.clicked.connect(lambda: self.invalidPathSetting(True, message, setting))
-            icon = APP_IMAGE_VAULT.getImageIcon("offline")
+            icon = APP_ASSETS.getImageIcon("offline")
 
         else:
             message = "Path too short or missing"
             setting.icon.clicked.connect(lambda: self.invalidPathSetting(False, message))
-            icon = APP_IMAGE_VAULT.getImageIcon("offline")
+            icon = APP_ASSETS.getImageIcon("offline")
+
+        setting.icon.setIcon(icon)
+
+    # < ------------------------------------------------------------------- > #
+
+    def validateFlagsSetting(self, setting: Setting) -> None:
+        # < empty means every value is tuned automatically > #
+        setting.icon.clicked.disconnect()
+
+        if parseOverrides(setting.input.text()) is not None:
+            setting.icon.clicked.connect(lambda: self.validFlagsSetting(setting))
+            icon = APP_ASSETS.getImageIcon("online")
+
+        else:
+            message = "Overrides must be rclone flags, e.g. --transfers=4 --buffer-size=8M"
+            setting.icon.clicked.connect(lambda: self.invalidFlagsSetting(message))
+            icon = APP_ASSETS.getImageIcon("offline")
 
         setting.icon.setIcon(icon)
 
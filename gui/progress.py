@@ -0,0 +1,94 @@
+from minecraft_pack_manager.lib.progress import TransferStats, combineStats
+from minecraft_pack_manager.lib.scheduler import TaskState, TransferTask
+from PySide6.QtCore import QSize, Signal
+from PySide6.QtWidgets import QGridLayout, QLabel, QProgressBar, QPushButton, QWidget
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class TransferProgress(QWidget):
+    cancelled = Signal()
+
+    def __init__(self, button_size: QSize) -> None:
+        super().__init__()
+
+        # < layout - margins > #
+        self.setContentsMargins(0, 0, 0, 0)
+
+        # < layout - widgets > #
+        self.progress_layout = QGridLayout()
+        self.progress_layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(self.progress_layout)
+
+        # < widgets - progress bar > #
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedHeight(button_size.height() // 2)
+
+        self.progress_layout.addWidget(self.progress_bar, 0, 0)
+
+        # < widgets - totals, rate, eta and the busiest file > #
+        self.status_label = QLabel("")
+        self.status_label.setObjectName("progressStatus")
+
+        self.progress_layout.addWidget(self.status_label, 1, 0)
+
+        # < widgets - cancel button > #
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFixedSize(button_size)
+
+        self.cancel_button.clicked.connect(lambda: self.cancelled.emit())
+        self.progress_layout.addWidget(self.cancel_button, 0, 1, 2, 1)
+
+        self.hide()
+
+    # < ------------------------------------------------------------------- > #
+
+    def start(self) -> None:
+        self.cancel_button.show()
+        self.progress_bar.setValue(0)
+        self.status_label.setText("starting transfer")
+        self.show()
+
+    # < ------------------------------------------------------------------- > #
+
+    def showStats(self, stats: TransferStats) -> None:
+        self.progress_bar.setValue(stats.percentage())
+
+        text = stats.describe()
+
+        if stats.files.__len__() > 0:
+            current = max(stats.files, key=lambda file: file.size)
+            text = f"{text}\n{current.name} {current.percentage}%"
+
+        self.status_label.setText(text)
+
+    # < ------------------------------------------------------------------- > #
+
+    def showTasks(self, tasks: list[TransferTask]) -> None:
+        counts = {state: 0 for state in TaskState}
+        for task in tasks:
+            counts[task.state] = counts[task.state] + 1
+
+        if all(task.isFinished() for task in tasks):
+            failed = counts[TaskState.Failed] + counts[TaskState.Cancelled]
+            self.progress_bar.setValue(100 if failed == 0 else self.progress_bar.value())
+            self.finish(f"{counts[TaskState.Done]} done, {failed} failed or cancelled")
+            return
+
+        self.showStats(combineStats([task.stats for task in tasks if task.stats is not None]))
+
+        summary = f"{counts[TaskState.Running]} running, {counts[TaskState.Queued]} queued"
+        self.status_label.setText(f"{summary}  {self.status_label.text()}")
+
+    # < ------------------------------------------------------------------- > #
+
+    def finish(self, message: str) -> None:
+        self.status_label.setText(message)
+        self.cancel_button.hide()
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
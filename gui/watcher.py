@@ -0,0 +1,150 @@
+from pathlib import Path
+
+from minecraft_pack_manager import APP_LOGGER
+from minecraft_pack_manager.gui.jobs import JobManager
+from minecraft_pack_manager.lib.instances import InstanceInfo, instanceCatalog, instancesPath
+from minecraft_pack_manager.lib.store import GAME_DIRECTORIES, STORE_DIRECTORIES
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < folders inside an instance whose changes are worth a rescan > #
+WATCHED_FOLDERS = (*STORE_DIRECTORIES, "saves", "config")
+
+DEBOUNCE_MS = 500
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class InstanceWatcher(QObject):
+    # < the full, current catalog, emitted after every update > #
+    changed = Signal(object)
+
+    def __init__(self, parent: QObject, jobs: JobManager) -> None:
+        super().__init__(parent)
+
+        # < attributes > #
+        self.jobs: JobManager = jobs
+        self.infos: list[InstanceInfo] = []
+        self.root: Path | None = None
+
+        # < instance name -> folders seen changing, gathered until the timer fires > #
+        self.pending: dict[str, set[str]] = {}
+        # < names handed to a job still running, kept in case a newer job supersedes it > #
+        self.running: dict[str, set[str]] = {}
+        self.full_running: bool = False
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.directoryChanged)
+
+        # < a launcher or a download touches many folders at once, rescan once they settle > #
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(DEBOUNCE_MS)
+        self.timer.timeout.connect(self.flush)
+
+    # < ------------------------------------------------------------------- > #
+
+    def refresh(self) -> None:
+        # < every instance, each still only rereads the folders whose mtime moved > #
+        self.timer.stop()
+        self.pending.clear()
+        self.running.clear()
+        self.full_running = True
+
+        self.jobs.submit(
+            "instances.catalog",
+            lambda job: instanceCatalog(job.cancel_event),
+            on_finished=self.apply,
+        )
+
+    # < ------------------------------------------------------------------- > #
+
+    def directoryChanged(self, path: str) -> None:
+        if self.root is None:
+            return
+
+        changed = Path(path)
+
+        # < the instances folder itself, an instance was added, removed or renamed > #
+        if changed == self.root:
+            self.timer.start()
+            return
+
+        try:
+            relative = changed.relative_to(self.root).parts
+        except ValueError:
+            return
+
+        name, folder = relative[0], "/".join(relative[1:])
+        self.pending.setdefault(name, set()).add(folder)
+        self.timer.start()
+
+    # < ------------------------------------------------------------------- > #
+
+    def flush(self) -> None:
+        for name, folders in self.pending.items():
+            self.running.setdefault(name, set()).update(folders)
+
+        self.pending.clear()
+
+        # < a full refresh this job replaces still has to happen > #
+        changed = None
+
+        if not self.full_running:
+            changed = {name: set(folders) for name, folders in self.running.items()}
+            APP_LOGGER.debug(f"rescanning changed instances: {sorted(changed)}")
+
+        self.jobs.submit(
+            "instances.catalog",
+            lambda job: instanceCatalog(job.cancel_event, changed),
+            on_finished=self.apply,
+        )
+
+    # < ------------------------------------------------------------------- > #
+
+    def apply(self, infos: object) -> None:
+        self.infos = list(infos) if isinstance(infos, list) else []
+        self.running.clear()
+        self.full_running = False
+
+        self.updateWatches()
+        self.changed.emit(self.infos)
+
+    # < ------------------------------------------------------------------- > #
+
+    def updateWatches(self) -> None:
+        root = instancesPath()
+
+        if root is None:
+            return
+
+        self.root = root
+        wanted = {root.as_posix()}
+
+        for info in self.infos:
+            instance = root.joinpath(info.name)
+            games = [instance, *(instance.joinpath(name) for name in GAME_DIRECTORIES)]
+
+            for game in games:
+                wanted.add(game.as_posix())
+                wanted.update(game.joinpath(folder).as_posix() for folder in WATCHED_FOLDERS)
+
+        # < qt drops folders that disappear, so only ones that exist are added > #
+        watched = set(self.watcher.directories())
+        stale = list(watched - wanted)
+        added = [path for path in wanted - watched if Path(path).is_dir()]
+
+        if stale:
+            self.watcher.removePaths(stale)
+
+        if added:
+            self.watcher.addPaths(added)
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,429 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE, APP_PATHS
+from photon.lib.paths import Paths
+
+
+if TYPE_CHECKING:
+    from PySide6.QtCore import QSize
+    from PySide6.QtGui import QIcon, QPixmap
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+BUNDLE_MAGIC = b"MPMB"
+BUNDLE_VERSION = 1
+# < magic, version, index length > #
+BUNDLE_HEADER = struct.Struct("<4sII")
+
+# < the container's icon_size and secondary_icon_size, and the window size > #
+ICON_SIZES = ((56, 56), (32, 32))
+BACKGROUND_SIZE = (720, 400)
+BACKGROUND_NAME = "background"
+# < rasters are baked for plain and high dpi screens > #
+SCALES = (1, 2)
+
+# < the vault keys images by stem, a vector source is preferred when several share one > #
+IMAGE_SUFFIXES = (".svg", ".png", ".ico")
+FONT_SUFFIXES = (".ttf", ".otf")
+
+MAX_CACHED_PIXMAPS = 64
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def bundlePath() -> Path:
+    return APP_PATHS.settings().joinpath("cache", "assets.bundle")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def stylesheetPaths() -> list[Path]:
+    return [
+        APP_PATHS.root().joinpath("settings", "stylesheet.css"),
+        APP_PATHS.settings().joinpath("stylesheet.css"),
+    ]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def assetSources() -> tuple[dict[str, Path], dict[str, Path]]:
+    # < (images by stem, fonts by file name), later folders win like the vault's load order > #
+    images: dict[str, Path] = {}
+    fonts: dict[str, Path] = {}
+
+    for folder in (Paths("photon").images(), APP_PATHS.images()):
+        found: dict[str, Path] = {}
+
+        for entry in sorted(Path(folder).glob("*")):
+            if entry.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+
+            current = found.get(entry.stem)
+            rank = IMAGE_SUFFIXES.index(entry.suffix.lower())
+
+            if current is None or rank < IMAGE_SUFFIXES.index(current.suffix.lower()):
+                found[entry.stem] = entry
+
+        images.update(found)
+
+    for folder in (Paths("photon").fonts(), APP_PATHS.fonts()):
+        for entry in sorted(Path(folder).glob("*")):
+            if entry.suffix.lower() in FONT_SUFFIXES:
+                fonts[entry.name] = entry
+
+    return images, fonts
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def sourceFingerprint(images: dict[str, Path], fonts: dict[str, Path]) -> str:
+    # < sizes and mtimes only, so checking the bundle is a few dozen stats > #
+    digest = hashlib.sha256(f"{BUNDLE_VERSION}".encode())
+
+    for path in [*images.values(), *fonts.values(), *stylesheetPaths()]:
+        try:
+            stat = path.stat()
+            digest.update(f"{path.as_posix()}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{path.as_posix()}:missing\n".encode())
+
+    return digest.hexdigest()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def rasterise(source: Path, width: int, height: int) -> bytes:
+    from PySide6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+    from PySide6.QtGui import QImage, QPainter
+    from PySide6.QtSvg import QSvgRenderer
+
+    data = QByteArray(source.read_bytes())
+
+    # < stretched to fill, the same as QPixmap.scaled with its defaults > #
+    if source.suffix.lower() == ".svg":
+        image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(image)
+        QSvgRenderer(data).render(painter)
+        painter.end()
+
+    else:
+        image = QImage.fromData(data).scaled(
+            width,
+            height,
+            Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+
+    output = QByteArray()
+    buffer = QBuffer(output)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+
+    return output.data()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def rasterKey(name: str, width: int, height: int) -> str:
+    return f"raster:{name}:{width}x{height}"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def buildBundle(path: Path | None = None) -> int:
+    # < bakes images, rasters, fonts and the stylesheet into one file, returns its size > #
+    from PySide6.QtCore import QByteArray
+    from PySide6.QtGui import QFontDatabase, QGuiApplication
+
+    path = bundlePath() if path is None else path
+    images, fonts = assetSources()
+    entries: dict[str, bytes] = {}
+
+    # < svg text needs a font database, from the cli there is no gui to provide one > #
+    application = QGuiApplication.instance()
+
+    if application is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        application = QGuiApplication([])
+
+        for source in fonts.values():
+            QFontDatabase.addApplicationFontFromData(QByteArray(source.read_bytes()))
+
+    for name, source in images.items():
+        entries[f"image:{name}"] = source.read_bytes()
+        sizes = [BACKGROUND_SIZE] if name == BACKGROUND_NAME else ICON_SIZES
+
+        for width, height in sizes:
+            for scale in SCALES:
+                raster = rasterise(source, width * scale, height * scale)
+                entries[rasterKey(name, width * scale, height * scale)] = raster
+
+    for name, source in fonts.items():
+        entries[f"font:{name}"] = source.read_bytes()
+
+    entries["stylesheet"] = APP_PACKAGE.getConfig().getStylesheet().encode()
+
+    offsets: dict[str, list[int]] = {}
+    offset = 0
+
+    for key, data in entries.items():
+        offsets[key] = [offset, data.__len__()]
+        offset = offset + data.__len__()
+
+    index = {"fingerprint": sourceFingerprint(images, fonts), "entries": offsets}
+    header = json.dumps(index).encode()
+
+    # < written beside the bundle and swapped in, a running gui may have it mapped > #
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.tmp")
+
+    with open(temporary, "wb") as bundle_file:
+        bundle_file.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, header.__len__()))
+        bundle_file.write(header)
+
+        for data in entries.values():
+            bundle_file.write(data)
+
+    os.replace(temporary, path)
+
+    APP_LOGGER.debug(f"built asset bundle: {entries.__len__()} entries, {path.stat().st_size} B")
+
+    return path.stat().st_size
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class AssetBundle:
+    def __init__(self, path: Path) -> None:
+        # < attributes > #
+        self.path: Path = path
+        self.entries: dict[str, list[int]] = {}
+        self.fingerprint: str = ""
+
+        with open(path, "rb") as bundle_file:
+            self.data = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_length = BUNDLE_HEADER.unpack_from(self.data)
+
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError(f"not a version {BUNDLE_VERSION} asset bundle: {path}")
+
+        index = json.loads(self.data[BUNDLE_HEADER.size : BUNDLE_HEADER.size + index_length])
+
+        self.fingerprint = index["fingerprint"]
+        self.entries = index["entries"]
+        self.start: int = BUNDLE_HEADER.size + index_length
+
+    # < ------------------------------------------------------------------- > #
+
+    def read(self, key: str) -> bytes | None:
+        # < only the pages holding this entry are faulted in > #
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return None
+
+        offset = self.start + entry[0]
+
+        return self.data[offset : offset + entry[1]]
+
+    # < ------------------------------------------------------------------- > #
+
+    def keys(self, prefix: str) -> list[str]:
+        return [key for key in self.entries if key.startswith(prefix)]
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def openBundle() -> AssetBundle | None:
+    path = bundlePath()
+
+    if not path.exists():
+        return None
+
+    try:
+        bundle = AssetBundle(path)
+    except (OSError, ValueError, KeyError, struct.error) as error:
+        APP_LOGGER.warning(f"ignoring unreadable asset bundle: {path}")
+        APP_LOGGER.debug(error)
+        return None
+
+    if bundle.fingerprint != sourceFingerprint(*assetSources()):
+        APP_LOGGER.debug("asset bundle is out of date, loading assets from disk")
+        return None
+
+    return bundle
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class Assets:
+    # < the bundle when it is current, the photon vaults otherwise > #
+    def __init__(self) -> None:
+        # < attributes > #
+        self.bundle: AssetBundle | None = openBundle()
+        self.vault_loaded: bool = False
+
+        # < decoded pixmaps and icons, least recently used first > #
+        self.cache: OrderedDict[tuple[str, int, int], object] = OrderedDict()
+
+    # < ------------------------------------------------------------------- > #
+
+    def loadVault(self) -> None:
+        if self.vault_loaded:
+            return
+
+        from minecraft_pack_manager.lib.settings import APP_IMAGE_VAULT
+
+        APP_IMAGE_VAULT.loadFromPath(Paths("photon").images())
+        APP_IMAGE_VAULT.loadFromPath(APP_PATHS.images())
+        self.vault_loaded = True
+
+    # < ------------------------------------------------------------------- > #
+
+    def cached(self, key: tuple[str, int, int]) -> object | None:
+        value = self.cache.get(key)
+
+        if value is not None:
+            self.cache.move_to_end(key)
+
+        return value
+
+    # < ------------------------------------------------------------------- > #
+
+    def remember(self, key: tuple[str, int, int], value: object) -> None:
+        self.cache[key] = value
+
+        while self.cache.__len__() > MAX_CACHED_PIXMAPS:
+            self.cache.popitem(last=False)
+
+    # < ------------------------------------------------------------------- > #
+
+    def rasterPixmap(self, name: str, width: int, height: int) -> "QPixmap | None":
+        from PySide6.QtGui import QPixmap
+
+        if self.bundle is None:
+            return None
+
+        key = (name, width, height)
+        pixmap = self.cached(key)
+
+        if pixmap is None:
+            data = self.bundle.read(rasterKey(name, width, height))
+
+            if data is None:
+                return None
+
+            pixmap = QPixmap()
+            pixmap.loadFromData(data, "PNG")
+            self.remember(key, pixmap)
+
+        return pixmap
+
+    # < ------------------------------------------------------------------- > #
+
+    def getImagePixmap(self, name: str, size: "QSize | None" = None) -> "QPixmap":
+        from PySide6.QtCore import Qt
+
+        if size is not None:
+            pixmap = self.rasterPixmap(name, size.width(), size.height())
+
+            if pixmap is not None:
+                return pixmap
+
+        self.loadVault()
+
+        from minecraft_pack_manager.lib.settings import APP_IMAGE_VAULT
+
+        pixmap = APP_IMAGE_VAULT.getImagePixmap(name)
+
+        if size is None:
+            return pixmap
+
+        return pixmap.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio)
+
+    # < ------------------------------------------------------------------- > #
+
+    def getImageIcon(self, name: str) -> "QIcon":
+        from PySide6.QtGui import QIcon
+
+        icon = self.cached((f"icon:{name}", 0, 0))
+
+        if icon is not None:
+            return icon
+
+        if self.bundle is not None and f"image:{name}" in self.bundle.entries:
+            icon = QIcon()
+
+            for width, height in ICON_SIZES:
+                for scale in SCALES:
+                    pixmap = self.rasterPixmap(name, width * scale, height * scale)
+
+                    if pixmap is not None:
+                        icon.addPixmap(pixmap)
+
+            self.remember((f"icon:{name}", 0, 0), icon)
+            return icon
+
+        self.loadVault()
+
+        from minecraft_pack_manager.lib.settings import APP_IMAGE_VAULT
+
+        return APP_IMAGE_VAULT.getImageIcon(name)
+
+    # < ------------------------------------------------------------------- > #
+
+    def loadFonts(self) -> None:
+        if self.bundle is None:
+            from minecraft_pack_manager.lib.settings import APP_FONT_VAULT
+
+            APP_FONT_VAULT.loadFromPath(Paths("photon").fonts())
+            APP_FONT_VAULT.loadFromPath(APP_PATHS.fonts())
+            APP_FONT_VAULT.reloadFontDatabase()
+            return
+
+        from PySide6.QtCore import QByteArray
+        from PySide6.QtGui import QFontDatabase
+
+        for key in self.bundle.keys("font:"):
+            QFontDatabase.addApplicationFontFromData(QByteArray(self.bundle.read(key) or b""))
+
+    # < ------------------------------------------------------------------- > #
+
+    def stylesheet(self) -> str:
+        data = None if self.bundle is None else self.bundle.read("stylesheet")
+
+        if data is None:
+            return APP_PACKAGE.getConfig().getStylesheet()
+
+        return data.decode()
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,148 @@
+import os
+import shutil
+
+from pathlib import Path
+
+from minecraft_pack_manager import APP_LOGGER
+from minecraft_pack_manager.lib.manifest import PackManifest
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < beside Modpacks/ on each upstream, so the pack listing never sees it > #
+BLOB_DIRECTORY = "blobs"
+# < files from this size up are shared, smaller ones stay in the pack > #
+DEFAULT_BLOB_THRESHOLD = 64 * 1024
+
+# < staging folders are made beside the instance, so links stay on one filesystem > #
+STAGING_PREFIX = ".mpm-blobs-"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def blobRemote(remote_path: str) -> str | None:
+    # < "A:HTZ0/Modpacks/pack" -> "A:HTZ0/blobs", None outside the combine layout > #
+    upstream, separator, _name = remote_path.partition("/Modpacks/")
+
+    if separator == "" or ":" not in upstream:
+        return None
+
+    return f"{upstream}/{BLOB_DIRECTORY}"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def blobPaths(manifest: PackManifest, threshold: int) -> list[str]:
+    return [path for path, entry in manifest.files.items() if entry.size >= threshold]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def neededBlobs(manifest: PackManifest, local: PackManifest | None) -> dict[str, list[str]]:
+    # < digest -> every path that needs it, one jar may sit in several folders > #
+    needed: dict[str, list[str]] = {}
+
+    for path in blobPaths(manifest, manifest.blobs):
+        entry = manifest.files[path]
+        current = None if local is None else local.files.get(path)
+
+        if current is not None and current.size == entry.size and current.digest == entry.digest:
+            continue
+
+        needed.setdefault(entry.digest, []).append(path)
+
+    return needed
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def staleLargeFiles(manifest: PackManifest, local: PackManifest) -> list[str]:
+    # < large local files the pack no longer has, rclone never sees them to delete > #
+    return [
+        path
+        for path, entry in local.files.items()
+        if entry.size >= manifest.blobs and path not in manifest.files
+    ]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def linkOrCopy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def stageBlobs(root: Path, manifest: PackManifest, paths: list[str], staging: Path) -> int:
+    # < lays files out under their digest, so rclone copies them straight into blobs/ > #
+    staged = 0
+
+    for path in paths:
+        target = staging.joinpath(manifest.files[path].digest)
+
+        if target.exists():
+            continue
+
+        linkOrCopy(root.joinpath(path), target)
+        staged = staged + 1
+
+    return staged
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def materialiseBlobs(
+    root: Path, manifest: PackManifest, needed: dict[str, list[str]], staging: Path
+) -> int:
+    # < returns the number of files placed, -1 if a blob is missing or cannot be placed > #
+    placed = 0
+    resolved_root = root.resolve()
+
+    try:
+        for digest, paths in needed.items():
+            blob = staging.joinpath(digest)
+
+            for path in paths:
+                target = root.joinpath(path)
+
+                # < never write outside the pack, whatever the manifest says > #
+                if ".." in Path(path).parts or not target.resolve().is_relative_to(resolved_root):
+                    APP_LOGGER.warning(f"skipping unsafe manifest path: {path}")
+                    continue
+
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temporary = target.with_name(f"{target.name}.mpm-tmp")
+                temporary.unlink(missing_ok=True)
+
+                # < links to one blob would share an mtime, so extra paths get copies > #
+                if paths.__len__() > 1:
+                    shutil.copyfile(blob, temporary)
+                else:
+                    linkOrCopy(blob, temporary)
+
+                mtime_ns = manifest.files[path].mtime_ns
+                os.utime(temporary, ns=(mtime_ns, mtime_ns))
+                temporary.replace(target)
+
+                placed = placed + 1
+
+    except OSError as error:
+        APP_LOGGER.error("failed to place downloaded blobs")
+        APP_LOGGER.debug(error)
+        return -1
+
+    return placed
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import time
+
+from pathlib import Path
+from threading import Lock
+
+from minecraft_pack_manager import APP_LOGGER, APP_PATHS
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+CACHE_VERSION = 1
+
+# < one lock per cache name, writers of different caches never wait on each other > #
+_WRITE_LOCKS: dict[str, Lock] = {}
+_WRITE_LOCKS_LOCK = Lock()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def cachePath(name: str) -> Path:
+    return APP_PATHS.settings().joinpath("cache", f"{name}.json")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def readCache(name: str, fingerprint: str) -> tuple[dict[str, object], float] | None:
+    # < returns the cached data and its age in seconds > #
+    path = cachePath(name)
+
+    if not path.exists():
+        return None
+
+    try:
+        with open(path) as cache_file:
+            cache = json.load(cache_file)
+
+    except (OSError, ValueError) as error:
+        APP_LOGGER.warning(f"discarding unreadable cache: {path}")
+        APP_LOGGER.debug(error)
+        return None
+
+    if type(cache) is not dict:
+        return None
+
+    if cache.get("version") != CACHE_VERSION or cache.get("fingerprint") != fingerprint:
+        return None
+
+    data = cache.get("data")
+    created = cache.get("created")
+
+    if type(data) is not dict or type(created) is not float:
+        return None
+
+    return data, max(0.0, time.time() - created)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def writeLock(name: str) -> Lock:
+    with _WRITE_LOCKS_LOCK:
+        return _WRITE_LOCKS.setdefault(name, Lock())
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def writeCache(name: str, fingerprint: str, data: dict[str, object]) -> bool:
+    # < returns whether the cache was written > #
+    path = cachePath(name)
+
+    cache = {
+        "version": CACHE_VERSION,
+        "fingerprint": fingerprint,
+        "created": time.time(),
+        "data": data,
+    }
+
+    # < write a private temporary file then rename, so a crash never leaves a half written > #
+    # < cache and concurrent writers never share one > #
+    with writeLock(name):
+        temporary = None
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.")
+
+            with os.fdopen(descriptor, "w") as cache_file:
+                json.dump(cache, cache_file)
+
+            os.replace(temporary, path)
+
+        except OSError as error:
+            APP_LOGGER.warning(f"failed to write cache: {path}")
+            APP_LOGGER.debug(error)
+
+            if temporary is not None:
+                Path(temporary).unlink(missing_ok=True)
+
+            return False
+
+    return True
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def clearCache(name: str) -> None:
+    cachePath(name).unlink(missing_ok=True)
+
+
+# < ----------------------------------------------------------------------- > #
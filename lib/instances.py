@@ -0,0 +1,359 @@
+import configparser
+import json
+import os
+import time
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from threading import Event
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE
+from minecraft_pack_manager.lib import cache
+from minecraft_pack_manager.lib.store import GAME_DIRECTORIES
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < launcher component uids and the loader each one means > #
+LOADER_COMPONENTS = {
+    "net.fabricmc.fabric-loader": "Fabric",
+    "org.quiltmc.quilt-loader": "Quilt",
+    "net.minecraftforge": "Forge",
+    "net.neoforged": "NeoForge",
+}
+
+# < files changed in place do not touch their folder's mtime, so walk fully now and then > #
+DEFAULT_RESCAN_AGE = 24 * 60 * 60
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class DirectoryRecord:
+    mtime_ns: int
+    size: int
+    files: int
+    children: list[str] = field(default_factory=list)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class InstanceInfo:
+    name: str
+    size: int = 0
+    files: int = 0
+    minecraft_version: str = ""
+    loader: str = ""
+    last_played: float = 0.0
+    worlds: int = 0
+    # < when the instance was last walked without reusing any folder > #
+    scanned: float = 0.0
+
+    # < ------------------------------------------------------------------- > #
+
+    def label(self) -> str:
+        details = [" ".join(part for part in (self.minecraft_version, self.loader) if part)]
+        details.append(formatSize(self.size))
+        details.append(f"{self.worlds} world{'' if self.worlds == 1 else 's'}")
+
+        if self.last_played > 0:
+            details.append(f"played {time.strftime('%Y-%m-%d', time.localtime(self.last_played))}")
+
+        return f"LOCL:{self.name}  ({', '.join(detail for detail in details if detail)})"
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def formatSize(size: int) -> str:
+    value = float(size)
+
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+
+        value = value / 1024
+
+    return f"{value:.1f} TB"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def scanDirectory(path: Path, mtime_ns: int) -> DirectoryRecord:
+    record = DirectoryRecord(mtime_ns, 0, 0)
+
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return record
+
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    record.children.append(entry.name)
+
+                elif entry.is_file(follow_symlinks=False):
+                    # < free on windows, where scandir already returned the size > #
+                    record.size = record.size + entry.stat(follow_symlinks=False).st_size
+                    record.files = record.files + 1
+
+            except OSError:
+                continue
+
+    return record
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def walkInstance(
+    root: Path, previous: dict[str, DirectoryRecord]
+) -> tuple[dict[str, DirectoryRecord], int]:
+    # < folders whose mtime has not moved keep their totals, only their subfolders are stat'ed > #
+    records: dict[str, DirectoryRecord] = {}
+    scanned = 0
+    pending = [""]
+
+    while pending:
+        relative = pending.pop()
+        path = root.joinpath(relative) if relative else root
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+
+        record = previous.get(relative)
+
+        if record is None or record.mtime_ns != mtime_ns:
+            record = scanDirectory(path, mtime_ns)
+            scanned = scanned + 1
+
+        records[relative] = record
+        pending.extend(f"{relative}/{child}" if relative else child for child in record.children)
+
+    return records, scanned
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def readLauncherFiles(root: Path, info: InstanceInfo) -> None:
+    # < prism and multimc keep the components in mmc-pack.json > #
+    try:
+        with open(root.joinpath("mmc-pack.json")) as pack_file:
+            components = json.load(pack_file).get("components", [])
+
+        for component in components:
+            uid = component.get("uid")
+            version = str(component.get("version", ""))
+
+            if uid == "net.minecraft":
+                info.minecraft_version = version
+            elif uid in LOADER_COMPONENTS:
+                info.loader = LOADER_COMPONENTS[uid]
+
+    except (OSError, ValueError, AttributeError, TypeError):
+        pass
+
+    # < instance.cfg has no section header, so one is added for configparser > #
+    try:
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        parser.read_string(f"[instance]\n{root.joinpath('instance.cfg').read_text()}")
+        section = parser["instance"]
+
+        if section.get("lastLaunchTime", "").isdigit():
+            info.last_played = int(section["lastLaunchTime"]) / 1000
+
+        if info.minecraft_version == "":
+            info.minecraft_version = section.get("IntendedVersion", "")
+
+    except (OSError, configparser.Error, UnicodeDecodeError):
+        pass
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def summarise(root: Path, info: InstanceInfo, records: dict[str, DirectoryRecord]) -> None:
+    info.size = sum(record.size for record in records.values())
+    info.files = sum(record.files for record in records.values())
+    info.worlds = 0
+
+    latest_log = 0.0
+
+    for game in ("", *GAME_DIRECTORIES):
+        prefix = f"{game}/" if game else ""
+        saves = records.get(f"{prefix}saves")
+
+        if saves is not None:
+            info.worlds = info.worlds + saves.children.__len__()
+
+        logs = records.get(f"{prefix}logs")
+
+        # < without a launcher timestamp, the last log written is the last game played > #
+        if logs is not None and logs.files > 0:
+            try:
+                log_mtime = root.joinpath(f"{prefix}logs", "latest.log").stat().st_mtime
+                latest_log = max(latest_log, log_mtime)
+            except OSError:
+                pass
+
+    if info.last_played == 0:
+        info.last_played = latest_log
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def loadCatalog(
+    fingerprint: str,
+) -> dict[str, tuple[InstanceInfo, dict[str, DirectoryRecord]]]:
+    cached = cache.readCache("instance_catalog", fingerprint)
+
+    if cached is None:
+        return {}
+
+    entries = cached[0].get("instances")
+
+    if type(entries) is not dict:
+        return {}
+
+    catalog: dict[str, tuple[InstanceInfo, dict[str, DirectoryRecord]]] = {}
+
+    for name, entry in entries.items():
+        try:
+            info = InstanceInfo(**entry["info"])
+            records = {
+                relative: DirectoryRecord(*values)
+                for relative, values in entry["directories"].items()
+            }
+        except (KeyError, TypeError, AttributeError):
+            continue
+
+        catalog[name] = (info, records)
+
+    return catalog
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def saveCatalog(
+    fingerprint: str, catalog: dict[str, tuple[InstanceInfo, dict[str, DirectoryRecord]]]
+) -> None:
+    entries: dict[str, object] = {
+        name: {
+            "info": asdict(info),
+            "directories": {
+                relative: [record.mtime_ns, record.size, record.files, record.children]
+                for relative, record in records.items()
+            },
+        }
+        for name, (info, records) in catalog.items()
+    }
+
+    cache.writeCache("instance_catalog", fingerprint, {"instances": entries})
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def instancesPath() -> Path | None:
+    config = APP_PACKAGE.getConfig().getConfig()
+    path = config.get("instances_path")
+
+    return None if path is None else Path(str(path))
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def cachedInstances() -> list[InstanceInfo]:
+    # < the last catalog as it was saved, without touching the instances > #
+    path = instancesPath()
+
+    if path is None:
+        return []
+
+    catalog = loadCatalog(path.as_posix())
+
+    return [catalog[name][0] for name in sorted(catalog)]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def instanceCatalog(
+    cancel: Event | None = None, changed: dict[str, set[str]] | None = None
+) -> list[InstanceInfo]:
+    # < changed maps instance names to folders known to be stale, the rest are reused as is > #
+    path = instancesPath()
+
+    if path is None:
+        return []
+
+    config = APP_PACKAGE.getConfig().getConfig()
+    rescan_age = float(config.get("instance_rescan_age", DEFAULT_RESCAN_AGE))
+
+    fingerprint = path.as_posix()
+    previous = loadCatalog(fingerprint)
+    catalog: dict[str, tuple[InstanceInfo, dict[str, DirectoryRecord]]] = {}
+
+    try:
+        entries = sorted(path.iterdir())
+    except OSError as error:
+        APP_LOGGER.warning(f"failed to list instances in {path}")
+        APP_LOGGER.debug(error)
+        return []
+
+    scanned = 0
+
+    for entry in entries:
+        if cancel is not None and cancel.is_set():
+            return []
+
+        # < hidden folders are launcher and staging scratch space, not instances > #
+        if not entry.is_dir() or entry.name.startswith("."):
+            continue
+
+        if changed is not None and entry.name in previous and entry.name not in changed:
+            catalog[entry.name] = previous[entry.name]
+            continue
+
+        info, records = previous.get(entry.name, (InstanceInfo(entry.name), {}))
+        now = time.time()
+
+        # < a folder written in place keeps its mtime, so drop what the watcher saw change > #
+        for relative in [] if changed is None else changed.get(entry.name, set()):
+            records.pop(relative, None)
+
+        if now - info.scanned > rescan_age:
+            records = {}
+            info.scanned = now
+
+        records, walked = walkInstance(entry, records)
+        scanned = scanned + walked
+
+        info.minecraft_version, info.loader, info.last_played = "", "", 0.0
+        readLauncherFiles(entry, info)
+        summarise(entry, info, records)
+
+        catalog[entry.name] = (info, records)
+
+    saveCatalog(fingerprint, catalog)
+
+    APP_LOGGER.debug(f"instance catalog: {catalog.__len__()} instances, {scanned} folders read")
+
+    return [info for info, _records in catalog.values()]
+
+
+# < ----------------------------------------------------------------------- > #
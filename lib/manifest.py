@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from minecraft_pack_manager import APP_LOGGER
+from minecraft_pack_manager.lib.saves import ScrubIndex
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+MANIFEST_NAME = ".mpm-manifest.json"
+MANIFEST_VERSION = 1
+
+# < the same paths transfer() excludes, they are never sent so never listed > #
+EXCLUDED_DIRECTORIES = ("logs", "backups", "screenshots")
+EXCLUDED_FILES = ("options.txt", MANIFEST_NAME)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class PackManifest:
+    # < relative posix path -> entry > #
+    files: dict[str, ManifestEntry] = field(default_factory=dict)
+    # < whether small files were uploaded as an archive, see lib/packarchive > #
+    archive: bool = False
+    # < size from which files live in the shared blob area, 0 when none do, see lib/blobs > #
+    blobs: int = 0
+
+    # < ------------------------------------------------------------------- > #
+
+    def rootDigest(self) -> str:
+        # < content only, a fresh download has other mtimes but the same pack > #
+        root = hashlib.blake2b(digest_size=16)
+
+        for path in sorted(self.files):
+            entry = self.files[path]
+            root.update(f"{path}\0{entry.size}\0{entry.digest}\n".encode())
+
+        return root.hexdigest()
+
+    # < ------------------------------------------------------------------- > #
+
+    def changedPaths(self, other: "PackManifest") -> list[str]:
+        # < added, changed and removed files, in either direction > #
+        changed: list[str] = []
+
+        for path in sorted(self.files.keys() | other.files.keys()):
+            ours = self.files.get(path)
+            theirs = other.files.get(path)
+
+            # < a file missing on one side never equals the other side's content > #
+            ours_content = None if ours is None else (ours.size, ours.digest)
+            theirs_content = None if theirs is None else (theirs.size, theirs.digest)
+
+            if ours_content != theirs_content:
+                changed.append(path)
+
+        return changed
+
+    # < ------------------------------------------------------------------- > #
+
+    def toJson(self) -> str:
+        files = {
+            path: [entry.size, entry.mtime_ns, entry.digest] for path, entry in self.files.items()
+        }
+
+        return json.dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "root": self.rootDigest(),
+                "archive": self.archive,
+                "blobs": self.blobs,
+                "files": files,
+            },
+            separators=(",", ":"),
+        )
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < digests of local files, reused until a file's size or mtime changes > #
+HASH_INDEX = ScrubIndex("hash_index")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseManifest(text: str) -> PackManifest | None:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+
+    if type(data) is not dict or data.get("version") != MANIFEST_VERSION:
+        return None
+
+    files = data.get("files")
+    blobs = data.get("blobs", 0)
+
+    if type(files) is not dict or type(blobs) is not int:
+        return None
+
+    manifest = PackManifest(archive=data.get("archive") is True, blobs=blobs)
+
+    for path, values in files.items():
+        try:
+            size, mtime_ns, digest = values
+            manifest.files[path] = ManifestEntry(int(size), int(mtime_ns), str(digest))
+        except (TypeError, ValueError):
+            return None
+
+    # < a manifest that does not add up is worse than none > #
+    if data.get("root") != manifest.rootDigest():
+        return None
+
+    return manifest
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def walkPack(root: Path) -> Iterator[tuple[str, os.DirEntry[str]]]:
+    # < yields the relative posix path and directory entry of every synced file > #
+    pending = [(root, "")]
+
+    while pending:
+        directory, prefix = pending.pop()
+
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in EXCLUDED_DIRECTORIES:
+                            pending.append((Path(entry.path), f"{prefix}{entry.name}/"))
+
+                    elif entry.is_file() and entry.name not in EXCLUDED_FILES:
+                        yield f"{prefix}{entry.name}", entry
+
+                except OSError:
+                    continue
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def fileDigest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def buildManifest(root: Path, workers: int = 4) -> PackManifest:
+    # < only files whose size or mtime changed are hashed again > #
+    HASH_INDEX.load()
+
+    manifest = PackManifest()
+    pending: list[tuple[str, Path, os.stat_result]] = []
+    seen: set[str] = set()
+
+    for relative, entry in walkPack(root):
+        path = Path(entry.path)
+
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+
+        seen.add(path.as_posix())
+        digest = HASH_INDEX.digestFor(path, stat)
+
+        if digest is None:
+            pending.append((relative, path, stat))
+            continue
+
+        manifest.files[relative] = ManifestEntry(stat.st_size, stat.st_mtime_ns, digest)
+
+    # < hashlib releases the gil on large buffers, so threads help here > #
+    def hashFile(item: tuple[str, Path, os.stat_result]) -> str | None:
+        try:
+            return fileDigest(item[1])
+        except OSError as error:
+            APP_LOGGER.warning(f"failed to hash {item[1]}")
+            APP_LOGGER.debug(error)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for (relative, path, stat), digest in zip(pending, executor.map(hashFile, pending)):
+            if digest is None:
+                continue
+
+            HASH_INDEX.record(path, stat, digest)
+            manifest.files[relative] = ManifestEntry(stat.st_size, stat.st_mtime_ns, digest)
+
+    HASH_INDEX.prune(root, seen)
+    HASH_INDEX.save()
+
+    files, hashed = manifest.files.__len__(), pending.__len__()
+    APP_LOGGER.debug(f"manifest of {root}: {files} files, {hashed} hashed")
+
+    return manifest
+
+
+# < ----------------------------------------------------------------------- > #
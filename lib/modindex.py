@@ -0,0 +1,419 @@
+import json
+import os
+import sqlite3
+import tomllib
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event
+from zipfile import BadZipFile, ZipFile
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE, APP_PATHS
+from minecraft_pack_manager.lib.store import GAME_DIRECTORIES
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+MOD_INDEX_VERSION = 2
+
+# < metadata files are a few kilobytes, anything far larger is not worth reading > #
+MAX_METADATA_SIZE = 1024 * 1024
+
+# < every entry a mod's metadata can come from, their crcs tell whether it changed > #
+METADATA_FILES = (
+    "fabric.mod.json",
+    "quilt.mod.json",
+    "META-INF/neoforge.mods.toml",
+    "META-INF/mods.toml",
+    "META-INF/MANIFEST.MF",
+    "mcmod.info",
+)
+
+SCHEMA = (
+    (
+        "CREATE TABLE IF NOT EXISTS jars ("
+        " path TEXT PRIMARY KEY, instance TEXT NOT NULL,"
+        " size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, fingerprint TEXT NOT NULL)"
+    ),
+    (
+        "CREATE TABLE IF NOT EXISTS mods ("
+        " path TEXT NOT NULL REFERENCES jars(path) ON DELETE CASCADE,"
+        " mod_id TEXT NOT NULL, version TEXT NOT NULL, loader TEXT NOT NULL, name TEXT NOT NULL)"
+    ),
+    "CREATE INDEX IF NOT EXISTS jars_instance ON jars(instance)",
+    "CREATE INDEX IF NOT EXISTS mods_id ON mods(mod_id, version)",
+    "CREATE INDEX IF NOT EXISTS mods_path ON mods(path)",
+)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class ModInfo:
+    mod_id: str
+    version: str
+    loader: str
+    name: str
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def modIndexPath() -> Path:
+    return APP_PATHS.settings().joinpath("cache", "mod_index.sqlite")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def openIndex() -> sqlite3.Connection:
+    path = modIndexPath()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.execute("PRAGMA journal_mode = WAL")
+
+    # < an index from another version is rebuilt rather than migrated > #
+    if connection.execute("PRAGMA user_version").fetchone()[0] != MOD_INDEX_VERSION:
+        connection.execute("DROP TABLE IF EXISTS mods")
+        connection.execute("DROP TABLE IF EXISTS jars")
+        connection.execute(f"PRAGMA user_version = {MOD_INDEX_VERSION}")
+
+    for statement in SCHEMA:
+        connection.execute(statement)
+
+    connection.commit()
+
+    return connection
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def readEntry(zip_file: ZipFile, name: str) -> str | None:
+    try:
+        info = zip_file.getinfo(name)
+    except KeyError:
+        return None
+
+    if info.file_size > MAX_METADATA_SIZE:
+        return None
+
+    return zip_file.read(info).decode("utf-8", errors="replace")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def manifestVersion(zip_file: ZipFile) -> str:
+    # < forge fills ${file.jarVersion} from the jar manifest > #
+    text = readEntry(zip_file, "META-INF/MANIFEST.MF") or ""
+
+    for line in text.splitlines():
+        key, separator, value = line.partition(":")
+
+        if separator != "" and key.strip() == "Implementation-Version":
+            return value.strip()
+
+    return ""
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseFabric(text: str, loader: str) -> list[ModInfo]:
+    data = json.loads(text, strict=False)
+
+    if type(data) is not dict:
+        return []
+
+    # < quilt keeps the same fields one level down > #
+    if loader == "quilt":
+        metadata = data.get("quilt_loader", {}).get("metadata", {})
+        data = {**data.get("quilt_loader", {}), "name": metadata.get("name", "")}
+
+    mod_id = data.get("id")
+
+    if type(mod_id) is not str:
+        return []
+
+    return [ModInfo(mod_id, str(data.get("version", "")), loader, str(data.get("name") or mod_id))]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseForge(text: str, loader: str, zip_file: ZipFile) -> list[ModInfo]:
+    data = tomllib.loads(text)
+    mods: list[ModInfo] = []
+
+    for entry in data.get("mods", []):
+        if type(entry) is not dict or type(entry.get("modId")) is not str:
+            continue
+
+        version = str(entry.get("version", ""))
+
+        if version == "${file.jarVersion}":
+            version = manifestVersion(zip_file)
+
+        mods.append(ModInfo(entry["modId"], version, loader, str(entry.get("displayName", ""))))
+
+    return mods
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseMcmod(text: str) -> list[ModInfo]:
+    data = json.loads(text, strict=False)
+
+    # < old forge wrote either a bare list or {"modList": [...]} > #
+    if type(data) is dict:
+        data = data.get("modList", [])
+
+    if type(data) is not list:
+        return []
+
+    return [
+        ModInfo(entry["modid"], str(entry.get("version", "")), "forge", str(entry.get("name", "")))
+        for entry in data
+        if type(entry) is dict and type(entry.get("modid")) is str
+    ]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def metadataFingerprint(zip_file: ZipFile) -> str:
+    # < names, crcs and sizes of the metadata entries, all from the central directory > #
+    parts: list[str] = []
+
+    for name in METADATA_FILES:
+        try:
+            info = zip_file.getinfo(name)
+        except KeyError:
+            continue
+
+        parts.append(f"{name}:{info.CRC:08x}:{info.file_size}")
+
+    return "|".join(parts)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def readJar(path: Path, known: str | None = None) -> tuple[str, list[ModInfo] | None] | None:
+    # < opening a zip only reads its central directory, then just the metadata entries > #
+    # < returns the metadata fingerprint, and no mods when it still matches known > #
+    try:
+        with ZipFile(path) as zip_file:
+            fingerprint = metadataFingerprint(zip_file)
+
+            # < a jar copied, touched or rebuilt with the same metadata is not parsed again > #
+            if fingerprint == known:
+                return fingerprint, None
+
+            names = set(zip_file.namelist())
+            mods: list[ModInfo] = []
+
+            for name, loader in (("fabric.mod.json", "fabric"), ("quilt.mod.json", "quilt")):
+                if name in names:
+                    mods.extend(parseFabric(readEntry(zip_file, name) or "", loader))
+
+            for name, loader in (
+                ("META-INF/neoforge.mods.toml", "neoforge"),
+                ("META-INF/mods.toml", "forge"),
+            ):
+                if name in names:
+                    mods.extend(parseForge(readEntry(zip_file, name) or "", loader, zip_file))
+
+            if not mods and "mcmod.info" in names:
+                mods.extend(parseMcmod(readEntry(zip_file, "mcmod.info") or ""))
+
+    except (BadZipFile, OSError, ValueError, AttributeError) as error:
+        APP_LOGGER.debug(f"failed to read mod metadata from {path.name}: {error}")
+        return None
+
+    # < multi loader jars carry the same mod id in each loader's file, keep the first > #
+    unique: dict[str, ModInfo] = {}
+
+    for mod in mods:
+        unique.setdefault(mod.mod_id, mod)
+
+    return fingerprint, list(unique.values())
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def instanceJars(instance: Path) -> list[Path]:
+    jars: list[Path] = []
+
+    for root in (instance, *(instance.joinpath(name) for name in GAME_DIRECTORIES)):
+        try:
+            entries = os.scandir(root.joinpath("mods"))
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                # < launchers disable a mod by renaming it to .jar.disabled > #
+                if entry.name.endswith(".jar") and entry.is_file():
+                    jars.append(Path(entry.path))
+
+    return jars
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def indexInstances(
+    instances: list[Path] | None = None, cancel: Event | None = None, workers: int = 8
+) -> int:
+    # < returns how many jars had to be read, unchanged ones are kept from the last refresh > #
+    # < a full refresh also forgets instances that were deleted > #
+    full = instances is None
+
+    if instances is None:
+        config = APP_PACKAGE.getConfig().getConfig()
+        path = config.get("instances_path")
+
+        if path is None:
+            return 0
+
+        instances = [
+            entry
+            for entry in Path(path).iterdir()
+            if entry.is_dir() and not entry.name.startswith(".")
+        ]
+
+    connection = openIndex()
+
+    try:
+        known = {
+            row[0]: (row[1], row[2], row[3])
+            for row in connection.execute("SELECT path, size, mtime_ns, fingerprint FROM jars")
+        }
+
+        pending: list[tuple[str, Path, os.stat_result]] = []
+        seen: set[str] = set()
+
+        for instance in instances:
+            for jar in instanceJars(instance):
+                try:
+                    stat = jar.stat()
+                except OSError:
+                    continue
+
+                seen.add(jar.as_posix())
+
+                row = known.get(jar.as_posix())
+
+                if row is None or row[:2] != (stat.st_size, stat.st_mtime_ns):
+                    pending.append((instance.name, jar, stat))
+
+        def readItem(
+            item: tuple[str, Path, os.stat_result],
+        ) -> tuple[str, list[ModInfo] | None] | None:
+            if cancel is not None and cancel.is_set():
+                return None
+
+            row = known.get(item[1].as_posix())
+
+            return readJar(item[1], None if row is None else row[2])
+
+        # < zlib releases the gil, so jars are read side by side > #
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(readItem, pending))
+
+        # < sqlite connections stay on the thread that opened them, so writes happen here > #
+        with connection:
+            for (instance_name, jar, stat), result in zip(pending, results):
+                if result is None:
+                    continue
+
+                fingerprint, mods = result
+
+                # < same metadata, only the stat moved on > #
+                if mods is None:
+                    connection.execute(
+                        "UPDATE jars SET size = ?, mtime_ns = ? WHERE path = ?",
+                        (stat.st_size, stat.st_mtime_ns, jar.as_posix()),
+                    )
+                    continue
+
+                connection.execute("DELETE FROM jars WHERE path = ?", (jar.as_posix(),))
+                connection.execute(
+                    "INSERT INTO jars VALUES (?, ?, ?, ?, ?)",
+                    (jar.as_posix(), instance_name, stat.st_size, stat.st_mtime_ns, fingerprint),
+                )
+                connection.executemany(
+                    "INSERT INTO mods VALUES (?, ?, ?, ?, ?)",
+                    [(jar.as_posix(), m.mod_id, m.version, m.loader, m.name) for m in mods],
+                )
+
+            names = {instance.name for instance in instances}
+            stale = [
+                (path,)
+                for path, instance_name in connection.execute("SELECT path, instance FROM jars")
+                if path not in seen and (full or instance_name in names)
+            ]
+            connection.executemany("DELETE FROM jars WHERE path = ?", stale)
+
+    finally:
+        connection.close()
+
+    APP_LOGGER.debug(f"mod index: {pending.__len__()} jars read, {seen.__len__()} indexed")
+
+    return pending.__len__()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def packsWithMod(mod_id: str, version: str | None = None) -> list[tuple[str, ModInfo]]:
+    # < instance name and mod of every indexed jar providing mod_id > #
+    query = (
+        "SELECT jars.instance, mods.mod_id, mods.version, mods.loader, mods.name"
+        " FROM mods JOIN jars ON jars.path = mods.path WHERE mods.mod_id = ?"
+    )
+    params: tuple[str, ...] = (mod_id,)
+
+    if version is not None:
+        query = f"{query} AND mods.version = ?"
+        params = (mod_id, version)
+
+    connection = openIndex()
+
+    try:
+        rows = connection.execute(f"{query} ORDER BY jars.instance", params).fetchall()
+    finally:
+        connection.close()
+
+    return [(row[0], ModInfo(row[1], row[2], row[3], row[4])) for row in rows]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def instanceMods(instance: str) -> list[ModInfo]:
+    connection = openIndex()
+
+    try:
+        rows = connection.execute(
+            "SELECT mods.mod_id, mods.version, mods.loader, mods.name"
+            " FROM mods JOIN jars ON jars.path = mods.path"
+            " WHERE jars.instance = ? ORDER BY mods.mod_id",
+            (instance,),
+        ).fetchall()
+    finally:
+        connection.close()
+
+    return [ModInfo(*row) for row in rows]
+
+
+# < ----------------------------------------------------------------------- > #
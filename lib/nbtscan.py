@@ -0,0 +1,201 @@
+import struct
+import zlib
+
+from collections.abc import Iterable
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+TAG_END = 0
+TAG_BYTE_ARRAY = 7
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+TAG_INT_ARRAY = 11
+TAG_LONG_ARRAY = 12
+
+# < payload sizes of the scalar tags, byte through double > #
+FIXED_SIZES: dict[int, int] = {1: 1, 2: 2, 3: 4, 4: 8, 5: 4, 6: 8}
+
+# < element sizes of the length prefixed array tags > #
+ARRAY_SIZES: dict[int, int] = {TAG_BYTE_ARRAY: 1, TAG_INT_ARRAY: 4, TAG_LONG_ARRAY: 8}
+
+# < the nbt spec caps nesting at 512 > #
+MAX_DEPTH = 512
+
+INT = struct.Struct(">i")
+USHORT = struct.Struct(">H")
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def skipPayload(view: memoryview, offset: int, tag_type: int, depth: int = 0) -> int:
+    # < returns the offset just past the payload, values are never decoded > #
+    if depth > MAX_DEPTH:
+        raise ValueError("nbt nested too deeply")
+
+    size = FIXED_SIZES.get(tag_type)
+    if size is not None:
+        return offset + size
+
+    element_size = ARRAY_SIZES.get(tag_type)
+    if element_size is not None:
+        (length,) = INT.unpack_from(view, offset)
+
+        if length < 0:
+            raise ValueError(f"negative array length at {offset}")
+
+        return offset + 4 + length * element_size
+
+    if tag_type == TAG_STRING:
+        (length,) = USHORT.unpack_from(view, offset)
+        return offset + 2 + length
+
+    if tag_type == TAG_LIST:
+        item_type = view[offset]
+        (length,) = INT.unpack_from(view, offset + 1)
+        offset = offset + 5
+
+        if length <= 0:
+            return offset
+
+        size = FIXED_SIZES.get(item_type)
+        if size is not None:
+            return offset + length * size
+
+        for _ in range(length):
+            offset = skipPayload(view, offset, item_type, depth + 1)
+
+        return offset
+
+    if tag_type == TAG_COMPOUND:
+        while True:
+            child_type = view[offset]
+            offset = offset + 1
+
+            if child_type == TAG_END:
+                return offset
+
+            (name_length,) = USHORT.unpack_from(view, offset)
+            offset = skipPayload(view, offset + 2 + name_length, child_type, depth + 1)
+
+    raise ValueError(f"unknown tag type {tag_type} at {offset}")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def findChild(view: memoryview, offset: int, name: bytes) -> tuple[int, int, int, int] | None:
+    # < offset is the start of a compound payload > #
+    # < returns (tag start, payload start, tag end, tag type) > #
+    while True:
+        start = offset
+        tag_type = view[offset]
+
+        if tag_type == TAG_END:
+            return None
+
+        (name_length,) = USHORT.unpack_from(view, offset + 1)
+        payload = offset + 3 + name_length
+        offset = skipPayload(view, payload, tag_type, 1)
+
+        if view[start + 3 : payload] == name:
+            return start, payload, offset, tag_type
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def findTagSpan(view: memoryview, path: tuple[str, ...]) -> tuple[int, int] | None:
+    try:
+        if view[0] != TAG_COMPOUND:
+            raise ValueError("nbt root is not a compound")
+
+        (name_length,) = USHORT.unpack_from(view, 1)
+        offset = 3 + name_length
+
+        span: tuple[int, int] | None = None
+        for depth, name in enumerate(path):
+            child = findChild(view, offset, name.encode("utf-8"))
+
+            if child is None:
+                return None
+
+            start, payload, end, tag_type = child
+            span = (start, end)
+
+            if depth < path.__len__() - 1 and tag_type != TAG_COMPOUND:
+                return None
+
+            offset = payload
+
+    except (IndexError, struct.error) as error:
+        raise ValueError(f"truncated nbt data: {error}") from error
+
+    return span
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def decompress(raw: bytes) -> tuple[str, bytes]:
+    # < level.dat is gzip, region chunks and some tools use zlib > #
+    if raw.startswith(GZIP_MAGIC):
+        try:
+            return "gzip", zlib.decompress(raw, wbits=31)
+        except zlib.error as error:
+            raise ValueError(f"corrupt gzip data: {error}") from error
+
+    if raw[:1] == b"\x78":
+        try:
+            return "zlib", zlib.decompress(raw)
+        except zlib.error:
+            pass
+
+    return "none", raw
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def compress(variant: str, chunks: Iterable[memoryview | bytes], level: int = 6) -> bytes:
+    match variant:
+        case "gzip":
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+        case "zlib":
+            compressor = zlib.compressobj(level)
+
+        case _:
+            return b"".join(chunks)
+
+    # < feed the slices directly instead of joining them first > #
+    output = [compressor.compress(chunk) for chunk in chunks]
+    output.append(compressor.flush())
+
+    return b"".join(output)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def removeTag(raw: bytes, path: tuple[str, ...] = ("Data", "Player")) -> bytes | None:
+    # < returns the recompressed file, or None if the tag was not there > #
+    variant, data = decompress(raw)
+    view = memoryview(data)
+
+    span = findTagSpan(view, path)
+
+    if span is None:
+        return None
+
+    start, end = span
+
+    return compress(variant, (view[:start], view[end:]))
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, BadZipFile, ZipFile
+
+from minecraft_pack_manager import APP_LOGGER
+from minecraft_pack_manager.lib.manifest import ManifestEntry, PackManifest
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+ARCHIVE_DIRECTORY = ".mpm-archive"
+ARCHIVE_INDEX = "index.json"
+ARCHIVE_VERSION = 1
+
+# < files below this are bundled, anything larger stays its own object > #
+DEFAULT_THRESHOLD = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 32 * 1024 * 1024
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class ArchiveChunk:
+    name: str
+    # < relative posix path -> entry > #
+    files: dict[str, ManifestEntry] = field(default_factory=dict)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class ArchiveIndex:
+    threshold: int
+    chunks: dict[str, ArchiveChunk] = field(default_factory=dict)
+
+    # < ------------------------------------------------------------------- > #
+
+    def paths(self) -> set[str]:
+        return {path for chunk in self.chunks.values() for path in chunk.files}
+
+    # < ------------------------------------------------------------------- > #
+
+    def toJson(self) -> str:
+        chunks = {
+            name: {
+                path: [entry.size, entry.mtime_ns, entry.digest]
+                for path, entry in chunk.files.items()
+            }
+            for name, chunk in self.chunks.items()
+        }
+
+        return json.dumps(
+            {"version": ARCHIVE_VERSION, "threshold": self.threshold, "chunks": chunks},
+            separators=(",", ":"),
+        )
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseIndex(text: str) -> ArchiveIndex | None:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+
+    if type(data) is not dict or data.get("version") != ARCHIVE_VERSION:
+        return None
+
+    threshold = data.get("threshold")
+    chunks = data.get("chunks")
+
+    if type(threshold) is not int or type(chunks) is not dict:
+        return None
+
+    index = ArchiveIndex(threshold)
+
+    for name, files in chunks.items():
+        if type(files) is not dict:
+            return None
+
+        chunk = ArchiveChunk(name)
+
+        for path, values in files.items():
+            try:
+                size, mtime_ns, digest = values
+                chunk.files[path] = ManifestEntry(int(size), int(mtime_ns), str(digest))
+            except (TypeError, ValueError):
+                return None
+
+        index.chunks[name] = chunk
+
+    return index
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def chunkName(files: dict[str, ManifestEntry]) -> str:
+    # < named by content, so an unchanged chunk keeps its name and is not uploaded again > #
+    digest = hashlib.blake2b(digest_size=16)
+
+    for path in sorted(files):
+        digest.update(f"{path}\0{files[path].digest}\n".encode())
+
+    return f"chunk-{digest.hexdigest()}.zip"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def planArchive(manifest: PackManifest, threshold: int, chunk_size: int) -> ArchiveIndex:
+    index = ArchiveIndex(threshold)
+
+    current: dict[str, ManifestEntry] = {}
+    current_size = 0
+    current_top = ""
+
+    def close() -> None:
+        if current.__len__() > 0:
+            name = chunkName(current)
+            index.chunks[name] = ArchiveChunk(name, dict(current))
+
+    for path in sorted(manifest.files):
+        entry = manifest.files[path]
+
+        if entry.size >= threshold:
+            continue
+
+        # < a new top level folder starts a new chunk, so editing config/ leaves kubejs/ alone > #
+        top = path.split("/", 1)[0] if "/" in path else ""
+
+        if current and (top != current_top or current_size >= chunk_size):
+            close()
+            current.clear()
+            current_size = 0
+
+        current[path] = entry
+        current_size = current_size + entry.size
+        current_top = top
+
+    close()
+
+    return index
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def writeChunk(root: Path, chunk: ArchiveChunk, staging: Path) -> Path:
+    archive = staging.joinpath(chunk.name)
+
+    with ZipFile(archive, "w", compression=ZIP_DEFLATED, compresslevel=6) as zip_file:
+        for path in sorted(chunk.files):
+            zip_file.write(root.joinpath(path), path)
+
+    return archive
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def isOutdated(path: str, entry: ManifestEntry, local: PackManifest | None) -> bool:
+    if local is None:
+        return True
+
+    current = local.files.get(path)
+
+    return current is None or current.size != entry.size or current.digest != entry.digest
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def neededChunks(index: ArchiveIndex, local: PackManifest | None) -> list[str]:
+    return [
+        name
+        for name, chunk in index.chunks.items()
+        if any(isOutdated(path, entry, local) for path, entry in chunk.files.items())
+    ]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def staleSmallFiles(index: ArchiveIndex, local: PackManifest) -> list[str]:
+    # < small local files the archive no longer has, rclone never sees them to delete > #
+    archived = index.paths()
+
+    return [
+        path
+        for path, entry in local.files.items()
+        if entry.size < index.threshold and path not in archived
+    ]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def extractChunk(archive: Path, chunk: ArchiveChunk, root: Path, local: PackManifest | None) -> int:
+    # < returns the number of files written, members the index does not list are ignored > #
+    written = 0
+    resolved_root = root.resolve()
+
+    try:
+        with ZipFile(archive) as zip_file:
+            for path, entry in chunk.files.items():
+                if not isOutdated(path, entry, local):
+                    continue
+
+                target = root.joinpath(path)
+
+                # < never write outside the pack, whatever the archive says > #
+                if ".." in Path(path).parts or not target.resolve().is_relative_to(resolved_root):
+                    APP_LOGGER.warning(f"skipping unsafe archive path: {path}")
+                    continue
+
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temporary = target.with_name(f"{target.name}.mpm-tmp")
+
+                with zip_file.open(path) as source, open(temporary, "wb") as destination:
+                    while data := source.read(1024 * 1024):
+                        destination.write(data)
+
+                temporary.replace(target)
+                os.utime(target, ns=(entry.mtime_ns, entry.mtime_ns))
+
+                written = written + 1
+
+    except (BadZipFile, KeyError, OSError) as error:
+        APP_LOGGER.error(f"failed to extract {archive.name}")
+        APP_LOGGER.debug(error)
+        return -1
+
+    return written
+
+
+# < ----------------------------------------------------------------------- > #
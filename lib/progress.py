@@ -0,0 +1,239 @@
+import json
+
+from dataclasses import dataclass, field
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < a stats line lists at most --transfers files, anything longer is noise > #
+MAX_LINE_LENGTH = 256 * 1024
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class FileProgress:
+    name: str
+    bytes: int
+    size: int
+    percentage: int
+    speed: float
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class TransferStats:
+    bytes: int = 0
+    total_bytes: int = 0
+    speed: float = 0.0
+    eta: float | None = None
+    transfers: int = 0
+    total_transfers: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    files: list[FileProgress] = field(default_factory=list)
+
+    # < ------------------------------------------------------------------- > #
+
+    def percentage(self) -> int:
+        if self.total_bytes <= 0:
+            return 0
+
+        return min(100, int(self.bytes * 100 / self.total_bytes))
+
+    # < ------------------------------------------------------------------- > #
+
+    def describe(self) -> str:
+        text = f"{formatBytes(self.bytes)} / {formatBytes(self.total_bytes)}"
+        text = f"{text}  {formatBytes(int(self.speed))}/s  ETA {formatEta(self.eta)}"
+
+        if self.errors > 0:
+            text = f"{text}  {self.errors} errors"
+
+        return text
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def formatBytes(size: int) -> str:
+    value = float(size)
+
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+
+        value = value / 1024
+
+    return f"{value:.1f} TiB"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def formatEta(eta: float | None) -> str:
+    if eta is None:
+        return "-:--"
+
+    minutes, seconds = divmod(int(eta), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours > 0:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+
+    return f"{minutes}:{seconds:02}"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def combineStats(all_stats: list[TransferStats]) -> TransferStats:
+    # < one view over several transfers running side by side > #
+    combined = TransferStats()
+
+    for stats in all_stats:
+        combined.bytes = combined.bytes + stats.bytes
+        combined.total_bytes = combined.total_bytes + stats.total_bytes
+        combined.speed = combined.speed + stats.speed
+        combined.transfers = combined.transfers + stats.transfers
+        combined.total_transfers = combined.total_transfers + stats.total_transfers
+        combined.errors = combined.errors + stats.errors
+        combined.elapsed = max(combined.elapsed, stats.elapsed)
+        combined.files.extend(stats.files)
+
+    if combined.speed > 0:
+        combined.eta = max(0, combined.total_bytes - combined.bytes) / combined.speed
+
+    return combined
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseStats(stats: dict[str, object]) -> TransferStats:
+    def number(source: dict[str, object], key: str) -> float:
+        value = source.get(key)
+
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+
+        return 0.0
+
+    files: list[FileProgress] = []
+    transferring = stats.get("transferring")
+
+    if type(transferring) is list:
+        for entry in transferring:
+            if type(entry) is not dict:
+                continue
+
+            files.append(
+                FileProgress(
+                    str(entry.get("name", "")),
+                    int(number(entry, "bytes")),
+                    int(number(entry, "size")),
+                    int(number(entry, "percentage")),
+                    number(entry, "speed"),
+                )
+            )
+
+    eta = stats.get("eta")
+
+    return TransferStats(
+        bytes=int(number(stats, "bytes")),
+        total_bytes=int(number(stats, "totalBytes")),
+        speed=number(stats, "speed"),
+        eta=float(eta) if isinstance(eta, (int, float)) else None,
+        transfers=int(number(stats, "transfers")),
+        total_transfers=int(number(stats, "totalTransfers")),
+        errors=int(number(stats, "errors")),
+        elapsed=number(stats, "elapsedTime"),
+        files=files,
+    )
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class StatsParser:
+    def __init__(self) -> None:
+        # < attributes > #
+        self.pending: list[str] = []
+        self.pending_length: int = 0
+        self.skipping: bool = False
+
+        self.latest: TransferStats | None = None
+        self.last_error: str | None = None
+
+    # < ------------------------------------------------------------------- > #
+
+    def feed(self, chunk: str) -> list[TransferStats]:
+        # < chunks may split lines anywhere, only whole lines are parsed > #
+        results: list[TransferStats] = []
+
+        while chunk != "":
+            line, newline, chunk = chunk.partition("\n")
+
+            if not self.skipping:
+                self.pending.append(line)
+                self.pending_length = self.pending_length + line.__len__()
+
+            # < drop lines that outgrow the limit instead of buffering them > #
+            if self.pending_length > MAX_LINE_LENGTH:
+                self.pending.clear()
+                self.pending_length = 0
+                self.skipping = True
+
+            if newline == "":
+                break
+
+            if not self.skipping:
+                stats = self.parseLine("".join(self.pending))
+
+                if stats is not None:
+                    results.append(stats)
+
+            self.pending.clear()
+            self.pending_length = 0
+            self.skipping = False
+
+        return results
+
+    # < ------------------------------------------------------------------- > #
+
+    def parseLine(self, line: str) -> TransferStats | None:
+        line = line.strip()
+
+        if not line.startswith("{"):
+            return None
+
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+
+        if type(entry) is not dict:
+            return None
+
+        if entry.get("level") == "error":
+            self.last_error = str(entry.get("msg", "")).strip()
+
+        stats = entry.get("stats")
+
+        if type(stats) is not dict:
+            return None
+
+        self.latest = parseStats(stats)
+
+        return self.latest
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
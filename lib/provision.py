@@ -0,0 +1,268 @@
+import hashlib
+import platform
+import shutil
+import sys
+
+from pathlib import Path
+from threading import Lock
+from zipfile import BadZipFile, ZipFile
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE, APP_PATHS
+from minecraft_pack_manager.lib.trace import traced
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+RCLONE_DOWNLOAD_URL = "https://downloads.rclone.org"
+
+CHUNK_SIZE = 1024 * 1024
+# < small enough that an interrupted download keeps nearly all it received > #
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+MACHINES = {
+    "x86_64": "amd64",
+    "amd64": "amd64",
+    "aarch64": "arm64",
+    "arm64": "arm64",
+    "i386": "386",
+    "i686": "386",
+    "x86": "386",
+}
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+_PROVISION_LOCK = Lock()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def rclonePath() -> Path:
+    # < a configured executable, such as a test stand-in, replaces the provisioned one > #
+    override = APP_PACKAGE.getConfig().getConfig().get("rclone_executable")
+
+    if override is not None:
+        return Path(str(override))
+
+    name = "rclone.exe" if sys.platform == "win32" else "rclone"
+
+    return APP_PATHS.root().joinpath("third_party", "rclone", name)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def rclonePlatform() -> str | None:
+    # < the os-arch part of rclone's archive names, e.g. linux-amd64 > #
+    if sys.platform == "win32":
+        system = "windows"
+    elif sys.platform == "darwin":
+        system = "osx"
+    elif sys.platform.startswith("linux"):
+        system = "linux"
+    else:
+        return None
+
+    machine = MACHINES.get(platform.machine().lower())
+
+    if machine is None:
+        return None
+
+    return f"{system}-{machine}"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def rcloneExecutable() -> Path | None:
+    # < once provisioned this is a single stat, downloads only happen when it is missing > #
+    rclone_exe = rclonePath()
+
+    if rclone_exe.exists():
+        return rclone_exe
+
+    # < never download over a path the user chose > #
+    if APP_PACKAGE.getConfig().getConfig().get("rclone_executable") is not None:
+        APP_LOGGER.error(f"configured rclone executable does not exist: {rclone_exe}")
+        return None
+
+    with _PROVISION_LOCK:
+        # < another thread may have finished provisioning while we waited > #
+        if rclone_exe.exists():
+            return rclone_exe
+
+        return provisionRclone()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseChecksums(text: str) -> dict[str, str]:
+    # < SHA256SUMS is pgp clear signed, only "<hash>  <file>" lines matter > #
+    checksums: dict[str, str] = {}
+
+    for line in text.splitlines():
+        words = line.split()
+
+        if words.__len__() != 2 or words[0].__len__() != 64:
+            continue
+
+        try:
+            int(words[0], 16)
+        except ValueError:
+            continue
+
+        checksums[words[1].lstrip("*")] = words[0].lower()
+
+    return checksums
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def fileSha256(path: Path) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def downloadFile(url: str, destination: Path) -> bool:
+    # < streams to disk, resuming a partial file left by an earlier attempt > #
+    import requests
+
+    offset = destination.stat().st_size if destination.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset > 0 else {}
+
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+            # < the partial file already holds everything > #
+            if response.status_code == 416:
+                return True
+
+            if response.status_code not in (200, 206):
+                APP_LOGGER.warning(f"download failed with {response.status_code}: {url}")
+                return False
+
+            # < a server that ignores the range sends the whole file again > #
+            mode = "ab" if response.status_code == 206 else "wb"
+
+            with open(destination, mode) as file:
+                file.writelines(response.iter_content(DOWNLOAD_CHUNK_SIZE))
+
+    except (requests.RequestException, OSError) as error:
+        APP_LOGGER.warning(f"download interrupted, it will resume next time: {url}")
+        APP_LOGGER.debug(error)
+        return False
+
+    return True
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def extractBinary(archive: Path, rclone_exe: Path) -> bool:
+    # < only the executable is needed, not the docs and man pages beside it > #
+    temporary = rclone_exe.with_name(f"{rclone_exe.name}.tmp")
+
+    try:
+        with ZipFile(archive) as zip_file:
+            members = [
+                member
+                for member in zip_file.infolist()
+                if member.filename.rsplit("/", 1)[-1] == rclone_exe.name
+            ]
+
+            if members.__len__() != 1:
+                APP_LOGGER.error(f"no {rclone_exe.name} in {archive.name}")
+                return False
+
+            with zip_file.open(members[0]) as source, open(temporary, "wb") as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+        temporary.chmod(0o740)
+        temporary.replace(rclone_exe)
+
+    except (BadZipFile, OSError) as error:
+        APP_LOGGER.error(f"failed to extract {archive.name}")
+        APP_LOGGER.debug(error)
+        temporary.unlink(missing_ok=True)
+        return False
+
+    return True
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@traced("rclone.provision")
+def provisionRclone(version: str | None = None) -> Path | None:
+    import requests
+
+    rclone_exe = rclonePath()
+    rclone_platform = rclonePlatform()
+
+    if rclone_platform is None:
+        APP_LOGGER.error(f"no rclone build for {sys.platform} {platform.machine()}")
+        return None
+
+    config = APP_PACKAGE.getConfig().getConfig()
+    base_url = str(config.get("rclone_download_url", RCLONE_DOWNLOAD_URL)).rstrip("/")
+
+    try:
+        # < "current" has no checksums of its own, so pin the version it points at > #
+        if version is None:
+            response = requests.get(f"{base_url}/version.txt", timeout=30)
+            response.raise_for_status()
+            version = response.text.split()[-1]
+
+        response = requests.get(f"{base_url}/{version}/SHA256SUMS", timeout=30)
+        response.raise_for_status()
+
+    except (requests.RequestException, IndexError) as error:
+        APP_LOGGER.error("failed to look up the rclone release")
+        APP_LOGGER.debug(error)
+        return None
+
+    archive_name = f"rclone-{version}-{rclone_platform}.zip"
+    expected = parseChecksums(response.text).get(archive_name)
+
+    if expected is None:
+        APP_LOGGER.error(f"{archive_name} is not listed in SHA256SUMS")
+        return None
+
+    rclone_exe.parent.mkdir(parents=True, exist_ok=True)
+    archive = rclone_exe.parent.joinpath(f"{archive_name}.part")
+
+    if not downloadFile(f"{base_url}/{version}/{archive_name}", archive):
+        return None
+
+    actual = fileSha256(archive)
+
+    # < a bad partial file would fail forever, so start over next time > #
+    if actual != expected:
+        APP_LOGGER.error(f"checksum mismatch for {archive_name}")
+        archive.unlink(missing_ok=True)
+        return None
+
+    extracted = extractBinary(archive, rclone_exe)
+    archive.unlink(missing_ok=True)
+
+    if not extracted:
+        return None
+
+    APP_LOGGER.debug(f"provisioned rclone {version} for {rclone_platform}")
+
+    return rclone_exe
+
+
+# < ----------------------------------------------------------------------- > #
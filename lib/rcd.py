@@ -0,0 +1,357 @@
+import atexit
+import secrets
+import socket
+import subprocess
+import time
+
+from collections.abc import Callable
+from pathlib import Path
+from threading import Event, Lock
+from typing import TYPE_CHECKING, Any
+
+from minecraft_pack_manager import APP_LOGGER
+from minecraft_pack_manager.lib.progress import TransferStats, parseStats
+
+
+if TYPE_CHECKING:
+    from requests import Session
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < command line flags and the rc "_config" option each one sets > #
+CONFIG_FLAGS: dict[str, tuple[str, type]] = {
+    "--transfers": ("Transfers", int),
+    "--checkers": ("Checkers", int),
+    "--buffer-size": ("BufferSize", str),
+    "--order-by": ("OrderBy", str),
+    "--max-backlog": ("MaxBacklog", int),
+    "--cutoff-mode": ("CutoffMode", str),
+    "--max-depth": ("MaxDepth", int),
+}
+SWITCH_FLAGS: dict[str, str] = {
+    "--fast-list": "UseListR",
+    "--server-side-across-configs": "ServerSideAcrossConfigs",
+}
+FILTER_FLAGS: dict[str, str] = {
+    "--exclude": "ExcludeRule",
+    "--files-from-raw": "FilesFromRaw",
+}
+
+# < these only shape a process's own output, the daemon reports through core/stats > #
+IGNORED_FLAGS = (
+    "--config",
+    "--stats",
+    "--progress",
+    "--progress-terminal-title",
+    "--use-json-log",
+    "--stats-log-level",
+)
+
+START_TIMEOUT = 10.0
+POLL_INTERVAL = 0.5
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def daemonOptions(flags: list[str]) -> tuple[dict[str, object], dict[str, object]] | None:
+    # < returns the rc _config and _filter for flags, None if one has no rc equivalent > #
+    config: dict[str, object] = {}
+    filters: dict[str, list[str]] = {}
+
+    for flag in flags:
+        name, separator, value = flag.partition("=")
+
+        if name in IGNORED_FLAGS:
+            continue
+
+        if name in SWITCH_FLAGS and separator == "":
+            config[SWITCH_FLAGS[name]] = True
+
+        elif name in CONFIG_FLAGS and separator != "":
+            key, kind = CONFIG_FLAGS[name]
+
+            try:
+                config[key] = kind(value)
+            except ValueError:
+                return None
+
+        elif name in FILTER_FLAGS and separator != "":
+            filters.setdefault(FILTER_FLAGS[name], []).append(value)
+
+        else:
+            APP_LOGGER.debug(f"rclone daemon cannot take {flag}, using a process")
+            return None
+
+    return config, dict(filters)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def freePort() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return int(probe.getsockname()[1])
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class RcloneDaemon:
+    def __init__(self, rclone_exe: Path, config_file: Path, fingerprint: str = "") -> None:
+        # < attributes > #
+        self.rclone_exe: Path = rclone_exe
+        self.config_file: Path = config_file
+        self.fingerprint: str = fingerprint
+
+        self.process: subprocess.Popen[bytes] | None = None
+        self.session: Session | None = None
+        self.url: str = ""
+
+        # < running job id -> what it is doing, so shutdown can stop them > #
+        self.jobs: dict[int, str] = {}
+        self.lock = Lock()
+
+    # < ------------------------------------------------------------------- > #
+
+    def start(self) -> bool:
+        # < requests is slow to import and only needed once the daemon is used > #
+        import requests
+
+        from requests.adapters import HTTPAdapter
+
+        user, password = secrets.token_hex(8), secrets.token_hex(16)
+        port = freePort()
+
+        self.url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(
+            [
+                self.rclone_exe.as_posix(),
+                "rcd",
+                f"--rc-addr=127.0.0.1:{port}",
+                f"--rc-user={user}",
+                f"--rc-pass={password}",
+                f"--config={self.config_file}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        # < one keep-alive pool shared by every listing and transfer thread > #
+        self.session = requests.Session()
+        self.session.auth = (user, password)
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
+
+        deadline = time.monotonic() + START_TIMEOUT
+
+        while time.monotonic() < deadline and self.isRunning():
+            if self.call("rc/noop", timeout=1, quiet=True) is not None:
+                APP_LOGGER.debug(f"rclone daemon listening on {self.url}")
+                return True
+
+            time.sleep(0.1)
+
+        APP_LOGGER.warning("rclone daemon failed to start")
+        self.stop()
+
+        return False
+
+    # < ------------------------------------------------------------------- > #
+
+    def isRunning(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    # < ------------------------------------------------------------------- > #
+
+    def call(
+        self,
+        method: str,
+        params: dict[str, object] | None = None,
+        timeout: float | None = 60,
+        quiet: bool = False,
+    ) -> dict[str, Any] | None:
+        import requests
+
+        if self.session is None:
+            return None
+
+        try:
+            url = f"{self.url}/{method}"
+            response = self.session.post(url, json=params or {}, timeout=timeout)
+            result = response.json()
+
+        except (requests.RequestException, ValueError) as error:
+            if not quiet:
+                APP_LOGGER.warning(f"rclone daemon {method} failed")
+                APP_LOGGER.debug(error)
+            return None
+
+        if type(result) is not dict:
+            return None
+
+        if response.status_code != 200:
+            if not quiet:
+                APP_LOGGER.error(f"rclone daemon {method}: {result.get('error', response.reason)}")
+            return None
+
+        return result
+
+    # < ------------------------------------------------------------------- > #
+
+    def listJson(
+        self, fs: str, config: dict[str, object], timeout: float | None = None
+    ) -> list[dict[str, Any]] | None:
+        options = {"recurse": True, "dirsOnly": True, "noModTime": True, "noMimeType": True}
+        result = self.call(
+            "operations/list",
+            {"fs": fs, "remote": "", "opt": options, "_config": config},
+            timeout=timeout,
+        )
+
+        if result is None or type(result.get("list")) is not list:
+            return None
+
+        return list(result["list"])
+
+    # < ------------------------------------------------------------------- > #
+
+    def copyFile(self, source_fs: str, source: str, destination_fs: str, destination: str) -> bool:
+        params: dict[str, object] = {
+            "srcFs": source_fs,
+            "srcRemote": source,
+            "dstFs": destination_fs,
+            "dstRemote": destination,
+        }
+
+        return self.call("operations/copyfile", params, quiet=True) is not None
+
+    # < ------------------------------------------------------------------- > #
+
+    def runJob(
+        self,
+        method: str,
+        params: dict[str, object],
+        cancel: Event | None = None,
+        on_stats: Callable[[TransferStats], None] | None = None,
+    ) -> int:
+        # < returns 0 on success like a process would, polling stats while it runs > #
+        started = self.call(method, {**params, "_async": True})
+
+        if started is None or type(started.get("jobid")) is not int:
+            return 1
+
+        jobid: int = started["jobid"]
+
+        with self.lock:
+            self.jobs[jobid] = method
+
+        status: dict[str, Any] | None = None
+
+        try:
+            while True:
+                if cancel is not None and cancel.wait(POLL_INTERVAL):
+                    self.call("job/stop", {"jobid": jobid})
+                    cancel = None
+                elif cancel is None:
+                    time.sleep(POLL_INTERVAL)
+
+                if on_stats is not None:
+                    stats = self.call("core/stats", {"group": f"job/{jobid}"}, quiet=True)
+
+                    if stats is not None:
+                        on_stats(parseStats(stats))
+
+                status = self.call("job/status", {"jobid": jobid})
+
+                if status is None or status.get("finished") is True:
+                    break
+
+        finally:
+            with self.lock:
+                self.jobs.pop(jobid, None)
+
+            self.call("core/stats-delete", {"group": f"job/{jobid}"}, quiet=True)
+
+        if status is None or status.get("success") is not True:
+            error = "daemon stopped" if status is None else status.get("error", "")
+            APP_LOGGER.error(f"rclone: {error}")
+            return 1
+
+        return 0
+
+    # < ------------------------------------------------------------------- > #
+
+    def stop(self) -> None:
+        with self.lock:
+            jobs = list(self.jobs)
+
+        for jobid in jobs:
+            self.call("job/stop", {"jobid": jobid}, timeout=2, quiet=True)
+
+        if self.isRunning():
+            self.call("core/quit", timeout=2, quiet=True)
+
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.terminate()
+                self.process.wait()
+
+        if self.session is not None:
+            self.session.close()
+
+        self.process = None
+        self.session = None
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+_DAEMON_LOCK = Lock()
+_DAEMON: list[RcloneDaemon] = []
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def rcloneDaemon(rclone_exe: Path, config_file: Path, fingerprint: str) -> RcloneDaemon | None:
+    # < one daemon for the app's lifetime, restarted when rclone.conf changes > #
+    with _DAEMON_LOCK:
+        if _DAEMON:
+            daemon = _DAEMON[0]
+
+            if daemon.isRunning() and daemon.fingerprint == fingerprint:
+                return daemon
+
+            _DAEMON.clear()
+            daemon.stop()
+
+        daemon = RcloneDaemon(rclone_exe, config_file, fingerprint)
+
+        if not daemon.start():
+            return None
+
+        _DAEMON.append(daemon)
+
+    return daemon
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@atexit.register
+def stopDaemon() -> None:
+    with _DAEMON_LOCK:
+        for daemon in _DAEMON:
+            daemon.stop()
+
+        _DAEMON.clear()
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,192 @@
+import hashlib
+import shlex
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE, APP_PATHS
+from minecraft_pack_manager.lib.trace import span
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class RcloneRemote:
+    name: str
+    type: str
+    options: dict[str, str] = field(default_factory=dict)
+    # < combine only: directory alias -> upstream "remote:path" > #
+    upstreams: dict[str, str] = field(default_factory=dict)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class RcloneConfig:
+    path: Path
+    fingerprint: str
+    remotes: dict[str, RcloneRemote] = field(default_factory=dict)
+    # < upstream alias -> name of the combine remote that holds it > #
+    aliases: dict[str, str] = field(default_factory=dict)
+
+    # < ------------------------------------------------------------------- > #
+
+    def remote(self, name: str) -> RcloneRemote | None:
+        return self.remotes.get(name)
+
+    # < ------------------------------------------------------------------- > #
+
+    def combines(self) -> list[RcloneRemote]:
+        return [remote for remote in self.remotes.values() if remote.type == "combine"]
+
+    # < ------------------------------------------------------------------- > #
+
+    def combineFor(self, alias: str) -> RcloneRemote | None:
+        name = self.aliases.get(alias)
+
+        if name is None:
+            return None
+
+        return self.remotes.get(name)
+
+    # < ------------------------------------------------------------------- > #
+
+    def upstreamFor(self, alias: str) -> RcloneRemote | None:
+        # < the real remote an upstream alias points at, e.g. "HTZ0=h:" -> h > #
+        combine = self.combineFor(alias)
+
+        if combine is None:
+            return None
+
+        return self.remotes.get(combine.upstreams[alias].partition(":")[0])
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+_CONFIG_LOCK = Lock()
+_CONFIG_CACHE: dict[Path, tuple[tuple[int, int], RcloneConfig]] = {}
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def rcloneConfigFile() -> Path:
+    override = APP_PACKAGE.getConfig().getConfig().get("rclone_config")
+
+    if override is not None:
+        return Path(str(override))
+
+    return APP_PATHS.settings().joinpath("rclone.conf")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseUpstreams(value: str) -> dict[str, str]:
+    # < "alias=remote:path alias2=remote2:", aliases with spaces are quoted > #
+    upstreams: dict[str, str] = {}
+
+    try:
+        words = shlex.split(value)
+    except ValueError:
+        words = value.split()
+
+    for word in words:
+        alias, separator, target = word.partition("=")
+
+        if separator == "" or alias.strip() == "":
+            continue
+
+        upstreams[alias.strip()] = target.strip()
+
+    return upstreams
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseRcloneConfig(path: Path, text: str, fingerprint: str = "") -> RcloneConfig:
+    config = RcloneConfig(path, fingerprint)
+    current: RcloneRemote | None = None
+
+    for line in text.splitlines():
+        line = line.strip()
+
+        if line == "" or line.startswith(("#", ";")):
+            continue
+
+        if line.startswith("[") and line.endswith("]"):
+            current = RcloneRemote(line[1:-1].strip(), "")
+            config.remotes[current.name] = current
+            continue
+
+        if current is None:
+            continue
+
+        key, separator, value = line.partition("=")
+
+        if separator == "":
+            continue
+
+        current.options[key.strip()] = value.strip()
+
+    for remote in config.remotes.values():
+        remote.type = remote.options.get("type", "")
+
+        if remote.type != "combine":
+            continue
+
+        remote.upstreams = parseUpstreams(remote.options.get("upstreams", ""))
+
+        for alias in remote.upstreams:
+            config.aliases.setdefault(alias, remote.name)
+
+    return config
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def loadRcloneConfig(path: Path | None = None) -> RcloneConfig | None:
+    # < parsed once, then reused until the file's mtime or size changes > #
+    if path is None:
+        path = rcloneConfigFile()
+
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    with _CONFIG_LOCK:
+        cached = _CONFIG_CACHE.get(path)
+
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    try:
+        data = path.read_bytes()
+    except OSError as error:
+        APP_LOGGER.error(error)
+        return None
+
+    with span("rclone.parse_config", size=data.__len__()):
+        fingerprint = hashlib.sha256(data).hexdigest()
+        config = parseRcloneConfig(path, data.decode("utf-8-sig", errors="replace"), fingerprint)
+
+    with _CONFIG_LOCK:
+        _CONFIG_CACHE[path] = (key, config)
+
+    APP_LOGGER.debug(f"parsed {config.remotes.__len__()} rclone remotes from {path}")
+
+    return config
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,151 @@
+import hashlib
+import os
+
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+
+from minecraft_pack_manager.lib import cache
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class ScrubEntry:
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def contentDigest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class ScrubIndex:
+    def __init__(self, name: str = "scrub_index") -> None:
+        # < attributes > #
+        self.name: str = name
+        self.entries: dict[str, ScrubEntry] = {}
+
+        self.lock = Lock()
+        # < held across a whole save, so an older snapshot never lands after a newer one > #
+        self.save_lock = Lock()
+        self.loaded: bool = False
+        self.dirty: bool = False
+
+    # < ------------------------------------------------------------------- > #
+
+    def load(self) -> None:
+        with self.lock:
+            if self.loaded:
+                return
+
+            self.loaded = True
+
+            # < the index is not tied to any other file, so it has no fingerprint > #
+            cached = cache.readCache(self.name, "")
+
+            if cached is None:
+                return
+
+            entries = cached[0].get("entries")
+
+            if type(entries) is not dict:
+                return
+
+            for path, values in entries.items():
+                try:
+                    size, mtime_ns, digest = values
+                    self.entries[path] = ScrubEntry(int(size), int(mtime_ns), str(digest))
+                except (TypeError, ValueError):
+                    continue
+
+    # < ------------------------------------------------------------------- > #
+
+    def save(self) -> None:
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+
+                entries: dict[str, object] = {
+                    path: [entry.size, entry.mtime_ns, entry.digest]
+                    for path, entry in self.entries.items()
+                }
+                # < cleared before writing so records made meanwhile mark it dirty again > #
+                self.dirty = False
+
+            # < a failed write keeps the entries pending for the next save > #
+            if not cache.writeCache(self.name, "", {"entries": entries}):
+                with self.lock:
+                    self.dirty = True
+
+    # < ------------------------------------------------------------------- > #
+
+    def isUnchanged(self, path: Path, stat: os.stat_result) -> bool:
+        with self.lock:
+            entry = self.entries.get(path.as_posix())
+
+        if entry is None:
+            return False
+
+        return entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns
+
+    # < ------------------------------------------------------------------- > #
+
+    def digestFor(self, path: Path, stat: os.stat_result) -> str | None:
+        # < the recorded digest, if the file has not changed since > #
+        with self.lock:
+            entry = self.entries.get(path.as_posix())
+
+        if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+            return None
+
+        return entry.digest
+
+    # < ------------------------------------------------------------------- > #
+
+    def hasDigest(self, path: Path, digest: str) -> bool:
+        with self.lock:
+            entry = self.entries.get(path.as_posix())
+
+        return entry is not None and entry.digest == digest
+
+    # < ------------------------------------------------------------------- > #
+
+    def record(self, path: Path, stat: os.stat_result, digest: str) -> None:
+        with self.lock:
+            self.entries[path.as_posix()] = ScrubEntry(stat.st_size, stat.st_mtime_ns, digest)
+            self.dirty = True
+
+    # < ------------------------------------------------------------------- > #
+
+    def prune(self, root: Path, seen: set[str]) -> None:
+        # < forget worlds under root that no longer exist > #
+        prefix = f"{root.as_posix()}/"
+
+        with self.lock:
+            for path in [path for path in self.entries if path.startswith(prefix)]:
+                if path in seen:
+                    continue
+
+                del self.entries[path]
+                self.dirty = True
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+SCRUB_INDEX = ScrubIndex()
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,282 @@
+import heapq
+import itertools
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import Enum
+from threading import Condition, Event, Thread
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE
+from minecraft_pack_manager.lib.progress import TransferStats
+from minecraft_pack_manager.lib.rclone import loadRcloneConfig
+from minecraft_pack_manager.lib.transfer import UPLOAD_UPSTREAM, transfer
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class TaskState(Enum):
+    Queued = 0
+    Running = 1
+    Done = 2
+    Failed = 3
+    Cancelled = 4
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass(eq=False)
+class TransferTask:
+    source: str
+    destination: str
+    priority: int = 0
+    state: TaskState = TaskState.Queued
+    returncode: int | None = None
+    stats: TransferStats | None = None
+    cancel_event: Event = field(default_factory=Event)
+    # < the packs and backend this task occupies while running > #
+    packs: tuple[str, ...] = ()
+    backend: str = ""
+
+    # < ------------------------------------------------------------------- > #
+
+    def isFinished(self) -> bool:
+        return self.state in (TaskState.Done, TaskState.Failed, TaskState.Cancelled)
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+TransferFunction = Callable[[str, str, Event, Callable[[TransferStats], None]], int | None]
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def transferEndpoints(source: str, destination: str, upload_upstream: str) -> tuple[str, str]:
+    # < resolves "Make New Folder" the same way transfer() does > #
+    if destination != "Make New Folder":
+        return source, destination
+
+    upstream, name = source.partition(":")[::2]
+
+    if upstream == "LOCL":
+        return source, f"{upload_upstream}:{name}"
+
+    return source, f"LOCL:{name}"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def backendFor(source: str, destination: str) -> str:
+    # < the real remote behind the upstream alias is what needs protecting > #
+    alias = source if not source.startswith("LOCL:") else destination
+    alias = alias.partition(":")[0]
+
+    rclone_config = loadRcloneConfig()
+
+    if rclone_config is None:
+        return alias
+
+    upstream = rclone_config.upstreamFor(alias)
+
+    if upstream is None:
+        return alias
+
+    return upstream.name
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class TransferScheduler:
+    def __init__(
+        self,
+        run: TransferFunction,
+        max_concurrent: int = 3,
+        max_per_backend: int = 2,
+        backend_limits: dict[str, int] | None = None,
+        upload_upstream: str = UPLOAD_UPSTREAM,
+        on_update: Callable[[TransferTask], None] | None = None,
+    ) -> None:
+        # < attributes > #
+        self.run: TransferFunction = run
+        self.max_concurrent: int = max(1, max_concurrent)
+        self.max_per_backend: int = max(1, max_per_backend)
+        self.backend_limits: dict[str, int] = backend_limits or {}
+        self.upload_upstream: str = upload_upstream
+        self.on_update: Callable[[TransferTask], None] | None = on_update
+
+        self.condition = Condition()
+        self.counter = itertools.count()
+
+        self.queue: list[tuple[int, int, TransferTask]] = []
+        self.running: list[TransferTask] = []
+
+    # < ------------------------------------------------------------------- > #
+
+    def submit(self, source: str, destination: str, priority: int = 0) -> TransferTask:
+        packs = transferEndpoints(source, destination, self.upload_upstream)
+        backend = backendFor(*packs)
+
+        with self.condition:
+            # < the same request twice is one request > #
+            for _order, _sequence, queued in self.queue:
+                if queued.packs == packs:
+                    return queued
+
+            task = TransferTask(source, destination, priority, packs=packs, backend=backend)
+
+            heapq.heappush(self.queue, (-priority, next(self.counter), task))
+
+        self.notify(task)
+        self.dispatch()
+
+        return task
+
+    # < ------------------------------------------------------------------- > #
+
+    def cancel(self, task: TransferTask) -> None:
+        task.cancel_event.set()
+
+        with self.condition:
+            queued = [entry for entry in self.queue if entry[2] is task]
+
+            for entry in queued:
+                self.queue.remove(entry)
+                heapq.heapify(self.queue)
+                task.state = TaskState.Cancelled
+
+            self.condition.notify_all()
+
+        if queued:
+            self.notify(task)
+
+    # < ------------------------------------------------------------------- > #
+
+    def cancelAll(self) -> None:
+        with self.condition:
+            tasks = [entry[2] for entry in self.queue] + self.running
+
+        for task in tasks:
+            self.cancel(task)
+
+    # < ------------------------------------------------------------------- > #
+
+    def wait(self) -> None:
+        with self.condition:
+            self.condition.wait_for(lambda: not self.queue and not self.running)
+
+    # < ------------------------------------------------------------------- > #
+
+    def isEligible(self, task: TransferTask) -> bool:
+        # < a pack is never synced twice at once, backends have their own caps > #
+        busy = {pack for running in self.running for pack in running.packs}
+
+        if busy.intersection(task.packs):
+            return False
+
+        limit = self.backend_limits.get(task.backend, self.max_per_backend)
+        load = sum(1 for running in self.running if running.backend == task.backend)
+
+        return load < limit
+
+    # < ------------------------------------------------------------------- > #
+
+    def dispatch(self) -> None:
+        started: list[TransferTask] = []
+
+        with self.condition:
+            skipped: list[tuple[int, int, TransferTask]] = []
+
+            while self.queue and self.running.__len__() < self.max_concurrent:
+                entry = heapq.heappop(self.queue)
+
+                if not self.isEligible(entry[2]):
+                    skipped.append(entry)
+                    continue
+
+                entry[2].state = TaskState.Running
+                self.running.append(entry[2])
+                started.append(entry[2])
+
+            for entry in skipped:
+                heapq.heappush(self.queue, entry)
+
+        for task in started:
+            self.notify(task)
+            Thread(target=self.execute, args=(task,), daemon=True).start()
+
+    # < ------------------------------------------------------------------- > #
+
+    def execute(self, task: TransferTask) -> None:
+        def onStats(stats: TransferStats) -> None:
+            task.stats = stats
+            self.notify(task)
+
+        try:
+            task.returncode = self.run(task.source, task.destination, task.cancel_event, onStats)
+
+        # < anything escaping would strand the task as running and hang wait() > #
+        except Exception as error:  # noqa: BLE001
+            APP_LOGGER.exception(f"transfer {task.source} -> {task.destination} failed: {error}")
+            task.returncode = None
+
+        if task.cancel_event.is_set():
+            task.state = TaskState.Cancelled
+        elif task.returncode == 0:
+            task.state = TaskState.Done
+        else:
+            task.state = TaskState.Failed
+
+        with self.condition:
+            self.running.remove(task)
+            self.condition.notify_all()
+
+        self.notify(task)
+        self.dispatch()
+
+    # < ------------------------------------------------------------------- > #
+
+    def notify(self, task: TransferTask) -> None:
+        if self.on_update is None:
+            return
+
+        # < a signal of a deleted qt object raises RuntimeError, a closed stdout OSError > #
+        try:
+            self.on_update(task)
+        except (OSError, RuntimeError) as error:
+            APP_LOGGER.error(f"transfer update callback failed: {error}")
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def createScheduler(on_update: Callable[[TransferTask], None] | None = None) -> TransferScheduler:
+    config = APP_PACKAGE.getConfig().getConfig()
+
+    backend_limits = config.get("rclone_backend_limits", {})
+    if type(backend_limits) is not dict:
+        backend_limits = {}
+
+    def run(
+        source: str, destination: str, cancel: Event, on_stats: Callable[[TransferStats], None]
+    ) -> int | None:
+        return transfer(source, destination, cancel, show_progress=False, on_stats=on_stats)
+
+    return TransferScheduler(
+        run,
+        max_concurrent=int(config.get("rclone_max_transfers", 3)),
+        max_per_backend=int(config.get("rclone_max_per_backend", 2)),
+        backend_limits={str(key): int(value) for key, value in backend_limits.items()},
+        on_update=on_update,
+    )
+
+
+# < ----------------------------------------------------------------------- > #
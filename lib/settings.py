@@ -1,12 +1,55 @@
+from typing import TYPE_CHECKING
+
 from minecraft_pack_manager import APP_PATHS
-from photon.lib.gui.qt import QFontVault, QImageVault
+
+
+if TYPE_CHECKING:
+    from minecraft_pack_manager.lib.assets import Assets
+    from photon.lib.gui.qt import QFontVault, QImageVault
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+_VAULTS: dict[str, object] = {}
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def __getattr__(name: str) -> object:
+    # < the vaults pull in Qt, so they are only built when the gui asks > #
+    if name in _VAULTS:
+        return _VAULTS[name]
+
+    match name:
+        case "APP_ASSETS":
+            from minecraft_pack_manager.lib.assets import Assets
+
+            _VAULTS[name] = Assets()
+
+        case "APP_FONT_VAULT":
+            from photon.lib.gui.qt import QFontVault
+
+            _VAULTS[name] = QFontVault(APP_PATHS.fonts())
+
+        case "APP_IMAGE_VAULT":
+            from photon.lib.gui.qt import QImageVault
+
+            _VAULTS[name] = QImageVault()
+
+        case _:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return _VAULTS[name]
 
 
 # < ----------------------------------------------------------------------- > #
 
 
-APP_FONT_VAULT = QFontVault(APP_PATHS.fonts())
-APP_IMAGE_VAULT = QImageVault()
+APP_ASSETS: "Assets"
+APP_FONT_VAULT: "QFontVault"
+APP_IMAGE_VAULT: "QImageVault"
 
 
 # < ----------------------------------------------------------------------- > #
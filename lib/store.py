@@ -0,0 +1,603 @@
+import errno
+import os
+import shutil
+import sys
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event, Lock
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE, APP_PATHS
+from minecraft_pack_manager.lib import cache
+from minecraft_pack_manager.lib.manifest import PackManifest, fileDigest
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < folders whose files are shared between instances, mostly jars > #
+STORE_DIRECTORIES = ("mods", "resourcepacks", "shaderpacks", "libraries")
+# < launchers keep the game folder either beside the instance files or as the instance > #
+GAME_DIRECTORIES = (".minecraft", "minecraft")
+
+# < below one filesystem block a link saves nothing > #
+MIN_FILE_SIZE = 4 * 1024
+
+# < linux ioctl that makes target share source's blocks, btrfs and xfs support it > #
+FICLONE = 0x40049409
+CLONE_UNSUPPORTED = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EBADF)
+
+LINK_MODES = ("auto", "hardlink", "reflink")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class StoreEntry:
+    size: int
+    mtime_ns: int
+    digest: str
+    # < a reflink shares blocks but not the inode, so it cannot be told apart by stat > #
+    cloned: bool = False
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class DedupeResult:
+    files: int = 0
+    linked: int = 0
+    saved: int = 0
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class StoreIndex:
+    def __init__(self, name: str = "store_index") -> None:
+        # < attributes > #
+        self.name: str = name
+        # < "device:inode" -> entry, every hard link of a file shares one > #
+        self.entries: dict[str, StoreEntry] = {}
+
+        self.lock = Lock()
+        # < held across a whole save, so an older snapshot never lands after a newer one > #
+        self.save_lock = Lock()
+        self.loaded: bool = False
+        self.dirty: bool = False
+
+    # < ------------------------------------------------------------------- > #
+
+    def load(self) -> None:
+        with self.lock:
+            if self.loaded:
+                return
+
+            self.loaded = True
+            cached = cache.readCache(self.name, "")
+
+            if cached is None:
+                return
+
+            entries = cached[0].get("entries")
+
+            if type(entries) is not dict:
+                return
+
+            for key, values in entries.items():
+                try:
+                    size, mtime_ns, digest, cloned = values
+                    self.entries[key] = StoreEntry(
+                        int(size), int(mtime_ns), str(digest), cloned is True
+                    )
+                except (TypeError, ValueError):
+                    continue
+
+    # < ------------------------------------------------------------------- > #
+
+    def save(self) -> None:
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+
+                entries: dict[str, object] = {
+                    key: [entry.size, entry.mtime_ns, entry.digest, entry.cloned]
+                    for key, entry in self.entries.items()
+                }
+                # < cleared before writing so records made meanwhile mark it dirty again > #
+                self.dirty = False
+
+            # < a failed write keeps the entries pending for the next save > #
+            if not cache.writeCache(self.name, "", {"entries": entries}):
+                with self.lock:
+                    self.dirty = True
+
+    # < ------------------------------------------------------------------- > #
+
+    def entryFor(self, stat: os.stat_result) -> StoreEntry | None:
+        # < the recorded entry, if the inode has not changed since > #
+        with self.lock:
+            entry = self.entries.get(inodeKey(stat))
+
+        if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+            return None
+
+        return entry
+
+    # < ------------------------------------------------------------------- > #
+
+    def record(self, stat: os.stat_result, digest: str, cloned: bool = False) -> None:
+        with self.lock:
+            self.entries[inodeKey(stat)] = StoreEntry(
+                stat.st_size, stat.st_mtime_ns, digest, cloned
+            )
+            self.dirty = True
+
+    # < ------------------------------------------------------------------- > #
+
+    def prune(self, seen: set[str]) -> None:
+        with self.lock:
+            for key in [key for key in self.entries if key not in seen]:
+                del self.entries[key]
+                self.dirty = True
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+STORE_INDEX = StoreIndex()
+
+_CLONE_LOCK = Lock()
+# < devices a reflink already failed on, so auto mode stops trying them > #
+_CLONE_UNSUPPORTED_DEVICES: set[int] = set()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def inodeKey(stat: os.stat_result) -> str:
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def storeRoot() -> Path:
+    # < hard links only work within one filesystem, so the store can be moved beside instances > #
+    config = APP_PACKAGE.getConfig().getConfig()
+    path = config.get("store_path")
+
+    if path is None:
+        return APP_PATHS.settings().joinpath("store")
+
+    return Path(str(path))
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def storeEnabled() -> bool:
+    # < the store exists once a dedupe pass has run > #
+    config = APP_PACKAGE.getConfig().getConfig()
+
+    return config.get("use_local_store", True) is not False and storeRoot().is_dir()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def linkMode() -> str:
+    config = APP_PACKAGE.getConfig().getConfig()
+    mode = str(config.get("store_link_mode", "auto"))
+
+    if mode not in LINK_MODES:
+        APP_LOGGER.warning(f"ignoring invalid store_link_mode setting: {mode}")
+        return "auto"
+
+    return mode
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def objectPath(root: Path, digest: str) -> Path:
+    return root.joinpath("objects", digest[:2], digest)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def isStorePath(relative: str) -> bool:
+    # < "mods/x.jar" or ".minecraft/mods/x.jar", but not "mods" itself > #
+    parts = relative.split("/")
+
+    if parts[0] in GAME_DIRECTORIES:
+        parts = parts[1:]
+
+    return parts.__len__() > 1 and parts[0] in STORE_DIRECTORIES and ".." not in parts
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def storeFiles(instance: Path) -> Iterator[Path]:
+    roots = [instance, *(instance.joinpath(name) for name in GAME_DIRECTORIES)]
+    pending = [root.joinpath(name) for root in roots for name in STORE_DIRECTORIES]
+
+    while pending:
+        directory = pending.pop()
+
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(Path(entry.path))
+
+                    elif entry.is_file(follow_symlinks=False):
+                        yield Path(entry.path)
+
+                except OSError:
+                    continue
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def cloneFile(source: Path, target: Path, device: int) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+
+    with _CLONE_LOCK:
+        if device in _CLONE_UNSUPPORTED_DEVICES:
+            return False
+
+    import fcntl
+
+    try:
+        with open(source, "rb") as source_file, open(target, "wb") as target_file:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+
+        shutil.copymode(source, target)
+
+    except OSError as error:
+        target.unlink(missing_ok=True)
+
+        if error.errno in CLONE_UNSUPPORTED:
+            with _CLONE_LOCK:
+                _CLONE_UNSUPPORTED_DEVICES.add(device)
+
+        return False
+
+    return True
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def placeFile(source: Path, target: Path, mode: str, mtime_ns: int) -> str | None:
+    # < returns "clone" or "link", target is only ever replaced whole > #
+    temporary = target.with_name(f"{target.name}.mpm-tmp")
+    temporary.unlink(missing_ok=True)
+
+    try:
+        device = os.stat(source).st_dev
+
+        if mode != "hardlink" and cloneFile(source, temporary, device):
+            # < a clone has its own mtime, so rclone sees the file as it was > #
+            os.utime(temporary, ns=(mtime_ns, mtime_ns))
+            method = "clone"
+
+        elif mode != "reflink":
+            os.link(source, temporary)
+            method = "link"
+
+        else:
+            return None
+
+        temporary.replace(target)
+
+    except OSError as error:
+        APP_LOGGER.warning(f"failed to link {target.name} from the store")
+        APP_LOGGER.debug(error)
+        temporary.unlink(missing_ok=True)
+        return None
+
+    return method
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def dedupeFile(
+    path: Path, stat: os.stat_result, digest: str, root: Path, mode: str
+) -> os.stat_result | None:
+    # < returns the file's stat afterwards, a new inode means its copy was freed > #
+    store_object = objectPath(root, digest)
+
+    try:
+        object_stat: os.stat_result | None = os.stat(store_object)
+    except FileNotFoundError:
+        object_stat = None
+    except OSError:
+        return None
+
+    # < the first copy seen becomes the store's > #
+    if object_stat is None:
+        store_object.parent.mkdir(parents=True, exist_ok=True)
+        method = placeFile(path, store_object, mode, stat.st_mtime_ns)
+
+        if method is None:
+            return None
+
+        STORE_INDEX.record(stat, digest, method == "clone")
+        return stat
+
+    if object_stat.st_dev == stat.st_dev and object_stat.st_ino == stat.st_ino:
+        return stat
+
+    if object_stat.st_size != stat.st_size:
+        APP_LOGGER.warning(f"store object {digest} has the wrong size, skipping {path.name}")
+        return None
+
+    method = placeFile(store_object, path, mode, stat.st_mtime_ns)
+
+    if method is None:
+        return None
+
+    linked = os.stat(path)
+    STORE_INDEX.record(linked, digest, method == "clone")
+
+    return linked
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def dedupeInstance(
+    instance: Path,
+    cancel: Event | None = None,
+    seen: dict[str, str] | None = None,
+    workers: int = 4,
+) -> DedupeResult:
+    # < seen collects inode key -> digest of every file kept, for pruning after a full pass > #
+    result = DedupeResult()
+    root = storeRoot()
+    mode = linkMode()
+
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+
+        if os.stat(root).st_dev != os.stat(instance).st_dev:
+            APP_LOGGER.warning(f"{instance.name} is on another filesystem than the store")
+            return result
+
+    except OSError as error:
+        APP_LOGGER.warning(f"failed to open the store at {root}")
+        APP_LOGGER.debug(error)
+        return result
+
+    STORE_INDEX.load()
+
+    known: list[tuple[Path, os.stat_result, str]] = []
+    pending: list[tuple[Path, os.stat_result]] = []
+
+    for path in storeFiles(instance):
+        try:
+            # < scandir leaves the inode empty on windows, a real stat does not > #
+            stat = os.stat(path)
+        except OSError:
+            continue
+
+        if stat.st_size < MIN_FILE_SIZE:
+            continue
+
+        entry = STORE_INDEX.entryFor(stat)
+
+        if entry is None:
+            pending.append((path, stat))
+
+        elif not entry.cloned:
+            known.append((path, stat, entry.digest))
+
+        elif seen is not None:
+            seen[inodeKey(stat)] = entry.digest
+
+    def hashFile(item: tuple[Path, os.stat_result]) -> str | None:
+        try:
+            return fileDigest(item[0])
+        except OSError as error:
+            APP_LOGGER.warning(f"failed to hash {item[0]}")
+            APP_LOGGER.debug(error)
+            return None
+
+    # < only files new since the last pass are read, hashlib releases the gil > #
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for (path, stat), digest in zip(pending, executor.map(hashFile, pending)):
+            if digest is not None:
+                STORE_INDEX.record(stat, digest)
+                known.append((path, stat, digest))
+
+    for path, stat, digest in known:
+        if cancel is not None and cancel.is_set():
+            break
+
+        result.files = result.files + 1
+        linked = dedupeFile(path, stat, digest, root, mode)
+
+        if linked is None:
+            continue
+
+        if seen is not None:
+            seen[inodeKey(linked)] = digest
+
+        if linked.st_ino != stat.st_ino:
+            result.linked = result.linked + 1
+            result.saved = result.saved + stat.st_size
+
+    STORE_INDEX.save()
+
+    return result
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def dedupeInstances(cancel: Event | None = None) -> DedupeResult:
+    config = APP_PACKAGE.getConfig().getConfig()
+    path = config.get("instances_path")
+    result = DedupeResult()
+
+    if path is None:
+        return result
+
+    seen: dict[str, str] = {}
+
+    for instance in sorted(Path(path).iterdir()):
+        if cancel is not None and cancel.is_set():
+            return result
+
+        if not instance.is_dir() or instance.name.startswith("."):
+            continue
+
+        instance_result = dedupeInstance(instance, cancel, seen)
+
+        result.files = result.files + instance_result.files
+        result.linked = result.linked + instance_result.linked
+        result.saved = result.saved + instance_result.saved
+
+    # < a partial pass has not seen every file, so nothing may be pruned > #
+    if cancel is not None and cancel.is_set():
+        return result
+
+    STORE_INDEX.prune(set(seen))
+    STORE_INDEX.save()
+
+    removed = pruneStore(storeRoot(), set(seen.values()))
+    APP_LOGGER.debug(f"store: {result.linked} of {result.files} files linked, {removed} removed")
+
+    return result
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def pruneStore(root: Path, digests: set[str]) -> int:
+    # < objects no instance holds any more, a link count above one means one still does > #
+    removed = 0
+
+    for store_object in root.joinpath("objects").glob("*/*"):
+        if store_object.name in digests:
+            continue
+
+        try:
+            if os.stat(store_object).st_nlink > 1:
+                continue
+
+            store_object.unlink()
+
+        except OSError:
+            continue
+
+        removed = removed + 1
+
+    return removed
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def verifyObject(store_object: Path, size: int, digest: str) -> bool:
+    # < an in place write to any hard link of an object changes the object too, so its name > #
+    # < alone proves nothing, the index vouches for an unchanged inode, anything else is read > #
+    try:
+        stat = os.stat(store_object)
+    except OSError:
+        return False
+
+    if stat.st_size != size:
+        return False
+
+    entry = STORE_INDEX.entryFor(stat)
+
+    if entry is not None:
+        return entry.digest == digest
+
+    try:
+        actual = fileDigest(store_object)
+    except OSError as error:
+        APP_LOGGER.debug(error)
+        return False
+
+    if actual != digest:
+        APP_LOGGER.warning(f"store object {digest} was modified in place, not seeding from it")
+        return False
+
+    STORE_INDEX.record(stat, actual)
+
+    return True
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def seedFromStore(local_path: Path, manifest: PackManifest) -> int:
+    # < links files a download is about to fetch, returns how many were found locally > #
+    root = storeRoot()
+    mode = linkMode()
+    seeded = 0
+
+    try:
+        local_path.mkdir(parents=True, exist_ok=True)
+
+        if os.stat(root).st_dev != os.stat(local_path).st_dev:
+            return 0
+
+    except OSError:
+        return 0
+
+    STORE_INDEX.load()
+
+    for relative, entry in manifest.files.items():
+        if entry.size < MIN_FILE_SIZE or not isStorePath(relative):
+            continue
+
+        target = local_path.joinpath(relative)
+
+        # < files already there are left for rclone to compare > #
+        if os.path.lexists(target):
+            continue
+
+        store_object = objectPath(root, entry.digest)
+
+        if not verifyObject(store_object, entry.size, entry.digest):
+            continue
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # < the manifest built next hashes the file itself, it never trusts the remote digest > #
+        if placeFile(store_object, target, mode, entry.mtime_ns) is None:
+            continue
+
+        seeded = seeded + 1
+
+    STORE_INDEX.save()
+
+    if seeded > 0:
+        APP_LOGGER.debug(f"seeded {seeded} files of {local_path.name} from the store")
+
+    return seeded
+
+
+# < ----------------------------------------------------------------------- > #
@@ -0,0 +1,190 @@
+import functools
+import json
+import os
+import threading
+import time
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import ParamSpec, Self, TypeVar
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class Tracer:
+    def __init__(self) -> None:
+        # < attributes > #
+        self.started_ns: int = time.perf_counter_ns()
+        self.events: list[dict[str, object]] = []
+        self.threads: dict[int, str] = {}
+
+    # < ------------------------------------------------------------------- > #
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict[str, object]) -> None:
+        thread = threading.current_thread()
+        tid = threading.get_native_id()
+        self.threads.setdefault(tid, thread.name)
+
+        # < a complete event, chrome and perfetto both take microseconds > #
+        event: dict[str, object] = {
+            "name": name,
+            "cat": name.partition(".")[0],
+            "ph": "X",
+            "ts": (start_ns - self.started_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": tid,
+        }
+
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+
+        # < list.append is atomic, so worker threads need no lock > #
+        self.events.append(event)
+
+    # < ------------------------------------------------------------------- > #
+
+    def toJson(self) -> str:
+        metadata: list[dict[str, object]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self.threads.items())
+        ]
+
+        return json.dumps({"traceEvents": [*metadata, *self.events], "displayTimeUnit": "ms"})
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class Span:
+    __slots__ = ("args", "name", "start_ns", "tracer")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, object]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    # < ------------------------------------------------------------------- > #
+
+    def __enter__(self) -> Self:
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    # < ------------------------------------------------------------------- > #
+
+    def __exit__(self, *_exc: object) -> None:
+        self.tracer.record(self.name, self.start_ns, time.perf_counter_ns(), self.args)
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> Self:
+        return self
+
+    # < ------------------------------------------------------------------- > #
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+# < None while tracing is off, which is all span() checks > #
+_TRACER: Tracer | None = None
+NULL_SPAN = NullSpan()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def span(name: str, **args: object) -> Span | NullSpan:
+    tracer = _TRACER
+
+    if tracer is None:
+        return NULL_SPAN
+
+    return Span(tracer, name, args)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def traced(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    # < for functions with many returns, where a with block would reindent the body > #
+    def decorator(function: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            tracer = _TRACER
+
+            if tracer is None:
+                return function(*args, **kwargs)
+
+            with Span(tracer, name, {}):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def tracing() -> bool:
+    return _TRACER is not None
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def startTracing() -> None:
+    global _TRACER
+
+    _TRACER = Tracer()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def writeTrace(path: Path) -> int:
+    # < stops tracing and writes every span so far, returns how many > #
+    global _TRACER
+
+    tracer, _TRACER = _TRACER, None
+
+    if tracer is None:
+        return 0
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(tracer.toJson())
+
+    return tracer.events.__len__()
+
+
+# < ----------------------------------------------------------------------- > #
@@ -1,16 +1,62 @@
 import json
 import subprocess
+import tempfile
+import time
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from io import BytesIO
 from pathlib import Path
-from zipfile import ZipFile
+from threading import Event, Thread
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE
+from minecraft_pack_manager.lib import cache
+from minecraft_pack_manager.lib.blobs import (
+    DEFAULT_BLOB_THRESHOLD,
+    STAGING_PREFIX,
+    blobPaths,
+    blobRemote,
+    materialiseBlobs,
+    neededBlobs,
+    stageBlobs,
+    staleLargeFiles,
+)
+from minecraft_pack_manager.lib.instances import instanceCatalog
+from minecraft_pack_manager.lib.manifest import (
+    MANIFEST_NAME,
+    PackManifest,
+    buildManifest,
+    parseManifest,
+)
+from minecraft_pack_manager.lib.nbtscan import removeTag
+from minecraft_pack_manager.lib.packarchive import (
+    ARCHIVE_DIRECTORY,
+    ARCHIVE_INDEX,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_THRESHOLD,
+    ArchiveIndex,
+    extractChunk,
+    neededChunks,
+    parseIndex,
+    planArchive,
+    staleSmallFiles,
+    writeChunk,
+)
+from minecraft_pack_manager.lib.progress import MAX_LINE_LENGTH, StatsParser, TransferStats
+from minecraft_pack_manager.lib.provision import rcloneExecutable
+from minecraft_pack_manager.lib.rcd import RcloneDaemon, daemonOptions, rcloneDaemon
+from minecraft_pack_manager.lib.rclone import RcloneConfig, loadRcloneConfig
+from minecraft_pack_manager.lib.saves import SCRUB_INDEX, contentDigest
+from minecraft_pack_manager.lib.store import dedupeInstance, seedFromStore, storeEnabled
+from minecraft_pack_manager.lib.trace import span, traced
+from minecraft_pack_manager.lib.tuning import recordThroughput, tuneTransfer
 
-import requests
 
-from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE, APP_PATHS
-from nbt import nbt
-from PySide6.QtWidgets import QComboBox
+# < ----------------------------------------------------------------------- > #
+
+
+# < where "Make New Folder" uploads go > #
+UPLOAD_UPSTREAM = "HTZ0"
 
 
 # < ----------------------------------------------------------------------- > #
@@ -27,48 +73,81 @@ class RemoteInfo:
 # < ----------------------------------------------------------------------- > #
 
 
-def downloadRclone() -> Path | None:
-    if Path("/etc/os-release").exists() or Path("/usr/lib/os-release").exists():
-        rclone_exe = APP_PATHS.root().joinpath("third_party", "rclone", "rclone")
-        src_link = "https://downloads.rclone.org/rclone-current-linux-amd64.zip"
-    else:
-        rclone_exe = APP_PATHS.root().joinpath("third_party", "rclone", "rclone.exe")
-        src_link = "https://downloads.rclone.org/rclone-current-windows-amd64.zip"
+def runRclone(
+    rclone_args: list[str],
+    cancel: Event | None = None,
+    capture_output: bool = True,
+    timeout: float | None = None,
+) -> tuple[int, str]:
+    # < poll instead of blocking so a cancelled job can stop rclone > #
+    pipe = subprocess.PIPE if capture_output else None
+    process = subprocess.Popen(rclone_args, stdout=pipe, stderr=pipe, text=True)
 
-    response = requests.get(src_link)
+    deadline = None if timeout is None else time.monotonic() + timeout
 
-    if response.status_code != 200:
-        return None
+    while True:
+        try:
+            stdout, _stderr = process.communicate(timeout=0.1)
+            return process.returncode, stdout or ""
 
-    with ZipFile(BytesIO(response.content), "r") as zfp:
-        zfp.extractall(APP_PATHS.root().joinpath("third_party", "rclone"))
+        except subprocess.TimeoutExpired:
+            cancelled = cancel is not None and cancel.is_set()
+            expired = deadline is not None and time.monotonic() > deadline
 
-    for entry in APP_PATHS.root().joinpath("third_party", "rclone").rglob("*"):
-        if entry.is_dir():
-            continue
+            if not cancelled and not expired:
+                continue
 
-        entry.replace(entry.parent.parent.joinpath(entry.name))
+            if expired:
+                APP_LOGGER.warning(f"rclone timed out after {timeout}s: {rclone_args[1:3]}")
 
-    for entry in APP_PATHS.root().joinpath("third_party", "rclone").rglob("*"):
-        if entry.is_dir():
-            try:
-                entry.rmdir()
-            except Exception as error:
-                APP_LOGGER.error(error)
+            process.terminate()
+            process.communicate()
 
-    for entry in APP_PATHS.root().joinpath("third_party").rglob("*"):
-        if entry.is_dir() or entry.name.endswith((".so", ".dll")):
-            entry.chmod(0o740)
-            continue
+            return process.returncode, ""
 
-        entry.chmod(0o640)
 
-    if not rclone_exe.exists():
-        return None
+# < ----------------------------------------------------------------------- > #
+
+
+def streamRclone(
+    rclone_args: list[str], on_output: Callable[[str], None], cancel: Event | None = None
+) -> int:
+    # < stderr is handed over in bounded chunks as it arrives, never buffered whole > #
+    process = subprocess.Popen(
+        rclone_args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
 
-    rclone_exe.chmod(0o740)
+    def readOutput() -> None:
+        if process.stderr is None:
+            return
 
-    return rclone_exe
+        while True:
+            chunk = process.stderr.readline(MAX_LINE_LENGTH)
+
+            if chunk == "":
+                return
+
+            on_output(chunk)
+
+    reader = Thread(target=readOutput, daemon=True)
+    reader.start()
+
+    while True:
+        try:
+            process.wait(timeout=0.1)
+            break
+
+        except subprocess.TimeoutExpired:
+            if cancel is None or not cancel.is_set():
+                continue
+
+            process.terminate()
+            process.wait()
+            break
+
+    reader.join()
+
+    return process.returncode
 
 
 # < ----------------------------------------------------------------------- > #
@@ -78,86 +157,98 @@ def cleanInstanceSaves(instance: Path) -> None:
     if not instance.exists():
         return None
 
+    SCRUB_INDEX.load()
+
+    seen: set[str] = set()
     for entry in instance.rglob("level.dat"):
-        data = nbt.NBTFile(entry)
+        seen.add(entry.as_posix())
 
         try:
-            data.get("Data").pop("Player")
-        except Exception as error:
-            APP_LOGGER.warning("failed to clean player data")
-            APP_LOGGER.debug(error)
+            stat = entry.stat()
+        except OSError:
+            continue
 
-        data.write_file(entry)
+        # < already scrubbed and untouched since, no need to open it > #
+        if SCRUB_INDEX.isUnchanged(entry, stat):
+            continue
 
+        with span("saves.scrub", file=entry.relative_to(instance).as_posix()):
+            raw = entry.read_bytes()
+            digest = contentDigest(raw)
 
-# < ----------------------------------------------------------------------- > #
+            if SCRUB_INDEX.hasDigest(entry, digest):
+                SCRUB_INDEX.record(entry, stat, digest)
+                continue
 
+            try:
+                scrubbed = removeTag(raw, ("Data", "Player"))
+            except ValueError as error:
+                APP_LOGGER.warning("failed to clean player data")
+                APP_LOGGER.debug(error)
+                continue
 
-def updateListFromLocal(to_update: QComboBox) -> None:
-    config = APP_PACKAGE.getConfig().getConfig()
-    path = config.get("instances_path")
+            if scrubbed is None:
+                SCRUB_INDEX.record(entry, stat, digest)
+                continue
 
-    if path is None:
-        return
+            # < only rewrite files that actually lost a tag > #
+            entry.write_bytes(scrubbed)
 
-    for entry in Path(path).iterdir():
-        if not entry.is_dir():
-            continue
+            SCRUB_INDEX.record(entry, entry.stat(), contentDigest(scrubbed))
 
-        cleanInstanceSaves(entry.resolve())
-        to_update.addItem(f"LOCL:{entry.name}")
+    SCRUB_INDEX.prune(instance, seen)
+    SCRUB_INDEX.save()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def listLocalPacks(cancel: Event | None = None) -> list[str]:
+    # < the catalog only rereads folders that changed since the last listing > #
+    return [f"LOCL:{info.name}" for info in instanceCatalog(cancel)]
 
 
 # < ------------------------------------------------------------------- > #
 
 
-def updateListFromRemote(to_update: QComboBox) -> None:
-    if Path("/etc/os-release").exists() or Path("/usr/lib/os-release").exists():
-        rclone_exe = APP_PATHS.root().joinpath("third_party", "rclone", "rclone")
-    else:
-        rclone_exe = APP_PATHS.root().joinpath("third_party", "rclone", "rclone.exe")
+def listRemotePacks(
+    cancel: Event | None = None,
+    on_remote: Callable[[list[str]], None] | None = None,
+    force: bool = False,
+) -> list[str]:
+    rclone_config = loadRcloneConfig()
 
-    if not rclone_exe.exists():
-        rclone_exe = downloadRclone()
+    if rclone_config is None:
+        return []
 
-    if rclone_exe is None or not rclone_exe.exists():
-        return None
+    rclone_config_file = rclone_config.path
 
-    rclone_config_file = APP_PATHS.settings().joinpath("rclone.conf")
+    config = APP_PACKAGE.getConfig().getConfig()
+    ttl = float(config.get("remote_cache_ttl", 300))
 
-    if not rclone_config_file.exists():
-        return None
+    # < serve the cached listing first, only revalidate once it is stale > #
+    fingerprint = rclone_config.fingerprint
+    cached = loadCachedRemotes(fingerprint)
 
-    lines: list[str] = []
-    with open(rclone_config_file) as rclone_config:
-        lines = rclone_config.readlines()
+    if cached is not None and not force:
+        cached_remotes, age = cached
 
-    remotes: list[RemoteInfo] = []
-    i = 1
-    for line in lines:
-        if line == "type = combine\n":
-            combine = lines[i - 2].strip("\n")
-            if not combine.startswith("[") or not combine.endswith("]"):
-                continue
-            combine = combine.removeprefix("[").removesuffix("]")
+        if on_remote is not None:
+            for remote in cached_remotes.values():
+                on_remote(remote.names)
 
-            upstreams = lines[i].strip("\n")
-            if not upstreams.startswith("upstreams = ") or not upstreams.endswith(":"):
-                continue
-            upstreams = upstreams.removeprefix("upstreams = ").strip()
+        if age < ttl:
+            return [name for remote in cached_remotes.values() for name in remote.names]
 
-            j = 0
-            upstreams_list = upstreams.split(":")
-            for upstream in upstreams_list:
-                upstream = upstream.strip()
-                upstream = upstream.split("=")[0]
-                upstreams_list[j] = upstream.strip()
-                j = j + 1
-            upstreams_list.pop()
+    rclone_exe = rcloneExecutable()
 
-            remotes.append(RemoteInfo(combine, upstreams_list, [], []))
+    if rclone_exe is None:
+        return []
 
-        i = i + 1
+    remotes: list[RemoteInfo] = [
+        RemoteInfo(combine.name, list(combine.upstreams), [], [])
+        for combine in rclone_config.combines()
+    ]
 
     rclone_args = [
         rclone_exe.as_posix(),
@@ -165,70 +256,169 @@ def updateListFromRemote(to_update: QComboBox) -> None:
         "drive",
         "--max-depth=3",
         f"--config={rclone_config_file}",
-        "--transfers=8",
         "--checkers=8",
-        "--max-backlog=-1",
-        "--cutoff-mode=soft",
-        "--buffer-size=16M",
         "--dirs-only",
         "--no-modtime",
         "--no-mimetype",
     ]
 
+    daemon = activeDaemon(rclone_exe, rclone_config)
+    concurrency = max(1, int(config.get("rclone_list_concurrency", 4)))
+    timeout = float(config.get("rclone_list_timeout", 60))
+
+    # < every remote is listed at once, bounded by the concurrency cap > #
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(listRemote, remote, rclone_args, cancel, timeout, daemon): remote
+            for remote in remotes
+        }
+
+        for future in as_completed(futures):
+            remote = futures[future]
+            listed = future.result()
+
+            if cancel is not None and cancel.is_set():
+                return []
+
+            # < keep the last known packs of a remote that failed to list > #
+            if not listed and cached is not None and remote.remote in cached[0]:
+                remote.paths = cached[0][remote.remote].paths
+                remote.names = cached[0][remote.remote].names
+
+            if on_remote is not None and remote.names.__len__() > 0:
+                on_remote(remote.names)
+
+    saveCachedRemotes(fingerprint, remotes)
+
+    names: list[str] = []
     for remote in remotes:
-        rclone_args[2] = f"{remote.remote}:"
+        names.extend(remote.names)
 
-        response = subprocess.run(rclone_args, capture_output=True, text=True)
+    return names
 
-        if response.returncode != 0:
-            continue
 
-        entries: list[dict[str, str | int | bool]] = json.loads(response.stdout)
+# < ------------------------------------------------------------------- > #
 
-        for entry in entries:
-            path = entry.get("Path")
 
-            if type(path) is not str:
-                continue
+def loadCachedRemotes(fingerprint: str) -> tuple[dict[str, RemoteInfo], float] | None:
+    cached = cache.readCache("remote_listing", fingerprint)
 
-            if "/Modpacks/" not in path:
-                continue
+    if cached is None:
+        return None
 
-            remote.paths.append(path)
-            remote.names.append(":".join(path.split("/Modpacks/")))
+    data, age = cached
+    entries = data.get("remotes")
 
-    for remote in remotes:
-        to_update.addItems(remote.names)
+    if type(entries) is not list:
+        return None
+
+    remotes: dict[str, RemoteInfo] = {}
+    for entry in entries:
+        try:
+            remote = RemoteInfo(entry["remote"], entry["upstreams"], entry["paths"], entry["names"])
+        except (KeyError, TypeError):
+            return None
+
+        remotes[remote.remote] = remote
+
+    return remotes, age
 
 
 # < ------------------------------------------------------------------- > #
 
 
-def transfer(source_input: QComboBox, destination_input: QComboBox) -> None:
-    if Path("/etc/os-release").exists() or Path("/usr/lib/os-release").exists():
-        rclone_exe = APP_PATHS.root().joinpath("third_party", "rclone", "rclone")
-    else:
-        rclone_exe = APP_PATHS.root().joinpath("third_party", "rclone", "rclone.exe")
+def saveCachedRemotes(fingerprint: str, remotes: list[RemoteInfo]) -> None:
+    entries: list[object] = [
+        {
+            "remote": remote.remote,
+            "upstreams": remote.upstreams,
+            "paths": remote.paths,
+            "names": remote.names,
+        }
+        for remote in remotes
+    ]
+
+    cache.writeCache("remote_listing", fingerprint, {"remotes": entries})
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def listRemote(
+    remote: RemoteInfo,
+    rclone_args: list[str],
+    cancel: Event | None = None,
+    timeout: float | None = None,
+    daemon: RcloneDaemon | None = None,
+) -> bool:
+    if cancel is not None and cancel.is_set():
+        return False
+
+    with span("rclone.lsjson", remote=remote.remote, daemon=daemon is not None):
+        if daemon is not None:
+            options = {"MaxDepth": 3, "Checkers": 8}
+            listed = daemon.listJson(f"{remote.remote}:", options, timeout)
 
-    if not rclone_exe.exists():
-        rclone_exe = downloadRclone()
+            if listed is None:
+                return False
+
+            entries: list[dict[str, str | int | bool]] = listed
+
+        else:
+            rclone_args = rclone_args.copy()
+            rclone_args[2] = f"{remote.remote}:"
+
+            returncode, stdout = runRclone(rclone_args, cancel, timeout=timeout)
+
+            if returncode != 0:
+                return False
+
+            entries = json.loads(stdout)
+
+    for entry in entries:
+        path = entry.get("Path")
+
+        if type(path) is not str:
+            continue
 
-    if rclone_exe is None or not rclone_exe.exists():
+        if "/Modpacks/" not in path:
+            continue
+
+        remote.paths.append(path)
+        remote.names.append(":".join(path.split("/Modpacks/")))
+
+    return True
+
+
+# < ------------------------------------------------------------------- > #
+
+
+@traced("transfer")
+def transfer(
+    source_text: str,
+    destination_text: str,
+    cancel: Event | None = None,
+    show_progress: bool = True,
+    on_stats: Callable[[TransferStats], None] | None = None,
+) -> int | None:
+    rclone_exe = rcloneExecutable()
+
+    if rclone_exe is None:
         return None
 
-    rclone_config_file = APP_PATHS.settings().joinpath("rclone.conf")
+    rclone_config = loadRcloneConfig()
 
-    if not rclone_config_file.exists():
+    if rclone_config is None:
         return None
 
+    rclone_config_file = rclone_config.path
+
     rclone_args = [
         f"{rclone_exe.as_posix()}",
         "sync",
         "source",
         "destination",
         f"--config={rclone_config_file}",
-        "--transfers=16",
-        "--checkers=24",
         "--fast-list",
         "--max-backlog=-1",
         "--cutoff-mode=soft",
@@ -236,8 +426,8 @@ def transfer(source_input: QComboBox, destination_input: QComboBox) -> None:
         "--progress",
         "--progress-terminal-title",
         "--server-side-across-configs",
-        "--buffer-size=16M",
-        "--exclude={logs/**, backups/**, screenshots/**, options.txt}",
+        # < rclone keeps spaces inside braces, " backups/**" would never match > #
+        "--exclude={logs/**,backups/**,screenshots/**,options.txt}",
         # "--dry-run",
     ]
 
@@ -245,83 +435,707 @@ def transfer(source_input: QComboBox, destination_input: QComboBox) -> None:
     path = config.get("instances_path")
 
     if path is None:
-        return
+        return None
 
-    rclone_args[2] = source_input.currentText().replace("LOCL:", f"{path}/")
-    rclone_args[3] = destination_input.currentText().replace("LOCL:", f"{path}/")
+    rclone_args[2] = source_text.replace("LOCL:", f"{path}/")
+    rclone_args[3] = destination_text.replace("LOCL:", f"{path}/")
 
     if rclone_args[2].__len__() < 5 or rclone_args[3].__len__() < 5:
-        return
-
-    lines: list[str] = []
-    with open(rclone_config_file) as rclone_config:
-        lines = rclone_config.readlines()
-
-    remotes: list[RemoteInfo] = []
-    i = 1
-    for line in lines:
-        if line == "type = combine\n":
-            combine = lines[i - 2].strip("\n")
-            if not combine.startswith("[") or not combine.endswith("]"):
-                continue
-            combine = combine.removeprefix("[").removesuffix("]")
-
-            upstreams = lines[i].strip("\n")
-            if not upstreams.startswith("upstreams = ") or not upstreams.endswith(":"):
-                continue
-            upstreams = upstreams.removeprefix("upstreams = ").strip()
-
-            j = 0
-            upstreams_list = upstreams.split(":")
-            for upstream in upstreams_list:
-                upstream = upstream.strip()
-                upstream = upstream.split("=")[0]
-                upstreams_list[j] = upstream.strip()
-                j = j + 1
-            upstreams_list.pop()
-
-            remotes.append(RemoteInfo(combine, upstreams_list, [], []))
-
-        i = i + 1
+        return None
 
-    if destination_input.currentText() == "Make New Folder":
-        destination, name = source_input.currentText().split(":")
+    if destination_text == "Make New Folder":
+        destination, name = source_text.split(":")
 
         if destination != "LOCL":
             destination = "LOCL"
             rclone_args[3] = Path(path).joinpath(name).as_posix()
 
         else:
-            destination = "HTZ0"
+            destination = UPLOAD_UPSTREAM
 
     else:
-        destination, name = destination_input.currentText().split(":")
+        destination, name = destination_text.split(":")
 
-    for remote in remotes:
-        if destination == "LOCL":
-            destination, name = source_input.currentText().split(":")
-            if destination == "HTZ0":
-                remote.remote = "HTZ"
-            rclone_args[2] = f"{remote.remote}:{destination}/Modpacks/{name}"
-            break
+    # < the upstream alias picks its combine remote directly > #
+    if destination == "LOCL":
+        source, name = source_text.split(":")
+        combine = rclone_config.combineFor(source)
 
-        if destination in remote.upstreams:
-            rclone_args[3] = f"{remote.remote}:{destination}/Modpacks/{name}"
-            break
+        if combine is not None:
+            rclone_args[2] = f"{combine.name}:{source}/Modpacks/{name}"
+
+    else:
+        combine = rclone_config.combineFor(destination)
+
+        if combine is not None:
+            rclone_args[3] = f"{combine.name}:{destination}/Modpacks/{name}"
 
     if rclone_args[3] == "destination" or rclone_args[3] == "Make New Folder":
-        return
+        return None
+
+    if destination == "LOCL":
+        alias, local_path, remote_path = source, Path(rclone_args[3]), rclone_args[2]
+    else:
+        alias, local_path, remote_path = destination, Path(rclone_args[2]), rclone_args[3]
+
+    # < player data never leaves the machine > #
+    if destination != "LOCL":
+        with span("transfer.scrub"):
+            cleanInstanceSaves(local_path.resolve())
+
+    # < transfers, checkers, buffers and ordering come from the pack and backend > #
+    backend, tuning_values, tuning_flags = tuneTransfer(local_path, alias)
+
+    rclone_args.extend(tuning_flags)
+    rclone_args.append(f"--exclude=/{MANIFEST_NAME}")
+
+    # < matching manifests skip rclone, otherwise only the differences are synced > #
+    local_manifest = None
+    remote_manifest = None
+    files_from = None
+
+    # < an already running daemon saves starting and authenticating rclone again > #
+    daemon = activeDaemon(rclone_exe, rclone_config)
+
+    # < shared blobs replace per pack copies of large files, the two modes do not mix > #
+    blob_threshold = 0
+
+    if destination != "LOCL" and config.get("pack_blob_mode", False) is True:
+        if blobRemote(remote_path) is not None:
+            blob_threshold = int(config.get("pack_blob_threshold", DEFAULT_BLOB_THRESHOLD))
+        else:
+            APP_LOGGER.warning(f"{remote_path} is not on a combine remote, uploading plainly")
+
+    archive_mode = (
+        destination != "LOCL"
+        and blob_threshold == 0
+        and config.get("pack_archive_mode", False) is True
+    )
+
+    # < a fresh download has no local folder yet, but may still be seeded from the store > #
+    use_manifests = config.get("use_manifests", True) is not False
+
+    if use_manifests and (local_path.is_dir() or destination == "LOCL"):
+        with span("transfer.manifests"):
+            text = readRemoteFile(rclone_args[:5], remote_path, MANIFEST_NAME, cancel, daemon)
+            remote_manifest = None if text is None else parseManifest(text)
+
+            # < jars other instances already hold are linked in, so rclone skips them > #
+            if destination == "LOCL" and remote_manifest is not None and storeEnabled():
+                seedFromStore(local_path, remote_manifest)
+
+            if local_path.is_dir():
+                local_manifest = buildManifest(local_path)
+
+        if local_manifest is not None and remote_manifest is not None:
+            changed = local_manifest.changedPaths(remote_manifest)
+
+            # < switching between archive, blob and plain uploads needs one full pass, even when > #
+            # < no file changed, downloads follow whatever layout the remote has > #
+            same_layout = (
+                remote_manifest.archive == archive_mode and remote_manifest.blobs == blob_threshold
+            )
+
+            if changed.__len__() == 0 and (same_layout or destination == "LOCL"):
+                APP_LOGGER.debug(f"{remote_path} matches {local_path}, nothing to sync")
+                return 0
+
+            if same_layout:
+                files_from = writeFilesFrom(changed)
+                rclone_args.append(f"--files-from-raw={files_from}")
+
+    # < a pack uploaded as an archive is downloaded as one > #
+    archive_index = None
+
+    if destination == "LOCL" and (remote_manifest is None or remote_manifest.archive):
+        archive_remote = f"{remote_path}/{ARCHIVE_DIRECTORY}"
+        text = readRemoteFile(rclone_args[:5], archive_remote, ARCHIVE_INDEX, cancel, daemon)
+        archive_index = None if text is None else parseIndex(text)
 
     # if Path("/etc/os-release").exists() or Path("/usr/lib/os-release").exists():
     # args = ["gnome-terminal", "-e", f"bash -c '{" ".join(rclone_args)} ; exec bash'"]
     # else:
     # args = rclone_args
 
-    for arg in rclone_args:
-        print(arg)
+    if not show_progress or on_stats is not None:
+        rclone_args.remove("--progress")
+        rclone_args.remove("--progress-terminal-title")
+
+    with span("transfer.sync", destination=destination):
+        if blob_threshold > 0:
+            if local_manifest is None:
+                local_manifest = buildManifest(local_path)
+
+            returncode, latest = uploadBlobs(
+                rclone_args,
+                local_path,
+                local_manifest,
+                remote_manifest,
+                blob_threshold,
+                cancel,
+                show_progress,
+                on_stats,
+            )
+
+        elif archive_mode:
+            if local_manifest is None:
+                local_manifest = buildManifest(local_path)
+
+            # < an archive left behind by older uploads may reference deleted chunks > #
+            trusted = remote_manifest is not None and remote_manifest.archive
+
+            returncode, latest = uploadArchive(
+                rclone_args, local_path, local_manifest, trusted, cancel, show_progress, on_stats
+            )
+
+        elif archive_index is not None:
+            returncode, latest = downloadArchive(
+                rclone_args, local_path, archive_index, cancel, show_progress, on_stats
+            )
+
+        elif destination == "LOCL" and remote_manifest is not None and remote_manifest.blobs > 0:
+            returncode, latest = downloadBlobs(
+                rclone_args, local_path, remote_manifest, cancel, show_progress, on_stats
+            )
+
+        else:
+            returncode, latest = executeRclone(rclone_args, cancel, show_progress, on_stats, daemon)
+
+    # < short or failed runs say little about the link > #
+    if returncode == 0 and latest is not None and latest.elapsed >= 5 and latest.bytes > 0:
+        recordThroughput(backend, latest.bytes / latest.elapsed, tuning_values.transfers)
+
+    if files_from is not None:
+        files_from.unlink(missing_ok=True)
+
+    # < downloaded jars join the store, linked to the copies other instances hold > #
+    if returncode == 0 and destination == "LOCL" and storeEnabled():
+        with span("transfer.dedupe"):
+            dedupeInstance(local_path, cancel)
+
+    # < uploads leave a manifest behind for the next sync to compare against > #
+    if returncode == 0 and destination != "LOCL" and local_manifest is not None:
+        local_manifest.archive = archive_mode
+        local_manifest.blobs = blob_threshold
+        text = local_manifest.toJson()
+
+        with span("transfer.write_manifest"):
+            written = writeRemoteFile(
+                rclone_args[:5], remote_path, MANIFEST_NAME, text, cancel, daemon
+            )
+
+        if not written:
+            APP_LOGGER.warning(f"failed to upload manifest for {remote_path}")
+
+    APP_LOGGER.debug(f"finished with exit code: {returncode}")
+
+    return returncode
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def executeRclone(
+    rclone_args: list[str],
+    cancel: Event | None = None,
+    show_progress: bool = True,
+    on_stats: Callable[[TransferStats], None] | None = None,
+    daemon: RcloneDaemon | None = None,
+) -> tuple[int, TransferStats | None]:
+    # < runs a sync or copy and returns its exit code and final stats > #
+    APP_LOGGER.debug(" ".join(rclone_args))
+
+    daemon_options = None
+
+    # < the daemon has no terminal to draw progress on > #
+    if (
+        daemon is not None
+        and rclone_args[1] in ("sync", "copy")
+        and (on_stats is not None or not show_progress)
+    ):
+        daemon_options = daemonOptions(rclone_args[4:])
+
+    latest: TransferStats | None = None
+
+    if daemon is not None and daemon_options is not None:
+
+        def onJobStats(stats: TransferStats) -> None:
+            nonlocal latest
+            latest = stats
+
+            if on_stats is not None:
+                on_stats(stats)
+
+        params: dict[str, object] = {
+            "srcFs": rclone_args[2],
+            "dstFs": rclone_args[3],
+            "_config": daemon_options[0],
+            "_filter": daemon_options[1],
+        }
+
+        returncode = daemon.runJob(f"sync/{rclone_args[1]}", params, cancel, onJobStats)
+
+    elif on_stats is None:
+        returncode, _stdout = runRclone(rclone_args, cancel, capture_output=not show_progress)
+
+    else:
+        # < --stats=1s is already set, log it as json at a level shown by default > #
+        rclone_args = [*rclone_args, "--use-json-log", "--stats-log-level=NOTICE"]
+
+        parser = StatsParser()
+
+        def onOutput(chunk: str) -> None:
+            for stats in parser.feed(chunk):
+                on_stats(stats)
+
+        returncode = streamRclone(rclone_args, onOutput, cancel)
+
+        if parser.last_error is not None:
+            APP_LOGGER.error(f"rclone: {parser.last_error}")
+
+        latest = parser.latest
+
+    return returncode, latest
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def uploadArchive(
+    rclone_args: list[str],
+    local_path: Path,
+    manifest: PackManifest,
+    trusted: bool,
+    cancel: Event | None = None,
+    show_progress: bool = True,
+    on_stats: Callable[[TransferStats], None] | None = None,
+) -> tuple[int, TransferStats | None]:
+    # < small files go up as a few chunks instead of thousands of objects > #
+    config = APP_PACKAGE.getConfig().getConfig()
+    threshold = int(config.get("pack_archive_threshold", DEFAULT_THRESHOLD))
+    chunk_size = int(config.get("pack_archive_chunk_size", DEFAULT_CHUNK_SIZE))
+
+    rclone_exe, _command, _source, remote_path, rclone_config = rclone_args[:5]
+    flags = [flag for flag in rclone_args[5:] if not flag.startswith("--files-from-raw=")]
+    archive_remote = f"{remote_path}/{ARCHIVE_DIRECTORY}"
+
+    previous = None
+
+    if trusted:
+        text = readRemoteFile(rclone_args[:5], archive_remote, ARCHIVE_INDEX, cancel)
+        previous = None if text is None else parseIndex(text)
+
+    index = planArchive(manifest, threshold, chunk_size)
+    new_chunks = [
+        chunk
+        for name, chunk in index.chunks.items()
+        if previous is None or name not in previous.chunks
+    ]
+
+    APP_LOGGER.debug(f"archive of {index.chunks.__len__()} chunks, {new_chunks.__len__()} new")
+
+    if new_chunks:
+        with tempfile.TemporaryDirectory() as staging:
+            # < zlib releases the gil, so chunks compress side by side > #
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [
+                    executor.submit(writeChunk, local_path, chunk, Path(staging))
+                    for chunk in new_chunks
+                ]
+
+            try:
+                for future in futures:
+                    future.result()
+
+            except OSError as error:
+                APP_LOGGER.error("failed to build the pack archive")
+                APP_LOGGER.debug(error)
+                return 1, None
+
+            copy_args = [rclone_exe, "copy", staging, archive_remote, rclone_config, *flags]
+            returncode, _latest = executeRclone(copy_args, cancel, show_progress, on_stats)
+
+            if returncode != 0:
+                return returncode, None
+
+    # < large files stay individual objects, the archive folder is left alone > #
+    sync_args = [
+        rclone_exe,
+        "sync",
+        local_path.as_posix(),
+        remote_path,
+        rclone_config,
+        *flags,
+        f"--min-size={threshold}B",
+        f"--exclude=/{ARCHIVE_DIRECTORY}/**",
+    ]
+    returncode, latest = executeRclone(sync_args, cancel, show_progress, on_stats)
+
+    if returncode != 0:
+        return returncode, latest
+
+    # < small files from a plain upload are in the archive now > #
+    if previous is None:
+        delete_args = [
+            rclone_exe,
+            "delete",
+            remote_path,
+            rclone_config,
+            f"--max-size={threshold - 1}B",
+            f"--exclude=/{ARCHIVE_DIRECTORY}/**",
+            f"--exclude=/{MANIFEST_NAME}",
+        ]
+        runRclone(delete_args, cancel)
+
+    if not writeRemoteFile(rclone_args[:5], archive_remote, ARCHIVE_INDEX, index.toJson(), cancel):
+        return 1, latest
+
+    # < old chunks go last, so a download started meanwhile still finds them > #
+    if previous is not None:
+        stale = [name for name in previous.chunks if name not in index.chunks]
+
+        if stale:
+            files_from = writeFilesFrom(stale)
+            delete_args = [
+                rclone_exe,
+                "delete",
+                archive_remote,
+                rclone_config,
+                f"--files-from-raw={files_from}",
+            ]
+            runRclone(delete_args, cancel)
+            files_from.unlink(missing_ok=True)
+
+    return 0, latest
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def downloadArchive(
+    rclone_args: list[str],
+    local_path: Path,
+    index: ArchiveIndex,
+    cancel: Event | None = None,
+    show_progress: bool = True,
+    on_stats: Callable[[TransferStats], None] | None = None,
+) -> tuple[int, TransferStats | None]:
+    rclone_exe, _command, remote_path, _destination, rclone_config = rclone_args[:5]
+    flags = [flag for flag in rclone_args[5:] if not flag.startswith("--files-from-raw=")]
+    archive_remote = f"{remote_path}/{ARCHIVE_DIRECTORY}"
+
+    local_path.mkdir(parents=True, exist_ok=True)
+    local = buildManifest(local_path)
+
+    # < before the large files land, one of them may replace a stale small file > #
+    for path in staleSmallFiles(index, local):
+        local_path.joinpath(path).unlink(missing_ok=True)
+
+    sync_args = [
+        rclone_exe,
+        "sync",
+        remote_path,
+        local_path.as_posix(),
+        rclone_config,
+        *flags,
+        f"--min-size={index.threshold}B",
+        f"--exclude=/{ARCHIVE_DIRECTORY}/**",
+    ]
+    returncode, latest = executeRclone(sync_args, cancel, show_progress, on_stats)
+
+    if returncode != 0:
+        return returncode, latest
+
+    needed = neededChunks(index, local)
+
+    if not needed:
+        return 0, latest
+
+    with tempfile.TemporaryDirectory() as staging:
+        # < one rclone fetches every chunk in parallel, bounded by --transfers > #
+        files_from = writeFilesFrom(needed)
+        copy_args = [
+            rclone_exe,
+            "copy",
+            archive_remote,
+            staging,
+            rclone_config,
+            *flags,
+            f"--files-from-raw={files_from}",
+        ]
+        returncode, chunk_stats = executeRclone(copy_args, cancel, show_progress, on_stats)
+        files_from.unlink(missing_ok=True)
+
+        if returncode != 0:
+            return returncode, latest
+
+        def extract(name: str) -> int:
+            return extractChunk(Path(staging, name), index.chunks[name], local_path, local)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(extract, needed))
+
+    if any(result < 0 for result in results):
+        return 1, latest
+
+    APP_LOGGER.debug(f"extracted {sum(results)} files from {needed.__len__()} chunks")
+
+    if latest is None or (chunk_stats is not None and chunk_stats.bytes > latest.bytes):
+        latest = chunk_stats
+
+    return 0, latest
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def uploadBlobs(
+    rclone_args: list[str],
+    local_path: Path,
+    manifest: PackManifest,
+    remote_manifest: PackManifest | None,
+    threshold: int,
+    cancel: Event | None = None,
+    show_progress: bool = True,
+    on_stats: Callable[[TransferStats], None] | None = None,
+) -> tuple[int, TransferStats | None]:
+    # < large files go to the upstream's blobs/ once, whichever pack uploads them first > #
+    rclone_exe, _command, _source, remote_path, rclone_config = rclone_args[:5]
+    flags = [flag for flag in rclone_args[5:] if not flag.startswith("--files-from-raw=")]
+    blob_remote = blobRemote(remote_path)
+
+    if blob_remote is None:
+        return 1, None
+
+    trusted = remote_manifest is not None and remote_manifest.blobs == threshold
+    paths = blobPaths(manifest, threshold)
+
+    # < an earlier blob upload already holds every unchanged file > #
+    if trusted and remote_manifest is not None:
+        changed = set(manifest.changedPaths(remote_manifest))
+        paths = [path for path in paths if path in changed]
+
+    latest = None
+
+    if paths:
+        with tempfile.TemporaryDirectory(prefix=STAGING_PREFIX, dir=local_path.parent) as staging:
+            try:
+                stageBlobs(local_path, manifest, paths, Path(staging))
+            except OSError as error:
+                APP_LOGGER.error("failed to stage blobs")
+                APP_LOGGER.debug(error)
+                return 1, None
+
+            # < a blob is named by its content, one already there is never sent again > #
+            copy_args = [
+                rclone_exe,
+                "copy",
+                staging,
+                blob_remote,
+                rclone_config,
+                *flags,
+                "--ignore-existing",
+                "--no-traverse",
+            ]
+            returncode, latest = executeRclone(copy_args, cancel, show_progress, on_stats)
+
+            if returncode != 0:
+                return returncode, latest
+
+    # < the pack folder keeps only the small files > #
+    sync_args = [
+        rclone_exe,
+        "sync",
+        local_path.as_posix(),
+        remote_path,
+        rclone_config,
+        *flags,
+        f"--max-size={threshold - 1}B",
+    ]
+    returncode, small_stats = executeRclone(sync_args, cancel, show_progress, on_stats)
+
+    if returncode != 0:
+        return returncode, latest
+
+    # < large files from a plain or archive upload are blobs now > #
+    if not trusted:
+        delete_args = [
+            rclone_exe,
+            "delete",
+            remote_path,
+            rclone_config,
+            f"--min-size={threshold}B",
+            f"--exclude=/{MANIFEST_NAME}",
+        ]
+        runRclone(delete_args, cancel)
+
+    if latest is None or (small_stats is not None and small_stats.bytes > latest.bytes):
+        latest = small_stats
+
+    return 0, latest
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def downloadBlobs(
+    rclone_args: list[str],
+    local_path: Path,
+    manifest: PackManifest,
+    cancel: Event | None = None,
+    show_progress: bool = True,
+    on_stats: Callable[[TransferStats], None] | None = None,
+) -> tuple[int, TransferStats | None]:
+    rclone_exe, _command, remote_path, _destination, rclone_config = rclone_args[:5]
+    flags = [flag for flag in rclone_args[5:] if not flag.startswith("--files-from-raw=")]
+    blob_remote = blobRemote(remote_path)
+
+    if blob_remote is None:
+        APP_LOGGER.error(f"{remote_path} uses blobs but is not on a combine remote")
+        return 1, None
+
+    local_path.mkdir(parents=True, exist_ok=True)
+    local = buildManifest(local_path)
+
+    for path in staleLargeFiles(manifest, local):
+        local_path.joinpath(path).unlink(missing_ok=True)
+
+    sync_args = [
+        rclone_exe,
+        "sync",
+        remote_path,
+        local_path.as_posix(),
+        rclone_config,
+        *flags,
+        f"--max-size={manifest.blobs - 1}B",
+    ]
+    returncode, latest = executeRclone(sync_args, cancel, show_progress, on_stats)
+
+    if returncode != 0:
+        return returncode, latest
+
+    # < files seeded from the local store or left from earlier are not fetched again > #
+    needed = neededBlobs(manifest, local)
+
+    if not needed:
+        return 0, latest
+
+    with tempfile.TemporaryDirectory(prefix=STAGING_PREFIX, dir=local_path.parent) as staging:
+        # < one rclone fetches every missing blob in parallel, bounded by --transfers > #
+        files_from = writeFilesFrom(list(needed))
+        copy_args = [
+            rclone_exe,
+            "copy",
+            blob_remote,
+            staging,
+            rclone_config,
+            *flags,
+            f"--files-from-raw={files_from}",
+            "--no-traverse",
+        ]
+        returncode, blob_stats = executeRclone(copy_args, cancel, show_progress, on_stats)
+        files_from.unlink(missing_ok=True)
+
+        if returncode != 0:
+            return returncode, latest
+
+        placed = materialiseBlobs(local_path, manifest, needed, Path(staging))
+
+    if placed < 0:
+        return 1, latest
+
+    APP_LOGGER.debug(f"placed {placed} files from {needed.__len__()} blobs")
+
+    if latest is None or (blob_stats is not None and blob_stats.bytes > latest.bytes):
+        latest = blob_stats
+
+    return 0, latest
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def activeDaemon(rclone_exe: Path, rclone_config: RcloneConfig) -> RcloneDaemon | None:
+    config = APP_PACKAGE.getConfig().getConfig()
+
+    if config.get("use_rclone_daemon", False) is not True:
+        return None
+
+    return rcloneDaemon(rclone_exe, rclone_config.path, rclone_config.fingerprint)
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def readRemoteFile(
+    rclone_args: list[str],
+    remote_path: str,
+    name: str,
+    cancel: Event | None = None,
+    daemon: RcloneDaemon | None = None,
+) -> str | None:
+    if daemon is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            if not daemon.copyFile(remote_path, name, directory, name):
+                return None
+
+            return Path(directory).joinpath(name).read_text()
+
+    # < rclone_args holds the executable, command, source, destination and config > #
+    rclone_args = [rclone_args[0], "cat", rclone_args[4], f"{remote_path}/{name}"]
+
+    returncode, stdout = runRclone(rclone_args, cancel, timeout=60)
+
+    if returncode != 0:
+        return None
+
+    return stdout
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def writeRemoteFile(
+    rclone_args: list[str],
+    remote_path: str,
+    name: str,
+    text: str,
+    cancel: Event | None = None,
+    daemon: RcloneDaemon | None = None,
+) -> bool:
+    if daemon is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory).joinpath(name).write_text(text)
+
+            return daemon.copyFile(directory, name, remote_path, name)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as remote_file:
+        remote_file.write(text)
+
+    rclone_args = [
+        rclone_args[0],
+        "copyto",
+        rclone_args[4],
+        remote_file.name,
+        f"{remote_path}/{name}",
+    ]
+
+    returncode, _stdout = runRclone(rclone_args, cancel, timeout=60)
+    Path(remote_file.name).unlink(missing_ok=True)
+
+    return returncode == 0
+
+
+# < ------------------------------------------------------------------- > #
+
+
+def writeFilesFrom(paths: list[str]) -> Path:
+    # < raw, so names starting with # or ; are not read as comments > #
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as files_file:
+        files_file.write("\n".join(paths))
+        files_file.write("\n")
 
-    rc = subprocess.run(rclone_args)
-    print(f"finished with exit code: {rc.returncode}")
+    return Path(files_file.name)
 
 
 # < ------------------------------------------------------------------- > #
@@ -0,0 +1,375 @@
+import os
+import shlex
+import sys
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+
+from minecraft_pack_manager import APP_LOGGER, APP_PACKAGE
+from minecraft_pack_manager.lib import cache
+from minecraft_pack_manager.lib.manifest import walkPack
+from minecraft_pack_manager.lib.rclone import loadRcloneConfig
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+KIB = 1024
+MIB = 1024 * KIB
+
+# < histogram bucket upper bounds: small, medium, large, everything above is huge > #
+SIZE_BUCKETS = (64 * KIB, 1 * MIB, 16 * MIB)
+
+# < parallel transfers a backend tolerates before it starts rate limiting > #
+BACKEND_TRANSFER_LIMITS: dict[str, int] = {
+    "drive": 8,
+    "onedrive": 8,
+    "dropbox": 8,
+    "pcloud": 8,
+    "ftp": 4,
+    "sftp": 8,
+    "webdav": 8,
+    "local": 8,
+    "s3": 64,
+    "b2": 64,
+    "gcs": 64,
+    "azureblob": 64,
+    "swift": 64,
+}
+DEFAULT_TRANSFER_LIMIT = 16
+
+# < buffers are allowed an eighth of free memory, but never more than this > #
+MAX_BUFFER_MEMORY = 512 * MIB
+UNKNOWN_BUFFER_MEMORY = 128 * MIB
+MIN_BUFFER_SIZE = 1 * MIB
+
+# < one stream this fast means the link, not latency, is the bottleneck > #
+SATURATED_STREAM_SPEED = 32 * MIB
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class TreeProfile:
+    files: int = 0
+    total_size: int = 0
+    # < file counts per SIZE_BUCKETS bucket, plus one for the rest > #
+    histogram: list[int] = field(default_factory=lambda: [0] * (SIZE_BUCKETS.__len__() + 1))
+
+    # < ------------------------------------------------------------------- > #
+
+    def add(self, size: int) -> None:
+        self.files = self.files + 1
+        self.total_size = self.total_size + size
+
+        for index, bound in enumerate(SIZE_BUCKETS):
+            if size < bound:
+                self.histogram[index] = self.histogram[index] + 1
+                return
+
+        self.histogram[-1] = self.histogram[-1] + 1
+
+    # < ------------------------------------------------------------------- > #
+
+    def smallShare(self) -> float:
+        if self.files == 0:
+            return 0.0
+
+        return self.histogram[0] / self.files
+
+    # < ------------------------------------------------------------------- > #
+
+    def largeFiles(self) -> int:
+        return self.histogram[-2] + self.histogram[-1]
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+@dataclass
+class TuningValues:
+    transfers: int
+    checkers: int
+    buffer_size: int
+    order_by: str | None = None
+
+    # < ------------------------------------------------------------------- > #
+
+    def flags(self) -> list[str]:
+        flags = [
+            f"--transfers={self.transfers}",
+            f"--checkers={self.checkers}",
+            f"--buffer-size={self.buffer_size // MIB}M",
+        ]
+
+        if self.order_by is not None:
+            flags.append(f"--order-by={self.order_by}")
+
+        return flags
+
+    # < ------------------------------------------------------------------- > #
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+_HISTORY_LOCK = Lock()
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def profileTree(path: Path) -> TreeProfile:
+    profile = TreeProfile()
+
+    # < scandir reuses the directory listing's stat data on windows > #
+    for _relative, entry in walkPack(path):
+        try:
+            profile.add(entry.stat().st_size)
+        except OSError:
+            continue
+
+    return profile
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def availableMemory() -> int | None:
+    if sys.platform == "win32":
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+
+        return int(status.ullAvailPhys)
+
+    # < MemAvailable counts reclaimable cache, the free page count does not > #
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * KIB
+
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def backendType(alias: str) -> tuple[str, str]:
+    # < returns the name and type of the remote behind an upstream alias > #
+    rclone_config = loadRcloneConfig()
+
+    if rclone_config is None:
+        return alias, ""
+
+    upstream = rclone_config.upstreamFor(alias)
+
+    if upstream is None:
+        return alias, ""
+
+    return upstream.name, upstream.type
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def loadHistory() -> dict[str, dict[str, float]]:
+    cached = cache.readCache("tuning_history", "")
+
+    if cached is None:
+        return {}
+
+    history: dict[str, dict[str, float]] = {}
+
+    for backend, entry in cached[0].items():
+        if type(entry) is not dict:
+            continue
+
+        speed = entry.get("speed")
+        transfers = entry.get("transfers")
+
+        if not isinstance(speed, (int, float)) or not isinstance(transfers, (int, float)):
+            continue
+
+        history[backend] = {"speed": float(speed), "transfers": float(transfers)}
+
+    return history
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def recordThroughput(backend: str, speed: float, transfers: int) -> None:
+    # < smoothed so one slow evening does not undo the tuning for good > #
+    with _HISTORY_LOCK:
+        history = loadHistory()
+        previous = history.get(backend)
+
+        if previous is not None:
+            speed = previous["speed"] * 0.5 + speed * 0.5
+
+        history[backend] = {"speed": speed, "transfers": transfers}
+
+        cache.writeCache("tuning_history", "", dict(history))
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def parseOverrides(text: str) -> list[str] | None:
+    # < "--transfers=4 --buffer-size=8M", None when it is not only flags > #
+    try:
+        words = shlex.split(text)
+    except ValueError:
+        return None
+
+    if not all(word.startswith("--") and word.__len__() > 2 for word in words):
+        return None
+
+    return words
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def applyOverrides(flags: list[str], overrides: list[str]) -> list[str]:
+    names = {override.partition("=")[0] for override in overrides}
+
+    return [flag for flag in flags if flag.partition("=")[0] not in names] + overrides
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def tuneValues(
+    profile: TreeProfile | None,
+    backend_type: str,
+    memory: int | None,
+    history: dict[str, float] | None,
+) -> TuningValues:
+    limit = BACKEND_TRANSFER_LIMITS.get(backend_type, DEFAULT_TRANSFER_LIMIT)
+
+    # < nothing to profile yet, e.g. a first download > #
+    if profile is None or profile.files == 0:
+        transfers = min(8, limit)
+        checkers = transfers * 2
+        buffer_size = 16 * MIB
+        order_by = None
+        small_share = 0.0
+
+    else:
+        small_share = profile.smallShare()
+
+        # < tiny files are latency bound, so more of them in flight is faster > #
+        if small_share >= 0.5:
+            transfers = max(8, min(64, profile.files // 200))
+            checkers = transfers * 2
+            buffer_size = 2 * MIB
+
+        else:
+            transfers = max(4, min(16, profile.files // 50))
+            checkers = transfers
+            buffer_size = 16 * MIB if profile.largeFiles() > 0 else 4 * MIB
+
+        transfers = min(transfers, limit)
+        checkers = min(checkers, limit * 2)
+
+        # < start big files early so the sync does not end on one slow upload > #
+        if profile.largeFiles() > 0 and small_share >= 0.25:
+            order_by = "size,mixed,50"
+        elif profile.largeFiles() > 0:
+            order_by = "size,descending"
+        else:
+            order_by = None
+
+    # < a link a few streams already saturate gains nothing from more > #
+    if (
+        history is not None
+        and history["transfers"] > 0
+        and small_share < 0.5
+        and history["speed"] / history["transfers"] >= SATURATED_STREAM_SPEED
+    ):
+        transfers = max(2, transfers // 2)
+
+    if memory is None:
+        budget = UNKNOWN_BUFFER_MEMORY
+    else:
+        budget = min(MAX_BUFFER_MEMORY, memory // 8)
+
+    # < shrink buffers first, then parallelism, until they fit the budget > #
+    while transfers * buffer_size > budget and buffer_size > MIN_BUFFER_SIZE:
+        buffer_size = buffer_size // 2
+
+    while transfers * buffer_size > budget and transfers > 1:
+        transfers = transfers - 1
+
+    return TuningValues(transfers, max(checkers, transfers), buffer_size, order_by)
+
+
+# < ----------------------------------------------------------------------- > #
+
+
+def tuneTransfer(local_path: Path | None, alias: str) -> tuple[str, TuningValues, list[str]]:
+    # < returns the backend name, the tuned values and the final rclone flags > #
+    backend, backend_type = backendType(alias)
+
+    profile = None
+
+    if local_path is not None and local_path.is_dir():
+        profile = profileTree(local_path)
+
+    values = tuneValues(profile, backend_type, availableMemory(), loadHistory().get(backend))
+    flags = values.flags()
+
+    config = APP_PACKAGE.getConfig().getConfig()
+    overrides = parseOverrides(str(config.get("rclone_overrides", "")))
+
+    if overrides is None:
+        APP_LOGGER.warning("ignoring invalid rclone_overrides setting")
+    else:
+        flags = applyOverrides(flags, overrides)
+
+        # < throughput is recorded against the parallelism that really ran > #
+        for override in overrides:
+            name, _separator, value = override.partition("=")
+
+            if name == "--transfers" and value.isdigit():
+                values.transfers = int(value)
+
+    if profile is not None:
+        APP_LOGGER.debug(f"profiled {profile.files} files, histogram {profile.histogram}")
+
+    APP_LOGGER.debug(f"tuned for {backend} ({backend_type or 'unknown'}): {' '.join(flags)}")
+
+    return backend, values, flags
+
+
+# < ----------------------------------------------------------------------- > #